@@ -0,0 +1,192 @@
+"""
+Print Miner Discord Bot Game - Admission Control
+
+This module caps how many mining runs and fights animate at once, so a crowd of players
+can not push the bot into Discord's global rate limits. Past the animation cap, new
+sessions run static: they show one "mining..." frame and the final result. Past the
+session cap, new sessions wait in a queue and are told their ETA. Each mode is left
+only once the load has dropped well below the cap that triggered it, so the bot does
+not flap between modes at the boundary. While the bot drains before a restart, no new
+session is admitted at all.
+Classes include: Mode, AdmittedRun and AdmissionController.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import enum
+import time
+from collections import deque
+
+MAX_ANIMATED: int = 40  # sessions animated frame by frame
+MAX_SESSIONS: int = 200  # sessions running at all, animated or static
+RECOVER_RATIO: float = 0.75  # a mode is left once load is below this share of its cap
+AVERAGE_WEIGHT: float = 0.1  # weight of the newest session in the average duration
+
+
+class Mode(enum.IntEnum):
+    """Enum class to represent how new sessions are admitted."""
+
+    NORMAL = 0  # animated
+    DEGRADED = 1  # static
+    QUEUEING = 2  # queued
+
+
+class AdmittedRun:
+    """
+    Wraps a scheduler run so its session is released when the run ends, however it ends.
+
+    Attributes:
+        controller (AdmissionController): The controller that admitted the run.
+        run: The wrapped run. Its `animated` attribute says whether to show every frame.
+        started (float): When the run was admitted.
+    """
+
+    __slots__ = ("controller", "run", "started")
+
+    def __init__(self, controller: "AdmissionController", run):
+        self.controller = controller
+        self.run = run
+        self.started = time.monotonic()
+
+    async def step(self):
+        try:
+            delay = await self.run.step()
+        except Exception:
+            self.controller.release(self)
+            raise
+        if delay is None:
+            self.controller.release(self)
+        return delay
+
+
+class AdmissionController:
+    """
+    Decides how every mining run and fight is shown.
+
+    Attributes:
+        mode (Mode): How new sessions are admitted right now.
+        animated (int): The running animated sessions.
+        static (int): The running static sessions.
+        queue (deque): The (run, delay) of every queued session, oldest first.
+        average_seconds (float): The average duration of a session.
+
+    Args:
+        scheduler (TickScheduler): The scheduler admitted runs are stepped by.
+        max_animated (int): The most sessions animated at once.
+        max_sessions (int): The most sessions running at once.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        max_animated: int = MAX_ANIMATED,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        self.scheduler = scheduler
+        self.max_animated = max_animated
+        self.max_sessions = max_sessions
+        self.mode = Mode.NORMAL
+        self.animated = 0
+        self.static = 0
+        self.queue: deque = deque()
+        self.average_seconds = 10.0
+        self.admitted = {mode.name.lower(): 0 for mode in Mode}
+        self.running: set = set()  # the AdmittedRun of every running session
+        self.released = 0
+        self.draining = False
+        self.refused = 0
+
+    def _update_mode(self) -> None:
+        """Moves to the mode the load calls for, with hysteresis."""
+        running = self.animated + self.static
+        if running >= self.max_sessions:
+            self.mode = Mode.QUEUEING
+        elif self.mode == Mode.QUEUEING and (
+            self.queue or running > self.max_sessions * RECOVER_RATIO
+        ):
+            pass  # stay until the queue is drained and the load has dropped
+        elif self.animated >= self.max_animated:
+            self.mode = Mode.DEGRADED
+        elif self.mode != Mode.NORMAL and self.animated > self.max_animated * RECOVER_RATIO:
+            self.mode = Mode.DEGRADED
+        else:
+            self.mode = Mode.NORMAL
+
+    def accepting(self) -> bool:
+        """Returns whether new sessions may start, counting a refusal if they may not."""
+        if self.draining:
+            self.refused += 1
+            return False
+        return True
+
+    def in_flight(self) -> list:
+        """Returns the run of every running and queued session."""
+        return [admitted.run for admitted in self.running] + [run for run, _ in self.queue]
+
+    def submit(self, run, delay: float) -> int:
+        """
+        Admits a session's run, or queues it when the bot is at capacity.
+
+        Args:
+            run: The run, with an `animated` attribute which is set here.
+            delay (float): Seconds until the run's first step.
+
+        Returns:
+            int: 0 if the run was started, otherwise its place in the queue.
+        """
+        self._update_mode()
+        if self.mode == Mode.QUEUEING:
+            self.queue.append((run, delay))
+            self.admitted["queueing"] += 1
+            return len(self.queue)
+        self._start(run, delay)
+        return 0
+
+    def _start(self, run, delay: float) -> None:
+        run.animated = self.mode == Mode.NORMAL
+        if run.animated:
+            self.animated += 1
+        else:
+            self.static += 1
+        self.admitted[self.mode.name.lower()] += 1
+        admitted = AdmittedRun(self, run)
+        self.running.add(admitted)
+        self.scheduler.call_later(delay, admitted)
+
+    def release(self, admitted: AdmittedRun) -> None:
+        """Frees an ended session's place and starts queued sessions in it."""
+        self.running.discard(admitted)
+        self.released += 1
+        if admitted.run.animated:
+            self.animated -= 1
+        else:
+            self.static -= 1
+        seconds = time.monotonic() - admitted.started
+        self.average_seconds += AVERAGE_WEIGHT * (seconds - self.average_seconds)
+
+        while self.queue and self.animated + self.static < self.max_sessions:
+            run, delay = self.queue.popleft()
+            self.mode = Mode.DEGRADED  # queued sessions are started static
+            self._start(run, delay)
+        self._update_mode()
+
+    def eta(self, position: int) -> float:
+        """Returns roughly how many seconds the session at a place in the queue will wait."""
+        running = max(self.animated + self.static, 1)
+        return self.average_seconds * position / running
+
+    def report(self) -> dict:
+        """Returns the current mode and load."""
+        return {
+            "admission_mode": self.mode.name,
+            "animated_sessions": self.animated,
+            "static_sessions": self.static,
+            "queued_sessions": len(self.queue),
+            **{f"admitted_{mode}": count for mode, count in self.admitted.items()},
+            "draining": self.draining,
+            "refused_sessions": self.refused,
+        }
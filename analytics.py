@@ -0,0 +1,460 @@
+"""
+Print Miner Discord Bot Game - Gameplay Analytics
+
+This module records the outcome of every mining run, fight, flee, purchase and sale to
+a local, append-only columnar file, and answers balance questions from it. Recording is
+opt-in: the bot only subscribes the sink to its game engine when PRINTMINER_ANALYTICS
+names a file. Discord user ids are never written.
+
+Rows are buffered and written a row group at a time. A row group stores each column
+contiguously: numbers as packed little endian arrays, strings dictionary encoded as a
+list of the distinct values of the group and one small code per row. A query only reads
+the columns it needs, and skips whole row groups whose dictionaries can not match it.
+A row group cut short by a crash is ignored when reading, and cut off before
+the file is appended to again.
+
+Columns (one row per outcome):
+    time   : seconds since the epoch (u32)
+    kind   : "mining", "fight", "flee", "purchase" or "sale"
+    level  : the miner's level (u16)
+    name   : mineral or item name, or the enemy's content key (BigBug and Bug share a name)
+    size   : mineral size, fight turns (u32)
+    amount : gold found, credits lost to a flee, price or credits earned (i64)
+    flag   : encounter followed, fight won or purchase made (u8)
+
+Format (little endian), a sequence of row groups:
+    group  : magic "PMAG" (4 bytes), version (u8), rows (u32), body length (u32), body
+    body   : every column in order, each as its length (u32) and its payload
+    string : values count (u16), values length (u32), the values joined by newlines
+             (utf-8), then a code per row (u16)
+
+Usage:
+    PRINTMINER_ANALYTICS=gameplay.analytics python main.py
+    python analytics.py simulate gameplay.analytics --runs 100000
+    python analytics.py gold gameplay.analytics
+    python analytics.py deaths gameplay.analytics
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+from array import array
+from collections import defaultdict
+from itertools import compress
+from engine import Engine, MiningFinished, FightEnded, Fled, Purchase, Sale
+from gameobjects import Miner
+
+MAGIC: bytes = b"PMAG"
+VERSION: int = 1
+GROUP = struct.Struct("<4sBII")
+LENGTH = struct.Struct("<I")
+VALUES = struct.Struct("<HI")
+
+ROW_GROUP_ROWS: int = 65_536  # rows buffered before a row group is written
+FLUSH_SECONDS: float = 60.0  # longest rows are buffered on a quiet bot
+
+# Column name -> array typecode, or str for a dictionary encoded column
+COLUMNS: dict = {
+    "time": "I",
+    "kind": str,
+    "level": "H",
+    "name": str,
+    "size": "I",
+    "amount": "q",
+    "flag": "B",
+}
+CODE: str = "H"  # typecode of dictionary codes
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class AnalyticsSink:
+    """
+    Writes the outcomes published on a game engine's event bus to an analytics file.
+
+    Attributes:
+        columns (dict): The buffered values of every numeric column.
+        codes (dict): The buffered codes of every string column.
+        values (dict): The value -> code dictionary of every string column.
+        rows (int): The rows buffered.
+        written (int): The rows written so far.
+
+    Args:
+        path (str): The analytics file, appended to if it exists.
+        rows_per_group (int): The rows written together as a row group.
+    """
+
+    def __init__(self, path: str, rows_per_group: int = ROW_GROUP_ROWS):
+        self.file = open(path, "ab")
+        self.file.truncate(complete_length(path))  # drop a group torn by a crash
+        self.rows_per_group = rows_per_group
+        self.columns: dict = {}
+        self.codes: dict = {}
+        self.values: dict = {}
+        self.rows = 0
+        self.written = 0
+        self.flushed = time.monotonic()
+        self._clear()
+
+    def _clear(self) -> None:
+        for column, typecode in COLUMNS.items():
+            if typecode is str:
+                self.codes[column] = array(CODE)
+                self.values[column] = {}
+            else:
+                self.columns[column] = array(typecode)
+        self.rows = 0
+
+    def subscribe(self, engine: Engine) -> None:
+        """Records the outcomes of an engine's games."""
+        engine.bus.subscribe(self.receive, MiningFinished, FightEnded, Fled, Purchase, Sale)
+
+    def receive(self, event) -> None:
+        kind = type(event)
+        if kind is MiningFinished:
+            self.add(
+                "mining",
+                event.level,
+                event.mineral.name,
+                event.size,
+                event.gold_found,
+                event.encounter,
+            )
+        elif kind is FightEnded:
+            enemy = type(event.enemy).__name__  # the content key
+            self.add("fight", event.level, enemy, event.turns, 0, event.won)
+        elif kind is Fled:
+            enemy = type(event.enemy).__name__
+            self.add("flee", event.level, enemy, 0, event.lost_credits, False)
+        elif kind is Purchase:
+            self.add("purchase", event.level, event.item, 0, event.price, event.ok)
+        elif kind is Sale:
+            self.add("sale", event.level, "inventory", 0, event.credits, True)
+
+    def add(self, kind: str, level: int, name: str, size: int, amount: int, flag: bool) -> None:
+        """Buffers one row, writing a row group when enough rows are buffered."""
+        self.columns["time"].append(int(time.time()))
+        self._encode("kind", kind)
+        self.columns["level"].append(level)
+        self._encode("name", name)
+        self.columns["size"].append(size)
+        self.columns["amount"].append(amount)
+        self.columns["flag"].append(flag)
+        self.rows += 1
+        if (
+            self.rows >= self.rows_per_group
+            or time.monotonic() - self.flushed > FLUSH_SECONDS
+        ):
+            self.flush()
+
+    def _encode(self, column: str, value: str) -> None:
+        values = self.values[column]
+        code = values.get(value)
+        if code is None:
+            code = values[value] = len(values)
+        self.codes[column].append(code)
+
+    def flush(self) -> None:
+        """Writes the buffered rows as one row group."""
+        self.flushed = time.monotonic()
+        if not self.rows:
+            return
+
+        body = []
+        for column, typecode in COLUMNS.items():
+            if typecode is str:
+                values = "\n".join(self.values[column]).encode()
+                payload = (
+                    VALUES.pack(len(self.values[column]), len(values))
+                    + values
+                    + _little_endian(self.codes[column]).tobytes()
+                )
+            else:
+                payload = _little_endian(self.columns[column]).tobytes()
+            body += (LENGTH.pack(len(payload)), payload)
+        body = b"".join(body)
+
+        # One write per row group, so a crash leaves at most a short tail group.
+        self.file.write(GROUP.pack(MAGIC, VERSION, self.rows, len(body)) + body)
+        self.file.flush()
+        self.written += self.rows
+        self._clear()
+
+    def close(self) -> None:
+        """Writes the buffered rows and closes the file."""
+        self.flush()
+        self.file.close()
+
+
+def complete_length(path: str) -> int:
+    """Returns the length of the whole row groups at the start of an analytics file."""
+    length = 0
+    with open(path, "rb") as file:
+        end = file.seek(0, 2)
+        while length + GROUP.size <= end:
+            file.seek(length)
+            magic, version, _, body = GROUP.unpack(file.read(GROUP.size))
+            if magic != MAGIC or version != VERSION or length + GROUP.size + body > end:
+                break
+            length += GROUP.size + body
+    return length
+
+
+sink: AnalyticsSink = None
+
+
+def start(path: str, engine: Engine) -> None:
+    """Starts recording the outcomes of an engine's games to an analytics file."""
+    global sink
+    sink = AnalyticsSink(path)
+    sink.subscribe(engine)
+
+
+def stop() -> None:
+    """Writes the buffered rows, if outcomes are being recorded."""
+    global sink
+    if sink is not None:
+        sink.close()
+        sink = None
+
+
+def read(path: str, columns: tuple):
+    """
+    Reads some columns of an analytics file, a row group at a time.
+
+    Args:
+        path (str): The analytics file.
+        columns (tuple): The names of the columns to read.
+
+    Yields:
+        dict: The columns of a row group, by name. A numeric column is an array, a
+            string column is a (values, codes) tuple, values being a list of strings.
+    """
+    with open(path, "rb") as file:
+        if not file.seek(0, 2):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + GROUP.size <= len(data):
+                magic, version, rows, length = GROUP.unpack_from(data, offset)
+                offset += GROUP.size
+                if magic != MAGIC or version != VERSION or offset + length > len(data):
+                    break  # a torn tail group, or not an analytics file
+                group = {}
+                position = offset
+                for column, typecode in COLUMNS.items():
+                    (size,) = LENGTH.unpack_from(data, position)
+                    position += LENGTH.size
+                    if column in columns:
+                        group[column] = _decode(data[position : position + size], typecode)
+                    position += size
+                offset += length
+                yield group
+
+
+def _decode(payload: bytes, typecode):
+    if typecode is not str:
+        return _little_endian(array(typecode, payload))
+    count, length = VALUES.unpack_from(payload)
+    start = VALUES.size
+    values = payload[start : start + length].decode().split("\n") if count else []
+    return values, _little_endian(array(CODE, payload[start + length :]))
+
+
+def _selected(group: dict, kind: str):
+    """Returns the row selectors of a kind in a row group, or None if it has no rows of it."""
+    values, codes = group["kind"]
+    if kind not in values:
+        return None
+    return map(values.index(kind).__eq__, codes)
+
+
+def gold_per_mineral(path: str) -> dict:
+    """
+    Returns the mining runs and gold found for every mineral and level.
+
+    Returns:
+        dict: (mineral, level) -> [runs, gold found, total size].
+    """
+    totals: dict = defaultdict(lambda: [0, 0, 0])
+    for group in read(path, ("kind", "name", "level", "size", "amount")):
+        selected = _selected(group, "mining")
+        if selected is None:
+            continue
+        names, codes = group["name"]
+        rows = compress(zip(codes, group["level"], group["amount"], group["size"]), selected)
+        by_code: dict = defaultdict(lambda: [0, 0, 0])
+        for code, level, amount, size in rows:
+            total = by_code[code, level]
+            total[0] += 1
+            total[1] += amount
+            total[2] += size
+        for (code, level), (runs, gold, size) in by_code.items():
+            total = totals[names[code], level]
+            total[0] += runs
+            total[1] += gold
+            total[2] += size
+    return dict(totals)
+
+
+def deaths_per_enemy(path: str) -> dict:
+    """
+    Returns the fights, deaths and turns fought against every enemy.
+
+    Returns:
+        dict: enemy -> [fights, deaths, turns].
+    """
+    totals: dict = defaultdict(lambda: [0, 0, 0])
+    for group in read(path, ("kind", "name", "size", "flag")):
+        selected = _selected(group, "fight")
+        if selected is None:
+            continue
+        names, codes = group["name"]
+        by_code: dict = defaultdict(lambda: [0, 0, 0])
+        for code, turns, won in compress(zip(codes, group["size"], group["flag"]), selected):
+            total = by_code[code]
+            total[0] += 1
+            total[1] += not won
+            total[2] += turns
+        for code, (fights, deaths, turns) in by_code.items():
+            total = totals[names[code]]
+            total[0] += fights
+            total[1] += deaths
+            total[2] += turns
+    return dict(totals)
+
+
+def flee_losses(path: str) -> dict:
+    """
+    Returns the flees and credits lost fleeing every enemy.
+
+    Returns:
+        dict: enemy -> [flees, flees with a loss, credits lost].
+    """
+    totals: dict = defaultdict(lambda: [0, 0, 0])
+    for group in read(path, ("kind", "name", "amount")):
+        selected = _selected(group, "flee")
+        if selected is None:
+            continue
+        names, codes = group["name"]
+        for code, lost in compress(zip(codes, group["amount"]), selected):
+            total = totals[names[code]]
+            total[0] += 1
+            total[1] += lost > 0
+            total[2] += lost
+    return dict(totals)
+
+
+def purchases(path: str) -> dict:
+    """
+    Returns the purchases made and refused for every item.
+
+    Returns:
+        dict: item -> [bought, refused, credits spent].
+    """
+    totals: dict = defaultdict(lambda: [0, 0, 0])
+    for group in read(path, ("kind", "name", "amount", "flag")):
+        selected = _selected(group, "purchase")
+        if selected is None:
+            continue
+        names, codes = group["name"]
+        for code, price, ok in compress(zip(codes, group["amount"], group["flag"]), selected):
+            total = totals[names[code]]
+            total[0 if ok else 1] += 1
+            total[2] += price if ok else 0
+    return dict(totals)
+
+
+def simulate(path: str, runs: int, seed: int) -> int:
+    """Plays mining runs with the headless engine and records them. Returns the rows."""
+    engine = Engine()
+    recorder = AnalyticsSink(path)
+    recorder.subscribe(engine)
+    rng = random.Random(seed)
+    miner = Miner()
+    for _ in range(runs):
+        engine.play(miner, rng)
+        if miner.game_over:
+            miner.reset()
+    rows = recorder.written + recorder.rows
+    recorder.close()
+    return rows
+
+
+def _table(header: tuple, rows: list) -> None:
+    widths = [max(len(str(row[index])) for row in [header, *rows]) for index in range(len(header))]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query Print Miner gameplay analytics.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (
+        ("gold", "gold found per mineral per level"),
+        ("deaths", "death rate per enemy"),
+        ("flees", "credits lost fleeing per enemy"),
+        ("purchases", "purchases per item"),
+    ):
+        commands.add_parser(command, help=help_text).add_argument("path")
+    simulated = commands.add_parser("simulate", help="record headless engine runs")
+    simulated.add_argument("path")
+    simulated.add_argument("--runs", type=int, default=100_000)
+    simulated.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "simulate":
+        rows = simulate(args.path, args.runs, args.seed)
+        print(f"{rows} rows recorded to {args.path}")
+    elif args.command == "gold":
+        totals = gold_per_mineral(args.path)
+        _table(
+            ("mineral", "level", "runs", "gold/run", "gold/size"),
+            [
+                (mineral, level, runs, f"{gold / runs:.1f}", f"{gold / max(size, 1):.2f}")
+                for (mineral, level), (runs, gold, size) in sorted(totals.items())
+            ],
+        )
+    elif args.command == "deaths":
+        totals = deaths_per_enemy(args.path)
+        _table(
+            ("enemy", "fights", "deaths", "death rate", "turns/fight"),
+            [
+                (enemy, fights, deaths, f"{deaths / fights:.1%}", f"{turns / fights:.1f}")
+                for enemy, (fights, deaths, turns) in sorted(totals.items())
+            ],
+        )
+    elif args.command == "flees":
+        totals = flee_losses(args.path)
+        _table(
+            ("enemy", "flees", "loss rate", "lost/flee"),
+            [
+                (enemy, flees, f"{lossy / flees:.1%}", f"{lost / flees:.1f}")
+                for enemy, (flees, lossy, lost) in sorted(totals.items())
+            ],
+        )
+    elif args.command == "purchases":
+        totals = purchases(args.path)
+        _table(
+            ("item", "bought", "refused", "spent"),
+            [(item, *total) for item, total in sorted(totals.items())],
+        )
+    print(f"({time.perf_counter() - started:.2f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
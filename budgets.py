@@ -0,0 +1,240 @@
+"""
+Print Miner Discord Bot Game - API Call Budgets
+
+This script plays every game flow offline, against the real game logic with the replay
+stand-ins of traces.py in place of Discord, and checks the Discord API calls each flow
+makes against its golden budget in budgets.json. A budget holds the flow's calls in
+order and the bytes they send. A flow fails when it makes a call its budget does not
+have, such as an extra edit per mined chunk or a redundant defer in a view, or when it
+sends more than BYTES_SLACK over its bytes. The failure shows a diff of the calls.
+
+Flows are deterministic: each plays from fixed seeds on a fresh player with a fixed
+mine map, and each mining flow uses the first seed, for both its click and its mine
+map, which mines its mineral.
+
+Usage:
+    python budgets.py            # check every flow, exit status 1 on a regression
+    python budgets.py --update   # accept the current calls as the new budgets
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import os
+import random
+import sys
+from traces import ReplaySession, ReplayInteraction
+from gameobjects import Miner, Shop, MINERALS
+from printminer import PrintMiner, MenuButtons, ShopButtons, FightButtons
+import gamebuttons
+import minemap
+
+BUDGETS_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budgets.json")
+BYTES_SLACK: float = 0.05  # share of a flow's bytes it may grow by before failing
+MAP_SEED: int = 1
+MAX_SEEDS: int = 1000  # seeds tried to find one which mines a mineral
+
+
+class FlowError(Exception):
+    """Raised when a flow can not be played as written, for example a missing button."""
+
+
+class Flow:
+    """
+    One player's session with the game, on a fresh player and message.
+
+    Args:
+        number (int): The session number, which gives the player and message ids.
+        map_seed (int): The seed of the player's mine map.
+    """
+
+    def __init__(self, number: int, map_seed: int = MAP_SEED):
+        self.session = ReplaySession(number)
+        self.player_id = self.session.user.id
+        self.miner = Miner(self.player_id)
+        self.miner.reset()
+        self.miner.map_seed = map_seed
+        Shop(self.player_id).reset()
+
+    def interaction(self) -> ReplayInteraction:
+        return ReplayInteraction(self.session)
+
+    def show(self, view) -> None:
+        """Puts buttons on the message as an earlier, unbudgeted step would have."""
+        self.session.view = view
+
+    async def click(self, view_name: str, label: str, seed: int = 0) -> None:
+        """Clicks a button on the message and waits for everything it started to end."""
+        item = self.session.button(view_name, label)
+        if item is None:
+            raise FlowError(f"no {view_name}.{label} button on the message")
+        self.session.view.rng = random.Random(seed)
+        await item.callback(self.interaction())
+        await settle()
+
+
+async def settle() -> None:
+    """Waits for every scheduled mining run and fight to end."""
+    while PrintMiner.scheduler.pending:
+        await asyncio.sleep(0)
+
+
+async def flow_start(flow: Flow) -> None:
+    await gamebuttons.load_game(flow.interaction())
+    await flow.click("LoadGameButtons", "Start")
+
+
+async def flow_mine(flow: Flow, seed: int) -> None:
+    flow.show(MenuButtons(flow.player_id))
+    await flow.click("MenuButtons", "Mine", seed)
+
+
+def mine_flow(mineral_id: int):
+    """Returns the flow of a mining run of one mineral, without an encounter after it."""
+
+    async def flow_mineral(flow: Flow) -> None:
+        number = flow.session.user.id
+        for seed in range(MAX_SEEDS):
+            trial = Flow(number + 100_000 + seed, map_seed=seed)
+            await flow_mine(trial, seed)
+            mined = trial.miner.inventory[mineral_id]
+            if mined and isinstance(trial.session.view, MenuButtons):  # no encounter
+                flow.miner.map_seed = seed
+                await flow_mine(flow, seed)
+                return
+        raise FlowError(f"no seed below {MAX_SEEDS} mines mineral {mineral_id} safely")
+
+    return flow_mineral
+
+
+def fight_flow(enemy_name: str, win: bool):
+    """Returns the flow of a fight against an enemy, the first one to end as wanted."""
+
+    async def flow_fight(flow: Flow) -> None:
+        enemy = next(enemy for enemy in minemap.ENEMIES if enemy.__name__ == enemy_name)
+        number = flow.session.user.id
+        for seed in range(MAX_SEEDS):
+            trial = Flow(number + 100_000 + seed)
+            trial.show(FightButtons(trial.player_id, enemy()))
+            await trial.click("FightButtons", "Attack", seed)
+            if trial.miner.game_over != win:
+                flow.show(FightButtons(flow.player_id, enemy()))
+                await flow.click("FightButtons", "Attack", seed)
+                return
+        raise FlowError(f"no seed below {MAX_SEEDS} ends a fight with {enemy_name} as wanted")
+
+    return flow_fight
+
+
+async def flow_flee(flow: Flow) -> None:
+    flow.show(FightButtons(flow.player_id, minemap.ENEMIES[0]()))
+    await flow.click("FightButtons", "Flee")
+
+
+def shop_flow(label: str):
+    """Returns the flow of one Shop button, for a player who can afford everything."""
+
+    async def flow_shop(flow: Flow) -> None:
+        flow.miner.gold_credits = 1_000_000
+        flow.miner.health = 1
+        flow.miner.inventory[0] = 10
+        flow.show(ShopButtons(flow.player_id))
+        await flow.click("ShopButtons", label)
+
+    return flow_shop
+
+
+async def flow_abort(flow: Flow) -> None:
+    flow.show(MenuButtons(flow.player_id))
+    await flow.click("MenuButtons", "Abort")
+
+
+def flows() -> dict:
+    """Returns every budgeted flow, by name."""
+    named = {"start": flow_start}
+    for mineral_id, mineral in enumerate(MINERALS):
+        named[f"mine_{mineral.__name__.lower()}"] = mine_flow(mineral_id)
+    named["fight_win"] = fight_flow("Bug", True)
+    named["fight_loss"] = fight_flow("Rockadillo", False)
+    named["flee"] = flow_flee
+    for label in ("Buy Health", "Buy Tool", "Buy Weapon", "Sell All"):
+        named[label.lower().replace(" ", "_")] = shop_flow(label)
+    named["abort"] = flow_abort
+    return named
+
+
+async def measure() -> dict:
+    """Plays every flow. Returns the calls and bytes of each, by flow name."""
+    PrintMiner.scheduler.tick = 0.0
+    results = {}
+    for number, (name, play) in enumerate(flows().items(), start=1):
+        flow = Flow(number)
+        await play(flow)
+        results[name] = {
+            "calls": [f"{call} {view}" if view else call for call, view, _ in flow.session.log],
+            "bytes": flow.session.sent_bytes,
+        }
+    return results
+
+
+def _summary(calls: list) -> str:
+    counts = {}
+    for call in calls:
+        counts[call.split()[0]] = counts.get(call.split()[0], 0) + 1
+    return ", ".join(f"{count} {call}" for call, count in sorted(counts.items()))
+
+
+def check(budgets: dict, results: dict) -> list:
+    """Returns a failure message for every flow over its budget or without one."""
+    failures = []
+    for name, result in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            failures.append(f"{name}: no budget, run with --update to add one")
+            continue
+        if result["calls"] != budget["calls"]:
+            diff = difflib.unified_diff(
+                budget["calls"], result["calls"], "budget", "now", lineterm="", n=1
+            )
+            failures.append(
+                f"{name}: calls changed ({_summary(budget['calls'])} -> "
+                f"{_summary(result['calls'])})\n    " + "\n    ".join(diff)
+            )
+        if result["bytes"] > budget["bytes"] * (1 + BYTES_SLACK):
+            failures.append(f"{name}: {result['bytes']} bytes sent, budget {budget['bytes']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the Discord API calls of every flow.")
+    parser.add_argument("--update", action="store_true", help="accept the current calls")
+    args = parser.parse_args()
+
+    results = asyncio.run(measure())
+    if args.update:
+        with open(BUDGETS_PATH, "w") as file:
+            json.dump(results, file, indent=1)
+            file.write("\n")
+        print(f"Wrote the budgets of {len(results)} flows to {BUDGETS_PATH}")
+        return
+
+    with open(BUDGETS_PATH) as file:
+        budgets = json.load(file)
+    for name, result in results.items():
+        print(f"{name:<16}{_summary(result['calls']):<48}{result['bytes']:>8} bytes")
+    failures = check(budgets, results)
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+    print(f"\nAll {len(results)} flows within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Print Miner Discord Bot Game - Run Checkpoints
+
+This module checkpoints every mining run and fight in flight, so a run cut short by a
+restart can be settled when the bot starts again. A run is fully described by the
+player's record when it started, the seed of its random source and, for a fight, the
+enemy: replaying the game engine from those gives the exact same run. The message the
+run is shown on and the order the runs started in are kept beside them.
+
+Each run takes one fixed-size slot of the checkpoint file for its lifetime. Starting a
+run writes its slot and ending the run frees the slot by clearing its kind, so
+checkpointing costs two small writes per run, none per step. Writes are unbuffered, so
+they survive the bot process crashing, though not the machine.
+
+Format (little endian):
+    header : magic "PMCK" (4 bytes), version (u16), snapshot version (u16)
+    slot   : kind (u8), enemy id (u8), player id (u64), channel id (u64),
+             message id (u64), seed (u64), run number (u32), player record
+             (snapshot.RECORD)
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import enum
+import os
+import struct
+from typing import NamedTuple
+from gameobjects import Miner, Shop
+import snapshot
+
+MAGIC: bytes = b"PMCK"
+VERSION: int = 2
+
+HEADER = struct.Struct("<4sHH")
+SLOT = struct.Struct(f"<BBQQQQI{snapshot.RECORD.size}s")
+FREE: bytes = bytes(1)  # the kind of a free slot
+
+
+class RunKind(enum.IntEnum):
+    """Enum class to represent what a checkpoint slot holds."""
+
+    FREE = 0
+    MINING = 1
+    FIGHT = 2
+
+
+class Checkpoint(NamedTuple):
+    kind: RunKind
+    enemy: int  # index into minemap.ENEMIES, for a fight
+    player_id: int
+    channel_id: int
+    message_id: int  # 0 if the run's message is not known
+    seed: int
+    number: int  # the order the run started in, among the runs of the file
+    record: bytes  # the player's snapshot record when the run started
+
+
+class CheckpointFile:
+    """
+    Writes the checkpoints of the runs in flight to a file of fixed-size slots.
+
+    Attributes:
+        slots (int): The slots in the file, used or free.
+        free (list): The free slots.
+        runs (int): The runs checkpointed so far.
+
+    Args:
+        path (str): The checkpoint file, replaced if it exists.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "w+b", buffering=0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, snapshot.VERSION))
+        self.slots = 0
+        self.free: list = []
+        self.runs = 0
+
+    def _offset(self, slot: int) -> int:
+        return HEADER.size + slot * SLOT.size
+
+    def begin(
+        self,
+        kind: RunKind,
+        miner: Miner,
+        seed: int,
+        channel_id: int,
+        message_id: int,
+        enemy: int = 0,
+    ) -> int:
+        """
+        Checkpoints a run before its first step.
+
+        Returns:
+            int: The slot of the run.
+        """
+        record = bytearray(snapshot.RECORD.size)
+        snapshot.pack_into(record, 0, miner, Shop(miner.player_id))
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.slots
+            self.slots += 1
+        self.file.seek(self._offset(slot))
+        self.file.write(
+            SLOT.pack(
+                kind, enemy, miner.player_id, channel_id, message_id, seed, self.runs, record
+            )
+        )
+        self.runs += 1
+        return slot
+
+    def end(self, slot: int) -> None:
+        """Frees the slot of a run which has ended."""
+        self.file.seek(self._offset(slot))
+        self.file.write(FREE)
+        self.free.append(slot)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def read(path: str) -> list:
+    """
+    Returns the checkpoints of the runs a checkpoint file still holds, if there is one.
+    A file written for another snapshot version holds no usable runs.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < HEADER.size:
+        return []
+    magic, version, snapshot_version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or snapshot_version != snapshot.VERSION:
+        return []
+    body = memoryview(data)[HEADER.size :]
+    body = body[: len(body) - len(body) % SLOT.size]  # a torn last slot
+    return [
+        Checkpoint(RunKind(fields[0]), *fields[1:])
+        for fields in SLOT.iter_unpack(body)
+        if fields[0] != RunKind.FREE
+    ]
+
+
+writer: CheckpointFile = None
+
+
+def start(path: str) -> None:
+    """Starts checkpointing runs to a file, replacing what it held."""
+    global writer
+    writer = CheckpointFile(path)
+
+
+def stop() -> None:
+    """Stops checkpointing, if runs are being checkpointed."""
+    global writer
+    if writer is not None:
+        writer.close()
+        writer = None
+
+
+def begin(kind: RunKind, miner: Miner, seed: int, interaction, enemy: int = 0) -> int:
+    """
+    Checkpoints a run shown on an interaction's message.
+
+    Returns:
+        int: The slot of the run, or None if runs are not being checkpointed.
+    """
+    if writer is None:
+        return None
+    message = interaction.message
+    return writer.begin(
+        kind,
+        miner,
+        seed,
+        interaction.channel_id or 0,
+        message.id if message is not None else 0,
+        enemy,
+    )
+
+
+def end(slot: int) -> None:
+    """Frees the slot of a run which has ended, if it was checkpointed."""
+    if slot is not None and writer is not None:
+        writer.end(slot)
@@ -0,0 +1,293 @@
+"""
+Print Miner Discord Bot Game - Client Profile Benchmark
+
+This script measures the memory and gateway load of each client profile in
+clientprofile.py, offline. Every profile runs in a fresh process: a discord.py client
+is built with the profile's options, its connection state is fed a GUILD_CREATE
+payload for every synthetic guild, then a simulated window of gateway traffic. Only
+the events Discord would send under the profile's intents are parsed, with message
+content blanked when the message content intent is off, just as Discord does.
+
+Slash commands and button clicks arrive as interactions under every profile, so they
+are the same for both and not simulated. The traffic rates are per guild and can be
+changed on the command line; the defaults are a modest, mostly idle community.
+
+Reported per profile:
+    rss_guilds_mb   : resident memory once every guild is loaded
+    rss_traffic_mb  : resident memory after the traffic window
+    events_per_sec  : gateway events delivered per second
+    parse_cpu_ms    : CPU time spent parsing the whole traffic window
+    cached_messages : messages held in the message cache
+    cached_members  : members held in the member caches
+
+Usage:
+    python clientbench.py --guilds 1000 --seconds 60
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import clientprofile
+
+CHANNELS: int = 25  # text channels per guild
+ROLES: int = 15  # roles per guild
+AUTHORS: int = 200  # distinct active members per guild
+BATCH: int = 10_000  # events built and parsed at a time
+
+# Gateway event -> (intent it needs, default events per guild per second)
+TRAFFIC: dict = {
+    "MESSAGE_CREATE": ("guild_messages", 0.05),
+    "TYPING_START": ("guild_typing", 0.03),
+    "MESSAGE_REACTION_ADD": ("guild_reactions", 0.01),
+}
+
+TIMESTAMP: str = "2026-10-19T00:00:00+00:00"
+
+
+def rss_mb() -> float:
+    """Returns the resident memory of this process in MiB."""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, not current
+
+
+def user(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"miner{user_id}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+    }
+
+
+def member(user_id: int, roles: list) -> dict:
+    return {
+        "user": user(user_id),
+        "roles": roles,
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def guild_payload(guild_id: int, bot_id: int) -> dict:
+    """Returns a GUILD_CREATE payload as a bot without the members intent receives it."""
+    base = guild_id * 1000
+    return {
+        "id": str(guild_id),
+        "name": f"guild {guild_id}",
+        "icon": None,
+        "owner_id": str(base + 1),
+        "afk_timeout": 300,
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "features": [],
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "premium_tier": 0,
+        "preferred_locale": "en-US",
+        "nsfw_level": 0,
+        "large": True,
+        "unavailable": False,
+        "member_count": AUTHORS * 5,
+        "emojis": [],
+        "stickers": [],
+        "roles": [
+            {
+                "id": str(base + 100 + role),
+                "name": f"role {role}",
+                "permissions": "0",
+                "position": role,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+            for role in range(ROLES)
+        ],
+        "channels": [
+            {
+                "id": str(base + 200 + channel),
+                "type": 0,
+                "name": f"channel-{channel}",
+                "position": channel,
+                "permission_overwrites": [],
+                "nsfw": False,
+                "topic": None,
+                "last_message_id": None,
+                "rate_limit_per_user": 0,
+            }
+            for channel in range(CHANNELS)
+        ],
+        "threads": [],
+        "voice_states": [],
+        "presences": [],
+        "members": [member(bot_id, [])],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+        "soundboard_sounds": [],
+    }
+
+
+def event_payload(name: str, event_id: int, guild_id: int, rng: random.Random, content: bool) -> dict:
+    """Returns the payload of one synthetic gateway event in a guild."""
+    base = guild_id * 1000
+    author = base + 300 + rng.randrange(AUTHORS)
+    channel_id = str(base + 200 + rng.randrange(CHANNELS))
+    roles = [str(base + 100 + rng.randrange(ROLES))]
+    if name == "MESSAGE_CREATE":
+        return {
+            "id": str(event_id),
+            "channel_id": channel_id,
+            "guild_id": str(guild_id),
+            "author": user(author),
+            "member": {
+                "roles": roles,
+                "joined_at": TIMESTAMP,
+                "deaf": False,
+                "mute": False,
+                "flags": 0,
+            },
+            "content": "anyone up for a mining run tonight?" if content else "",
+            "timestamp": TIMESTAMP,
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+    if name == "TYPING_START":
+        return {
+            "channel_id": channel_id,
+            "guild_id": str(guild_id),
+            "user_id": str(author),
+            "timestamp": 1_790_000_000,
+            "member": member(author, roles),
+        }
+    return {
+        "user_id": str(author),
+        "channel_id": channel_id,
+        "message_id": str(event_id),
+        "guild_id": str(guild_id),
+        "member": member(author, roles),
+        "emoji": {"id": None, "name": "⛏️"},
+        "type": 0,
+        "burst": False,
+    }
+
+
+async def measure(profile: str, guilds: int, seconds: float, rates: dict, seed: int) -> dict:
+    """Loads the guilds and the traffic into a client built with a profile."""
+    import discord
+
+    client = discord.Client(**clientprofile.client_options(profile))
+    state = client._connection
+    intents = state._intents
+    bot_id = 1
+    state.user = discord.ClientUser(state=state, data={**user(bot_id), "bot": True})
+
+    for guild_id in range(1, guilds + 1):
+        state.parse_guild_create(guild_payload(guild_id, bot_id))
+    rss_guilds = rss_mb()
+
+    # Every delivered event of the window, in arrival order.
+    rng = random.Random(seed)
+    events = []
+    for name, (intent, rate) in rates.items():
+        if getattr(intents, intent):
+            events += [(rng.random(), name) for _ in range(round(rate * guilds * seconds))]
+    events.sort()
+
+    # Payloads are built a batch at a time, outside the timing, so they do not weigh on
+    # the memory measured.
+    parse_cpu = 0.0
+    for batch_start in range(0, len(events), BATCH):
+        payloads = [
+            (name, event_payload(name, event_id, rng.randint(1, guilds), rng, intents.message_content))
+            for event_id, (_, name) in enumerate(
+                events[batch_start : batch_start + BATCH], start=10**15 + batch_start
+            )
+        ]
+        started = time.process_time()
+        for name, payload in payloads:
+            state.parsers[name](payload)
+        parse_cpu += time.process_time() - started
+        del payloads
+        await asyncio.sleep(0)  # let dispatched events run
+
+    return {
+        "profile": profile,
+        "guilds": guilds,
+        "rss_guilds_mb": round(rss_guilds, 1),
+        "rss_traffic_mb": round(rss_mb(), 1),
+        "events_per_sec": round(len(events) / seconds, 1),
+        "parse_cpu_ms": round(parse_cpu * 1000, 1),
+        "cached_messages": len(state._messages) if state._messages is not None else 0,
+        "cached_members": sum(len(guild._members) for guild in state.guilds),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the Print Miner client profiles.")
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=60.0, help="traffic window length")
+    parser.add_argument("--seed", type=int, default=0)
+    for name, (_, rate) in TRAFFIC.items():
+        parser.add_argument(
+            f"--{name.lower().replace('_', '-')}",
+            type=float,
+            default=rate,
+            help=f"{name} events per guild per second",
+        )
+    parser.add_argument("--profile", choices=clientprofile.PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    rates = {
+        name: (intent, getattr(args, name.lower()))
+        for name, (intent, _) in TRAFFIC.items()
+    }
+
+    if args.profile:  # one measurement, in a fresh process
+        print(json.dumps(asyncio.run(measure(args.profile, args.guilds, args.seconds, rates, args.seed))))
+        return
+
+    results = []
+    for profile in clientprofile.PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--profile", profile, *sys.argv[1:]],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+
+    names = [name for name in results[0] if name != "profile"]
+    print(f"{'':<18}" + "".join(f"{result['profile']:>12}" for result in results))
+    for name in names:
+        print(f"{name:<18}" + "".join(f"{result[name]:>12}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
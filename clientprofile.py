@@ -0,0 +1,77 @@
+"""
+Print Miner Discord Bot Game - Client Profiles
+
+This module holds the discord.py client settings of the bot. The game only reacts to
+slash commands and buttons, which Discord delivers whatever the intents, so the "lean"
+profile subscribes to the guilds intent alone and keeps no message or member cache.
+The "default" profile is the bot's original configuration.
+
+Profiles:
+    default : default intents plus message content, default caches, unlimited HTTP
+              connections
+    lean    : guilds intent only, no member cache, no guild chunking, no message
+              cache, a bounded keep-alive HTTP connection pool
+
+Usage:
+    PRINTMINER_PROFILE=lean python main.py
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import os
+import aiohttp
+import discord
+
+PROFILES: tuple = ("default", "lean")
+PROFILE: str = os.getenv("PRINTMINER_PROFILE", "default")
+
+CONNECTOR_LIMIT: int = 64  # concurrent HTTP connections, all to the Discord API host
+KEEPALIVE_SECONDS: float = 30.0
+DNS_CACHE_SECONDS: int = 300
+
+
+def _check(profile: str) -> None:
+    if profile not in PROFILES:
+        raise ValueError(f"unknown client profile {profile!r}, expected one of {PROFILES}")
+
+
+def intents(profile: str = PROFILE) -> discord.Intents:
+    """Returns the gateway intents of a profile."""
+    _check(profile)
+    if profile == "lean":
+        return discord.Intents(guilds=True)
+    intents = discord.Intents.default()
+    intents.message_content = True
+    return intents
+
+
+def client_options(profile: str = PROFILE) -> dict:
+    """Returns the discord.Client keyword arguments of a profile."""
+    options = {"intents": intents(profile)}
+    if profile == "lean":
+        options.update(
+            member_cache_flags=discord.MemberCacheFlags.none(),
+            chunk_guilds_at_startup=False,
+            max_messages=None,
+        )
+    return options
+
+
+def connector(profile: str = PROFILE) -> aiohttp.BaseConnector:
+    """
+    Returns the HTTP connector of a profile, or None for discord.py's default. Must be
+    called from the running event loop.
+    """
+    _check(profile)
+    if profile != "lean":
+        return None
+    return aiohttp.TCPConnector(
+        limit=CONNECTOR_LIMIT,
+        limit_per_host=CONNECTOR_LIMIT,
+        keepalive_timeout=KEEPALIVE_SECONDS,
+        ttl_dns_cache=DNS_CACHE_SECONDS,
+    )
@@ -0,0 +1,422 @@
+"""
+Print Miner Discord Bot Game - Content Packs
+
+This module keeps the game's content, the stats of every mineral, enemy, tool and
+weapon, out of the code. Content is written in a JSON data file and compiled into a
+compact binary content pack. The pack also holds the tables derived from the content,
+the spawn tables of the mine map and the market prices, so they are computed once when
+the pack is compiled instead of by every bot process.
+
+A pack is memory-mapped read-only, so every bot process on a machine shares one copy
+of it. Packs are written to a temporary file and renamed over the old one, so a process
+never maps a half-written pack and processes still mapping the old one keep it. Packs
+are only written by `python content.py` and by the bot when it starts and reloads.
+Importing the game never writes one: a missing or stale pack is compiled in memory
+instead, as it is on a read-only deploy.
+
+The bot watches the data file and the pack. Once either changes, it compiles the pack if
+needed and swaps to it between two steps of the game, so no run is dropped: runs in
+flight finish with the mineral or enemy they started with and players keep the tier of
+their tool and weapon. Hooks registered with on_swap() put the pack in play. Checks
+registered beside them refuse a pack that does not fit the code by raising
+ContentError. Every check runs before any hook, so a refused pack changes nothing.
+
+Format (little endian):
+    header   : magic "PMCP" (4 bytes), version (u16), mineral, enemy, tool and weapon
+               counts (u8 each)
+    minerals : key (24 bytes), name (24 bytes), size, gold, experience, market price
+               (u32 each)
+    enemies  : key, name, health, damage, gold credits (u32 each)
+    tools    : key, name, price, mining power (u32 each)
+    weapons  : key, name, price, damage (u32 each)
+    tables   : mineral spawn table, enemy spawn table (256 bytes each, random byte ->
+               mineral or enemy id)
+
+Usage:
+    python content.py            # compile content.json into content.pack
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+from typing import NamedTuple
+
+MAGIC: bytes = b"PMCP"
+VERSION: int = 1
+CONTENT_PATH: str = os.getenv(
+    "PRINTMINER_CONTENT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "content.json")
+)
+WATCH_SECONDS: float = 10.0  # how often the data file and the pack are checked for changes
+MAX_ITEMS: int = 8  # tiers of a catalog, as Shop stock masks are one byte in a snapshot
+
+HEADER = struct.Struct("<4sHBBBB")
+MINERAL = struct.Struct("<24s24sIIII")
+ENEMY = struct.Struct("<24s24sIII")
+ITEM = struct.Struct("<24s24sII")
+TABLE_SIZE: int = 256
+
+
+class ContentError(Exception):
+    """Raised when a content file or pack is malformed or does not fit the game."""
+
+
+class MineralRecord(NamedTuple):
+    key: str  # the name of the mineral's class in gameobjects
+    name: str
+    size: int
+    gold: int
+    experience: int
+    market_price: int  # of one chunk: a fifth of the mineral's top gold value
+
+
+class EnemyRecord(NamedTuple):
+    key: str  # the name of the enemy's class in gameobjects
+    name: str
+    health: int
+    damage: int
+    gold_credits: int
+
+
+class ItemRecord(NamedTuple):
+    key: str
+    name: str
+    price: int
+    power: int  # the mining power of a tool, the damage of a weapon
+
+
+def pack_path(source: str) -> str:
+    """Returns the path of the pack compiled from a data file."""
+    return os.path.splitext(source)[0] + ".pack"
+
+
+def spawn_table(weights: list) -> bytes:
+    """
+    Returns the table mapping a random byte to an id, each id getting a share of the
+    bytes by its weight. Equal weights share the bytes evenly, in id order.
+    """
+    total = sum(weights)
+    if total <= 0:
+        raise ContentError("spawn weights must add up to more than 0")
+    bounds = []
+    for weight in weights:
+        bounds.append((bounds[-1] if bounds else 0) + weight)
+    return bytes(bisect.bisect_right(bounds, byte * total >> 8) for byte in range(TABLE_SIZE))
+
+
+def _name(text: str) -> bytes:
+    encoded = str(text).encode()
+    if len(encoded) > 24:
+        raise ContentError(f"{text!r} is longer than 24 bytes")
+    return encoded
+
+
+def build(source: str = CONTENT_PATH, target: str = None) -> str:
+    """
+    Compiles a data file into a content pack file.
+
+    Args:
+        source (str): The JSON data file.
+        target (str): The pack, by default beside the data file.
+
+    Returns:
+        str: The path of the pack.
+    """
+    if target is None:
+        target = pack_path(source)
+    compiled = compile_pack(source)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(compiled)
+    os.replace(temporary, target)
+    return target
+
+
+def compile_pack(source: str = CONTENT_PATH) -> bytes:
+    """Compiles a data file into the bytes of a content pack."""
+    with open(source) as file:
+        data = json.load(file)
+
+    try:
+        minerals = data["minerals"]
+        enemies = data["enemies"]
+        tools = data["tools"]
+        weapons = data["weapons"]
+        if not 0 < len(minerals) <= 16 or not 0 < len(enemies) <= 8:
+            raise ContentError("a pack holds 1 to 16 minerals and 1 to 8 enemies")
+        if not 0 < len(tools) <= MAX_ITEMS or not 0 < len(weapons) <= MAX_ITEMS:
+            raise ContentError(f"a pack holds 1 to {MAX_ITEMS} tools and weapons")
+        counts = (len(minerals), len(enemies), len(tools), len(weapons))
+        chunks = [HEADER.pack(MAGIC, VERSION, *counts)]
+        chunks += [
+            MINERAL.pack(
+                _name(mineral["key"]),
+                _name(mineral["name"]),
+                mineral["size"],
+                mineral["gold"],
+                mineral["experience"],
+                mineral["gold"] // 5,
+            )
+            for mineral in minerals
+        ]
+        chunks += [
+            ENEMY.pack(
+                _name(enemy["key"]),
+                _name(enemy["name"]),
+                enemy["health"],
+                enemy["damage"],
+                enemy["gold_credits"],
+            )
+            for enemy in enemies
+        ]
+        chunks += [
+            ITEM.pack(_name(tool["key"]), _name(tool["name"]), tool["price"], tool["mining_power"])
+            for tool in tools
+        ]
+        chunks += [
+            ITEM.pack(
+                _name(weapon["key"]), _name(weapon["name"]), weapon["price"], weapon["damage"]
+            )
+            for weapon in weapons
+        ]
+        chunks.append(spawn_table([mineral.get("spawn_weight", 1) for mineral in minerals]))
+        chunks.append(spawn_table([enemy.get("spawn_weight", 1) for enemy in enemies]))
+    except (KeyError, TypeError, struct.error) as error:
+        raise ContentError(f"{source}: bad content ({error!r})") from error
+    return b"".join(chunks)
+
+
+def stale(source: str, target: str) -> bool:
+    """Returns whether a pack is missing or older than the data file it is compiled from."""
+    if not os.path.exists(target):
+        return True
+    return os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(target)
+
+
+def _identity(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _text(raw: bytes) -> str:
+    return raw.rstrip(b"\0").decode()
+
+
+class ContentPack:
+    """
+    A compiled content pack, memory-mapped read-only, or held in memory when it was
+    compiled without being written.
+
+    Attributes:
+        path (str): The pack file.
+        identity (tuple): The inode, modification time and size of the file when it was
+            mapped, or of the data file a pack in memory was compiled from, to tell when
+            a new pack replaces it.
+        mapped (bool): Whether the pack is mapped from its file.
+        minerals (tuple): The MineralRecord of every mineral, by mineral id.
+        enemies (tuple): The EnemyRecord of every enemy, by enemy id.
+        tools (tuple): The ItemRecord of every tool, by catalog id.
+        weapons (tuple): The ItemRecord of every weapon, by catalog id.
+        market_prices (tuple): The market price of one chunk of every mineral.
+        mineral_spawn (memoryview): The mineral spawn table, in the mapped file.
+        enemy_spawn (memoryview): The enemy spawn table, in the mapped file.
+
+    Args:
+        path (str): The pack file.
+        compiled (bytes): The pack, if it is held in memory instead of mapped.
+        identity (tuple): The identity of a pack held in memory.
+    """
+
+    def __init__(self, path: str, compiled: bytes = None, identity: tuple = None):
+        self.path = path
+        self.mapped = compiled is None
+        if self.mapped:
+            with open(path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if stat.st_size < HEADER.size:
+                    raise ContentError(f"{path}: not a content pack")
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        else:
+            if len(compiled) < HEADER.size:
+                raise ContentError(f"{path}: not a content pack")
+            self.map = compiled
+            self.identity = identity
+
+        view = memoryview(self.map)
+        magic, version, minerals, enemies, tools, weapons = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise ContentError(f"{path}: not a version {VERSION} content pack")
+        size = (
+            HEADER.size
+            + minerals * MINERAL.size
+            + enemies * ENEMY.size
+            + (tools + weapons) * ITEM.size
+            + 2 * TABLE_SIZE
+        )
+        if len(view) != size:
+            raise ContentError(f"{path}: {len(view)} bytes, expected {size}")
+
+        offset = HEADER.size
+        self.minerals, offset = _records(MineralRecord, MINERAL, view, offset, minerals)
+        self.enemies, offset = _records(EnemyRecord, ENEMY, view, offset, enemies)
+        self.tools, offset = _records(ItemRecord, ITEM, view, offset, tools)
+        self.weapons, offset = _records(ItemRecord, ITEM, view, offset, weapons)
+        self.market_prices = tuple(mineral.market_price for mineral in self.minerals)
+        self.mineral_spawn = view[offset : offset + TABLE_SIZE]
+        self.enemy_spawn = view[offset + TABLE_SIZE : offset + 2 * TABLE_SIZE]
+
+
+def _records(record, layout: struct.Struct, view: memoryview, offset: int, count: int):
+    """Returns `count` records of a layout from an offset, and the offset after them."""
+    records = tuple(
+        record(_text(key), _text(name), *stats)
+        for key, name, *stats in layout.iter_unpack(view[offset : offset + count * layout.size])
+    )
+    return records, offset + count * layout.size
+
+
+pack: ContentPack = None  # the pack in play
+hooks: list = []
+checks: list = []
+swaps: int = 0
+refused: tuple = None  # the identity of the last pack a check refused, not tried again
+last_error: str = None  # why the last reload failed, if it did
+
+
+def load(source: str = CONTENT_PATH, write: bool = False) -> ContentPack:
+    """
+    Returns the pack of a data file. A missing or stale pack is compiled, and written
+    beside the data file if `write` is set and the directory can be written; otherwise
+    it is held in memory.
+    """
+    target = pack_path(source)
+    if not stale(source, target):
+        return ContentPack(target)
+    if write:
+        try:
+            return ContentPack(build(source, target))
+        except OSError:  # a read-only deploy
+            pass
+    return ContentPack(target, compile_pack(source), ("memory",) + _identity(source))
+
+
+def current() -> ContentPack:
+    """Returns the pack in play, loading the pack of CONTENT_PATH the first time."""
+    global pack
+    if pack is None:
+        pack = load()
+    return pack
+
+
+def on_swap(hook, check=None) -> None:
+    """
+    Registers a hook which puts a pack in play, and calls it with the pack in play.
+
+    Args:
+        hook: Called with every new ContentPack, in registration order, once every
+            check accepted it.
+        check: Called with every new ContentPack before any hook. Raises ContentError
+            if the pack does not fit.
+    """
+    if check is not None:
+        checks.append(check)
+        check(current())
+    hooks.append(hook)
+    hook(current())
+
+
+def swap(new: ContentPack) -> None:
+    """
+    Puts a new pack in play. Raises ContentError if a check refused it, in which case
+    no hook has run.
+    """
+    global pack, swaps
+    for check in checks:
+        check(new)
+    for hook in hooks:
+        hook(new)
+    pack = new
+    swaps += 1
+
+
+def refresh(source: str = CONTENT_PATH) -> bool:
+    """
+    Compiles and writes the pack if its data file changed, and swaps to the pack if it
+    is not the one in play. A pack with the same content as the one in play, such as
+    the pack written when the bot starts, is taken on without a swap.
+
+    Returns:
+        bool: Whether a new pack was put in play.
+    """
+    global pack, refused
+    target = pack_path(source)
+    if stale(source, target):
+        new = load(source, write=True)  # tried again while the directory is read-only
+    elif _identity(target) in (refused, pack and pack.identity):
+        return False
+    else:
+        new = ContentPack(target)
+    if new.identity == refused or (pack is not None and new.identity == pack.identity):
+        return False
+    if pack is not None and new.map[:] == pack.map[:]:
+        pack = new
+        return False
+    try:
+        swap(new)
+    except ContentError:
+        refused = new.identity
+        raise
+    return True
+
+
+class Watcher:
+    """Looks for a new content pack, as a never-ending run of the game's scheduler."""
+
+    async def step(self) -> float:
+        global last_error
+        try:
+            if refresh():
+                last_error = None
+        except (ContentError, OSError, ValueError) as error:  # keep playing the old pack
+            last_error = str(error)
+        return WATCH_SECONDS
+
+
+def report() -> dict:
+    """Returns the pack in play, the times it was swapped and why a reload failed."""
+    name = None
+    if pack is not None:
+        name = os.path.basename(pack.path) + ("" if pack.mapped else " (in memory)")
+    return {
+        "content_pack": name,
+        "content_swaps": swaps,
+        "content_error": last_error,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile a Print Miner content pack.")
+    parser.add_argument("source", nargs="?", default=CONTENT_PATH)
+    parser.add_argument("--target", help="the pack, by default beside the data file")
+    args = parser.parse_args()
+
+    target = build(args.source, args.target)
+    compiled = ContentPack(target)
+    print(
+        f"Compiled {len(compiled.minerals)} minerals, {len(compiled.enemies)} enemies, "
+        f"{len(compiled.tools)} tools and {len(compiled.weapons)} weapons into {target} "
+        f"({compiled.identity[2]} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Print Miner Discord Bot Game - Co-op Mega Deposits
+
+This module lets many players mine one huge deposit in a channel together. Every player
+swings with their own tool, but a swing only adds to that player's own pending counter.
+The deposit merges the pending counters into its totals on a fixed cadence and edits the
+shared message then, so clicks never contend on shared state and the message is edited
+at most once per update however many players are mining. Gold and experience are paid to
+every contributor in one batch when the deposit breaks.
+
+The batching is not specific to mining: ChannelEffort, ChannelRun and ChannelButtons
+are shared with the raids of raid.py.
+Classes include: Accumulator, Ending, ChannelEffort, ChannelRun, ChannelButtons,
+MegaDeposit and CoopButtons.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import enum
+import random
+from gameobjects import Miner, Minerals, Odds
+from printminer import PrintMiner
+import playercache
+from StringProgressBar import progressBar
+import discord
+
+DEPOSIT_SIZE: int = 5000  # chunks in a mega deposit
+SWINGS_PER_RUN: int = 5  # swings started by one click, one per tick
+UPDATE_SECONDS: float = 2.0  # cadence of merging contributions and editing the message
+LIFETIME_SECONDS: float = 30 * 60  # an effort nobody completes ends after this long
+TOP_CONTRIBUTORS: int = 5
+
+DEPOSITS: dict = {}  # channel id -> the MegaDeposit open in it
+
+
+class Accumulator:
+    """
+    Per-player counters merged in batches.
+
+    add() only touches the pending counter of its own player. The shared totals change
+    only when the owner calls merge(), once per tick, so contributions never wait on
+    each other.
+
+    Attributes:
+        pending (dict): Amounts added since the last merge, by player id.
+        totals (dict): Merged amounts, by player id.
+        total (int): The sum of every merged amount.
+    """
+
+    def __init__(self):
+        self.pending: dict = {}
+        self.totals: dict = {}
+        self.total = 0
+
+    def add(self, player_id: int, amount: int) -> None:
+        """Adds to a player's pending amount."""
+        self.pending[player_id] = self.pending.get(player_id, 0) + amount
+
+    def merge(self) -> int:
+        """Merges every pending amount into the totals. Returns the amount merged."""
+        pending, self.pending = self.pending, {}
+        merged = 0
+        for player_id, amount in pending.items():
+            self.totals[player_id] = self.totals.get(player_id, 0) + amount
+            merged += amount
+        self.total += merged
+        return merged
+
+
+class Ending(enum.IntEnum):
+    """Enum class to represent how a channel effort ended."""
+
+    COMPLETED = 0  # the deposit broke, the boss fell
+    EXPIRED = 1  # nobody completed it in time
+    LOST = 2  # its message could not be edited any more
+    RESTART = 3  # closed by a drain
+
+
+class ChannelEffort:
+    """
+    A goal every player in a channel works towards together, stepped by the shared
+    scheduler. Subclasses say what a player contributes, when the goal is complete, what
+    it pays and how it is shown.
+
+    Attributes:
+        channel_id (int): The channel the effort is in.
+        message (discord.PartialMessage): The shared message, once it is sent. It is
+            edited through its channel, since interaction tokens expire after 15 minutes.
+        view (ChannelButtons): The button on the shared message.
+        amounts (Accumulator): What every player contributed, such as chunks or damage.
+        actions (Accumulator): The swings or attacks of every player.
+        players (set): The players with contributions still to land.
+        ticks_left (int): The updates left before the effort expires.
+
+    Args:
+        channel_id (int): The channel the effort is in.
+    """
+
+    OPEN: dict = {}  # channel id -> the effort open in it, one dict per subclass
+    VIEW: type = None  # the ChannelButtons subclass of the shared message
+    ALREADY_OPEN: str = ""  # the answer to opening a second effort in a channel
+    ACTIONS_PER_RUN: int = SWINGS_PER_RUN  # contributions started by one click
+
+    def __init__(self, channel_id: int):
+        self.channel_id = channel_id
+        self.message: discord.PartialMessage = None
+        self.view = self.VIEW(self)
+        self.amounts = Accumulator()
+        self.actions = Accumulator()
+        self.players: set = set()
+        self.ticks_left = int(LIFETIME_SECONDS / UPDATE_SECONDS)
+
+    def contribution(self, miner: Miner) -> int:
+        """Returns what one action of a miner contributes."""
+        raise NotImplementedError
+
+    def completed(self) -> bool:
+        """Returns whether the goal is complete, as of the last merge."""
+        raise NotImplementedError
+
+    def embed(self, ending: Ending = None) -> discord.Embed:
+        """Returns the shared message's embed, or its final one once the effort ended."""
+        raise NotImplementedError
+
+    def payout(self) -> None:
+        """Pays every contributor in one batch, for what was merged so far."""
+        raise NotImplementedError
+
+    def merge(self) -> int:
+        """Merges the contributions since the last update. Returns the amount merged."""
+        self.actions.merge()
+        return self.amounts.merge()
+
+    async def close(self, ending: Ending) -> None:
+        """Removes the effort from its channel and shows the final message, if it can."""
+        if self.OPEN.get(self.channel_id) is self:
+            del self.OPEN[self.channel_id]
+        self.view.stop()
+        try:
+            await self.message.edit(embed=self.embed(ending), view=None)
+        except discord.HTTPException:  # the message or the channel is gone
+            pass
+
+    async def step(self):
+        """Merges the contributions since the last update and shows the progress."""
+        if self.OPEN.get(self.channel_id) is not self:
+            return None  # closed early, by a drain
+        merged = self.merge()
+        self.ticks_left -= 1
+
+        if self.completed():
+            self.payout()
+            await self.close(Ending.COMPLETED)
+            return None
+        if self.ticks_left <= 0:
+            await self.close(Ending.EXPIRED)
+            return None
+
+        if merged:
+            try:
+                await self.message.edit(embed=self.embed())
+            except discord.HTTPException:
+                # Nobody can see the effort any more: pay out what was done so far and
+                # free the channel.
+                self.payout()
+                await self.close(Ending.LOST)
+                return None
+        return UPDATE_SECONDS
+
+    @classmethod
+    async def open(cls, interaction: discord.Interaction) -> None:
+        """Opens an effort in the interaction's channel, if none is open there."""
+        channel_id = interaction.channel_id
+        if not PrintMiner.admission.accepting():
+            await interaction.response.send_message(
+                "Print Miner is restarting, try again in a minute.", ephemeral=True
+            )
+            return
+        if channel_id in cls.OPEN:
+            await interaction.response.send_message(cls.ALREADY_OPEN, ephemeral=True)
+            return
+
+        effort = cls.OPEN[channel_id] = cls(channel_id, random.Random())
+        try:
+            response = await interaction.response.send_message(
+                embed=effort.embed(), view=effort.view
+            )
+        except discord.HTTPException:
+            del cls.OPEN[channel_id]
+            raise
+        effort.message = interaction.channel.get_partial_message(response.message_id)
+        PrintMiner.scheduler.call_later(UPDATE_SECONDS, effort)
+
+
+class ChannelRun:
+    """
+    The actions of one player on a channel effort, one per tick.
+
+    Attributes:
+        effort (ChannelEffort): The effort being worked on.
+        miner (Miner): The miner contributing.
+        actions_left (int): The actions still to land.
+    """
+
+    __slots__ = ("effort", "miner", "actions_left")
+
+    def __init__(self, effort: ChannelEffort, miner: Miner):
+        self.effort = effort
+        self.miner = miner
+        self.actions_left = effort.ACTIONS_PER_RUN
+
+    async def step(self):
+        """Lands one action and returns the delay until the next one."""
+        effort = self.effort
+        if effort.OPEN.get(effort.channel_id) is not effort:
+            return None  # the effort ended
+        effort.amounts.add(self.miner.player_id, effort.contribution(self.miner))
+        effort.actions.add(self.miner.player_id, 1)
+        self.actions_left -= 1
+        if self.actions_left > 0:
+            return 0
+        effort.players.discard(self.miner.player_id)
+        return None
+
+
+class ChannelButtons(discord.ui.View):
+    """
+    The button on the shared message of a channel effort. Every player in the channel
+    can use it. The view lives as long as its effort, which stops it when it closes.
+
+    Args:
+        effort (ChannelEffort): The effort the button contributes to.
+    """
+
+    def __init__(self, effort: ChannelEffort):
+        super().__init__(timeout=None)
+        self.effort = effort
+
+    async def join(self, interaction: discord.Interaction) -> None:
+        """Starts the clicking player's run on the effort, unless one is going."""
+        # The shared message shows the run on the next update, so only acknowledge it.
+        await interaction.response.defer()
+        effort = self.effort
+        player_id = interaction.user.id
+        if (
+            effort.OPEN.get(effort.channel_id) is not effort
+            or player_id in effort.players
+            or PrintMiner.admission.draining
+        ):
+            return
+        effort.players.add(player_id)
+        await playercache.load(player_id)  # the shared state, so the payout is written
+        PrintMiner.scheduler.call_later(0, ChannelRun(effort, Miner(player_id)))
+
+
+class CoopButtons(ChannelButtons):
+    """The button on a shared mega deposit message."""
+
+    @discord.ui.button(label="Mine", style=discord.ButtonStyle.success)
+    async def mine(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self.join(interaction)
+
+
+class MegaDeposit(ChannelEffort):
+    """
+    A deposit shared by every player in a channel. Its amounts are the chunks mined by
+    every player and its actions their swings.
+
+    Attributes:
+        mineral (Minerals): The mineral the deposit is made of.
+        size (int): The chunks in the deposit.
+        gold_per_chunk (float): The expected gold credits of one chunk.
+
+    Args:
+        channel_id (int): The channel the deposit is in.
+        rng (random.Random): The random source of the deposit.
+    """
+
+    OPEN = DEPOSITS
+    VIEW = CoopButtons
+    ALREADY_OPEN = "A mega deposit is already being mined in this channel."
+
+    def __init__(self, channel_id: int, rng: random.Random):
+        super().__init__(channel_id)
+        self.mineral: Minerals = rng.choice(Minerals.__subclasses__())()
+        self.size = DEPOSIT_SIZE
+        self.gold_per_chunk = Odds.GOLD * rng.randint(
+            self.mineral.get_lower_bound(self.mineral.gold), self.mineral.gold
+        )
+
+    @property
+    def remaining(self) -> int:
+        """Returns the chunks left to mine, as of the last merge."""
+        return max(self.size - self.amounts.total, 0)
+
+    def contribution(self, miner: Miner) -> int:
+        return miner.tool.mining_power
+
+    def completed(self) -> bool:
+        return self.remaining == 0
+
+    def embed(self, ending: Ending = None) -> discord.Embed:
+        """Returns the shared progress message's embed."""
+        name = self.mineral.name
+        title = {
+            None: f"Mega deposit of {name}",
+            Ending.COMPLETED: f"The {name} deposit broke!",
+            Ending.EXPIRED: f"The {name} deposit caved in",
+            Ending.LOST: f"The {name} deposit closed",
+            Ending.RESTART: f"The {name} deposit closed for a restart",
+        }[ending]
+        progress_bar: list = progressBar.filledBar(
+            self.size,
+            self.remaining,
+            15,
+            PrintMiner.PROGRESS_BAR_SLIDER,
+            PrintMiner.PROGRESS_BAR_LINE,
+        )
+        top = sorted(self.amounts.totals.items(), key=lambda entry: entry[1], reverse=True)
+        contributors = "\n".join(
+            f"<@{player_id}> : {chunks} chunks" for player_id, chunks in top[:TOP_CONTRIBUTORS]
+        )
+        return discord.Embed(
+            title=title,
+            description=f"```css\n chunks remaining : {self.remaining}"
+            + f"\n {progress_bar[0]}\n miners : {len(self.amounts.totals)}```"
+            + contributors,
+        )
+
+    def payout(self) -> None:
+        """Pays every contributor their share of the deposit in one batch."""
+        for player_id, chunks in self.amounts.totals.items():
+            miner = Miner(player_id)
+            miner.gold_credits += round(chunks * self.gold_per_chunk)
+            miner.experience += self.actions.totals.get(player_id, 0) * self.mineral.experience
+            miner.level_up()
+            playercache.changed(miner)
+
+
+async def start_deposit(interaction: discord.Interaction) -> None:
+    """Opens a mega deposit in the interaction's channel, if none is open there."""
+    await MegaDeposit.open(interaction)
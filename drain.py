@@ -0,0 +1,94 @@
+"""
+Print Miner Discord Bot Game - Graceful Drain
+
+This module shuts the bot down without cutting players off mid-run. On SIGTERM the bot
+drains: it stops admitting new games, mining runs and mega deposits, and lets the
+mining runs and fights in flight play out. Whatever is still running shortly before the
+deadline is played to the end at once and its final screen is shown. Open mega deposits
+pay out what was mined so far and close, and open raids pay out the damage dealt so
+far. The client then closes, which saves every
+player and flushes the trace, the analytics and the checkpoints, well within the
+deadline. A run whose final screen could not be shown in time is cut off: the player
+keeps its result, only the message is not updated.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import asyncio
+import time
+import discord
+import coop
+import raid
+from printminer import PrintMiner, DiscordRenderer
+
+DRAIN_SECONDS: float = 25.0  # from the signal to the client closing
+FAST_FORWARD_SECONDS: float = 5.0  # kept at the end of the drain to fast-forward runs
+CLOSE_SECONDS: float = 1.0  # kept at the very end for closing the client
+POLL_SECONDS: float = 0.25
+
+
+async def _show(run, event) -> None:
+    await DiscordRenderer.render(run.interaction, event, False)
+
+
+async def drain(client: discord.Client, deadline: float = DRAIN_SECONDS) -> dict:
+    """
+    Drains the bot, then closes the client.
+
+    Args:
+        client (discord.Client): The bot.
+        deadline (float): Seconds from now the client must be closing by.
+
+    Returns:
+        dict: What was drained: the sessions in flight when the drain began, those
+            which finished on their own, were fast-forwarded or were cut off, the
+            mega deposits and raids closed, the starts refused and the seconds taken.
+    """
+    started = time.monotonic()
+    admission = PrintMiner.admission
+    admission.draining = True
+    released = admission.released
+    report = {"in_flight": len(admission.in_flight())}
+
+    # Let the runs play out while there is time.
+    grace = deadline - FAST_FORWARD_SECONDS
+    while admission.in_flight() and time.monotonic() - started < grace:
+        await asyncio.sleep(POLL_SECONDS)
+    report["finished"] = admission.released - released
+
+    # Play the rest at once, pay out the open mega deposits, and show where each one
+    # ended up.
+    runs = admission.in_flight()
+    admission.queue.clear()
+    shows = []
+    for run in runs:
+        event = run.finish()
+        if event is not None:
+            shows.append(asyncio.ensure_future(_show(run, event)))
+    deposits = list(coop.DEPOSITS.values())
+    raids = list(raid.RAIDS.values())
+    for effort in deposits + raids:
+        effort.merge()
+        effort.payout()
+        shows.append(asyncio.ensure_future(effort.close(coop.Ending.RESTART)))
+    report["fast_forwarded"] = len(runs)
+    report["deposits_closed"] = len(deposits)
+    report["raids_closed"] = len(raids)
+
+    report["cut_off"] = 0
+    if shows:
+        timeout = max(0.0, deadline - (time.monotonic() - started) - CLOSE_SECONDS)
+        done, pending = await asyncio.wait(shows, timeout=timeout)
+        for show in pending:
+            show.cancel()
+        report["cut_off"] = len(pending) + sum(1 for show in done if show.exception())
+
+    report["refused"] = admission.refused
+    report["seconds"] = round(time.monotonic() - started, 2)
+    print("Drained: " + ", ".join(f"{name} {value}" for name, value in report.items()))
+    await client.close()
+    return report
@@ -0,0 +1,490 @@
+"""
+Print Miner Discord Bot Game - Game Engine
+
+This module holds the game rules of Print Miner without any Discord I/O. The engine is
+synchronous: every action changes the Miner and Shop, publishes typed events on the
+engine's event bus and returns at once. Timed flows (mining runs, fights) are stepped
+one frame at a time and each step returns the pause the game wants before the next
+frame, which the bot honours through its scheduler and headless callers ignore.
+
+The Discord bot renders the events with the renderer in printminer.py. Simulations,
+replays and batch jobs drive an Engine of their own without any subscriber.
+Classes include: the events, EventBus, MiningState, FightState and Engine.
+
+Usage:
+    python engine.py --runs 100000
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import enum
+import random
+import time
+from typing import NamedTuple
+import minemap
+from gameobjects import Miner, Shop, Enemy, Minerals, Odds, MINERAL_IDS
+
+
+class MiningStarted(NamedTuple):
+    player_id: int
+    mineral: Minerals
+    size: int
+    x: int
+    y: int
+    lair: type  # the Enemy subclass guarding the deposit, or None
+
+
+class ChunkMined(NamedTuple):
+    player_id: int
+    mineral: Minerals
+    index: int  # 0 for the first swing of the run
+    remaining: int  # chunks left before this swing
+    size: int
+    chunks: int  # chunks added to the inventory
+
+
+class GoldFound(NamedTuple):
+    player_id: int
+    mineral: Minerals
+    amount: int
+
+
+class LevelUp(NamedTuple):
+    player_id: int
+    level: int
+
+
+class MiningFinished(NamedTuple):
+    player_id: int
+    mineral: Minerals
+    gold_found: int
+    encounter: bool
+    size: int  # the mineral size when the run started
+    level: int  # the miner's level once the run is over
+
+
+class EnemyEncountered(NamedTuple):
+    player_id: int
+    enemy: Enemy
+
+
+class TurnResolved(NamedTuple):
+    player_id: int
+    enemy: Enemy
+    turn: int  # 1 for the first turn of the fight
+    miner_attacked: bool  # False when the enemy attacked
+    damage: int
+
+
+class FightEnded(NamedTuple):
+    player_id: int
+    enemy: Enemy
+    won: bool
+    turns: int
+    level: int
+
+
+class Fled(NamedTuple):
+    player_id: int
+    enemy: Enemy
+    lost_credits: int
+    level: int
+
+
+class Purchase(NamedTuple):
+    player_id: int
+    kind: str  # "health", "tool" or "weapon"
+    item: str
+    price: int
+    ok: bool
+    level: int
+
+
+class Sale(NamedTuple):
+    player_id: int
+    credits: int
+    level: int
+
+
+class EventBus:
+    """
+    Delivers every published event to its subscribers, synchronously and in order.
+
+    Attributes:
+        subscribers (dict): The handlers of every event type.
+        everything (list): The handlers of every event.
+    """
+
+    def __init__(self):
+        self.subscribers: dict = {}
+        self.everything: list = []
+
+    def subscribe(self, handler, *event_types: type) -> None:
+        """
+        Calls a handler with every event of the given types, or of every type if none
+        are given.
+        """
+        if not event_types:
+            self.everything.append(handler)
+        for event_type in event_types:
+            self.subscribers.setdefault(event_type, []).append(handler)
+
+    def publish(self, event) -> None:
+        """Delivers an event to its subscribers."""
+        for handler in self.everything:
+            handler(event)
+        for handler in self.subscribers.get(type(event), ()):
+            handler(event)
+
+
+class RunPhase(enum.IntEnum):
+    """Enum class to represent the next step of a mining run."""
+
+    CHUNKS = 0
+    LEVEL_UP = 1
+    ENCOUNTER = 2
+    FIGHT_ENCOUNTER = 3
+    DONE = 4
+
+
+class MiningState:
+    """
+    Holds the state of one mining run between steps.
+
+    Attributes:
+        miner (Miner): The miner doing the mining.
+        mineral (Minerals): The mineral being mined. Its size counts down as it is mined.
+        rng (random.Random): The random source of the run.
+        mineral_gold (int): The gold credits earned per gold find.
+        mineral_experience (int): The experience earned per chunk.
+        mineral_gold_count (int): The number of gold finds so far.
+        chunk_count (list): The chunks remaining after each swing, as a count down.
+        chunk_index (int): The index of the next chunk to mine.
+        size (int): The size of the mineral when the run started.
+        phase (RunPhase): The next step of the run.
+        lair (type): The Enemy subclass guarding the deposit, or None.
+        enemy (Enemy): The enemy met at the end of the run, if any.
+    """
+
+    __slots__ = (
+        "miner",
+        "mineral",
+        "rng",
+        "mineral_gold",
+        "mineral_experience",
+        "mineral_gold_count",
+        "chunk_count",
+        "chunk_index",
+        "size",
+        "phase",
+        "lair",
+        "enemy",
+    )
+
+    def __init__(
+        self,
+        miner: Miner,
+        mineral: Minerals,
+        rng: random.Random,
+        mineral_gold: int,
+        mineral_experience: int,
+        chunk_count: list,
+        size: int,
+        lair: type = None,
+    ):
+        self.miner = miner
+        self.mineral = mineral
+        self.rng = rng
+        self.mineral_gold = mineral_gold
+        self.mineral_experience = mineral_experience
+        self.mineral_gold_count = 0
+        self.chunk_count = chunk_count
+        self.chunk_index = 0
+        self.size = size
+        self.phase = RunPhase.CHUNKS
+        self.lair = lair
+        self.enemy = None
+
+
+class FightState:
+    """
+    Holds the state of one fight between steps.
+
+    Attributes:
+        miner (Miner): The player character (miner).
+        enemy (Enemy): The enemy being fought.
+        rng (random.Random): The random source of the fight.
+        turn (int): 0 when the enemy attacks next, 1 when the miner does.
+        turns (int): The turns resolved so far.
+    """
+
+    __slots__ = ("miner", "enemy", "rng", "turn", "turns")
+
+    def __init__(self, miner: Miner, enemy: Enemy, rng: random.Random, turn: int):
+        self.miner = miner
+        self.enemy = enemy
+        self.rng = rng
+        self.turn = turn
+        self.turns = 0
+
+
+class Engine:
+    """
+    Applies the game rules and publishes what happened on its event bus.
+
+    Attributes:
+        bus (EventBus): The bus the engine's events are published on.
+    """
+
+    def __init__(self):
+        self.bus = EventBus()
+
+    @staticmethod
+    def choose_enemy(rng: random.Random) -> Enemy:
+        """Returns a random enemy."""
+        return rng.choice(Enemy.__subclasses__())()
+
+    def start_mining(self, miner: Miner, rng: random.Random) -> MiningState:
+        """
+        Starts a mining run. The miner digs into a neighbouring cell of their mine map,
+        whose deposit sets the mineral type, and the mineral size is random.
+
+        Args:
+            miner (Miner): The miner that will perform the mining.
+            rng (random.Random): The random source of the run.
+
+        Returns:
+            MiningState: The run, to be stepped with mine_step().
+        """
+        mineral_class, lair = minemap.dig(miner, rng)
+        mineral: Minerals = mineral_class()
+        size: int = rng.randint(mineral.get_lower_bound(mineral.size), mineral.size)
+        mineral_gold: int = (
+            rng.randint(mineral.get_lower_bound(mineral.gold), mineral.gold)
+            * miner.tool.mining_power
+        )
+        mineral_experience: int = rng.randint(
+            mineral.get_lower_bound(mineral.experience), mineral.experience
+        )
+        miner.gold_found = 0  # Resets the amount of gold.
+        miner.game_over = False
+
+        # Creates a list of the chunks to be mined as a count down.
+        chunk_count: list = list(range(size, 0, -abs(miner.tool.mining_power)))
+
+        self.bus.publish(MiningStarted(miner.player_id, mineral, size, miner.x, miner.y, lair))
+        return MiningState(
+            miner, mineral, rng, mineral_gold, mineral_experience, chunk_count, size, lair
+        )
+
+    def mine_step(self, run: MiningState):
+        """
+        Mines the next chunk of a run, or finishes it.
+
+        Returns:
+            float: The seconds to pause before the next step, or None once the run is over.
+        """
+        miner = run.miner
+        publish = self.bus.publish
+
+        if run.phase == RunPhase.CHUNKS:
+            chunk = run.chunk_count[run.chunk_index]
+            run.mineral.size = chunk
+            mined = min(chunk, miner.tool.mining_power)
+            # The mined chunks go to the inventory, to be sold in the Shop.
+            miner.inventory[MINERAL_IDS[type(run.mineral)]] += mined
+            publish(
+                ChunkMined(miner.player_id, run.mineral, run.chunk_index, chunk, run.size, mined)
+            )
+
+            if run.rng.random() < Odds.GOLD:  # 60% chance of gold
+                miner.gold_credits += run.mineral_gold
+                run.mineral_gold_count += 1
+                publish(GoldFound(miner.player_id, run.mineral, run.mineral_gold))
+
+            # Calculate the amount of gold found in mineral.
+            miner.gold_found = run.mineral_gold_count * run.mineral_gold
+            miner.experience += run.mineral_experience
+
+            run.chunk_index += 1
+            if run.chunk_index < len(run.chunk_count):
+                return 0  # next chunk on the next tick
+            run.phase = RunPhase.LEVEL_UP
+
+        if run.phase == RunPhase.LEVEL_UP:
+            run.phase = RunPhase.ENCOUNTER
+            if miner.level_up():
+                publish(LevelUp(miner.player_id, miner.level))
+                return 1
+
+        if run.phase == RunPhase.ENCOUNTER:
+            # An encounter may follow the run, and always does in a lair.
+            encounter = run.lair is not None or run.rng.random() < Odds.ENCOUNTER
+            encounter = encounter and miner.game_over is False
+            publish(
+                MiningFinished(
+                    miner.player_id,
+                    run.mineral,
+                    miner.gold_found,
+                    encounter,
+                    run.size,
+                    miner.level,
+                )
+            )
+            if encounter:
+                run.phase = RunPhase.FIGHT_ENCOUNTER
+                return 0.5
+            run.phase = RunPhase.DONE
+            return None
+
+        if run.phase == RunPhase.FIGHT_ENCOUNTER:
+            run.enemy = run.lair() if run.lair is not None else Engine.choose_enemy(run.rng)
+            run.phase = RunPhase.DONE
+            publish(EnemyEncountered(miner.player_id, run.enemy))
+        return None
+
+    def start_fight(self, miner: Miner, enemy: Enemy, rng: random.Random) -> FightState:
+        """
+        Starts an automatic, random, turn based fight between the Miner and an Enemy.
+
+        Returns:
+            FightState: The fight, to be stepped with fight_step().
+        """
+        enemy.max_health = rng.randint(
+            enemy.get_lower_bound(enemy.max_health), enemy.max_health
+        )
+        return FightState(miner, enemy, rng, rng.randint(0, 1))
+
+    def fight_step(self, fight: FightState):
+        """
+        Resolves the next turn of a fight, or ends it.
+
+        Returns:
+            float: The seconds to pause before the next turn, or None once the fight is over.
+        """
+        miner, enemy = fight.miner, fight.enemy
+
+        if enemy.max_health > 0 and miner.health > 0:
+            fight.turns += 1
+            if fight.turn == 0:  # Enemy attack
+                enemy.damage = fight.rng.randint(
+                    enemy.get_lower_bound(enemy.damage), enemy.damage
+                )
+                miner.lose_health(enemy.damage)
+                self.bus.publish(
+                    TurnResolved(miner.player_id, enemy, fight.turns, False, enemy.damage)
+                )
+                fight.turn = 1
+            else:  # Miner attack
+                miner_damage = fight.rng.randint(
+                    miner.weapon.get_lower_bound(miner.weapon.damage),
+                    miner.weapon.damage,
+                )
+                enemy.lose_health(miner_damage)
+                self.bus.publish(
+                    TurnResolved(miner.player_id, enemy, fight.turns, True, miner_damage)
+                )
+                fight.turn = 0
+            return 1
+
+        won = enemy.max_health <= 0
+        if not won:
+            miner.game_over = True
+        self.bus.publish(FightEnded(miner.player_id, enemy, won, fight.turns, miner.level))
+        return None
+
+    def flee(self, miner: Miner, enemy: Enemy, rng: random.Random) -> int:
+        """
+        The miner flees from an enemy, with a chance to lose a random amount of credits.
+
+        Returns:
+            int: The credits the enemy stole.
+        """
+        lost_credits = 0
+        if rng.random() < Odds.FLEE_LOSS:  # 30% chance
+            lost_credits = rng.randint(enemy.gold_credits, enemy.gold_credits * 2)
+            miner.lose_credits(lost_credits)
+        self.bus.publish(Fled(miner.player_id, enemy, lost_credits, miner.level))
+        return lost_credits
+
+    def buy_health(self, miner: Miner, shop: Shop) -> bool:
+        """Buys full health in the Shop. Returns whether it was bought."""
+        price = Shop.get_health_price(miner)
+        ok = shop.purchase_health(miner)
+        self.bus.publish(
+            Purchase(miner.player_id, "health", "health", price, ok, miner.level)
+        )
+        return ok
+
+    def buy_tool(self, miner: Miner, shop: Shop) -> bool:
+        """Buys the tool for sale in the Shop. Returns whether it was bought."""
+        tool = shop.current_tool
+        ok = shop.purchase_tool(miner)
+        self.bus.publish(
+            Purchase(miner.player_id, "tool", tool.name, tool.price, ok, miner.level)
+        )
+        return ok
+
+    def buy_weapon(self, miner: Miner, shop: Shop) -> bool:
+        """Buys the weapon for sale in the Shop. Returns whether it was bought."""
+        weapon = shop.current_weapon
+        ok = shop.purchase_weapon(miner)
+        self.bus.publish(
+            Purchase(
+                miner.player_id, "weapon", weapon.name, weapon.price, ok, miner.level
+            )
+        )
+        return ok
+
+    def sell_all(self, miner: Miner, shop: Shop) -> int:
+        """Sells the Miner's whole inventory in the Shop. Returns the credits earned."""
+        credits = shop.sell_all(miner)
+        self.bus.publish(Sale(miner.player_id, credits, miner.level))
+        return credits
+
+    def play(self, miner: Miner, rng: random.Random) -> int:
+        """
+        Plays one mining run to the end without pauses, fighting whatever is met at the
+        end of it.
+
+        Returns:
+            int: The steps taken.
+        """
+        run = self.start_mining(miner, rng)
+        steps = 1
+        while self.mine_step(run) is not None:
+            steps += 1
+        if run.enemy is not None:
+            fight = self.start_fight(miner, run.enemy, rng)
+            while self.fight_step(fight) is not None:
+                steps += 1
+            steps += 1
+        return steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Print Miner engine headless.")
+    parser.add_argument("--runs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = Engine()
+    rng = random.Random(args.seed)
+    miner = Miner()
+    steps = 0
+    started = time.perf_counter()
+    for _ in range(args.runs):
+        steps += engine.play(miner, rng)
+        if miner.game_over:
+            miner.reset()
+    seconds = time.perf_counter() - started
+    print(f"{args.runs} runs, {steps} steps in {seconds:.2f}s: {steps / seconds:,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Print Miner Discord Bot Game - Expected-Value Tables
+
+This module works out, in closed form, what a player can expect from the game: the gold,
+experience and market value of a mining run with every tool tier on every mineral, the
+chance to win a fight and the health it costs with every weapon against every enemy,
+and the credits an enemy steals when the player flees. The tables are computed once per
+content pack, when it is put in play, so the Shop and stats screens show their hints
+with a lookup and balance tooling can read them instead of running simulations.
+
+Mining runs follow Engine.start_mining: a run mines ceil(size / mining power) chunks, each
+finding gold with Odds.GOLD and earning experience, and every chunk goes to the
+inventory at its market price. Fights follow Engine.fight_step. Which side opens is a
+coin flip and the miner's hits are independent, so a fight is decided by how many hits
+the miner needs and how much damage the enemy lands before the last of them. The enemy's
+damage is worked out exactly with a dynamic program over its total so far and its current
+damage, since each of its hits can be no harder than the last one.
+
+Usage:
+    python expectations.py
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import math
+import time
+from array import array
+from typing import NamedTuple
+from gameobjects import Odds, TOOL_CATALOG, WEAPON_CATALOG, ENEMY_IDS
+from scheduler import TICK_SECONDS
+import content
+import minemap
+
+HEALTH_LIMIT: int = 250  # miner health covered by the fight tables, higher is looked up here
+
+
+def _low(upper: int) -> int:
+    """The lower bound of a random stat, as get_lower_bound() in gameobjects."""
+    return round((4 * upper) / 5)
+
+
+def _mean(upper: int) -> float:
+    """The mean of a random stat, uniform from its lower bound to its upper bound."""
+    return (_low(upper) + upper) / 2
+
+
+class MiningExpectation(NamedTuple):
+    chunks: float  # chunks mined per run, one tick each
+    gold: float  # gold credits found per run
+    experience: float
+    market_value: float  # of the chunks added to the inventory
+    seconds: float
+
+    @property
+    def credits(self) -> float:
+        """The credits per run, found and from selling the chunks."""
+        return self.gold + self.market_value
+
+    @property
+    def credits_per_minute(self) -> float:
+        return 60 * self.credits / self.seconds if self.seconds else 0.0
+
+    @property
+    def experience_per_minute(self) -> float:
+        return 60 * self.experience / self.seconds if self.seconds else 0.0
+
+
+def mining_expectation(mineral: content.MineralRecord, mining_power: int) -> MiningExpectation:
+    """Returns the expected outcome of one mining run on a mineral with a tool."""
+    power = max(mining_power, 1)
+    sizes = range(_low(mineral.size), mineral.size + 1)
+    chunks = sum(math.ceil(size / power) for size in sizes) / len(sizes)
+    return MiningExpectation(
+        chunks,
+        chunks * Odds.GOLD * _mean(mineral.gold) * mining_power,
+        chunks * _mean(mineral.experience),
+        (sum(sizes) / len(sizes)) * mineral.market_price,
+        chunks * TICK_SECONDS,
+    )
+
+
+def hits_to_kill(health: int, damage: int) -> list:
+    """
+    Returns the chance that the miner needs n hits to kill an enemy, at index n.
+
+    Args:
+        health (int): The enemy's top health. It starts at random, from its lower bound.
+        damage (int): The weapon's damage. Every hit is random, from its lower bound.
+    """
+    if damage <= 0:
+        return []  # the enemy can not be killed
+    low = max(_low(damage), 1)
+    rolls = damage - low + 1
+    # needed[r]: the chances of needing n hits to take r health
+    needed = [[1.0]]
+    for remaining in range(1, health + 1):
+        chances = [0.0]
+        for hit in range(low, damage + 1):
+            for hits, chance in enumerate(needed[max(remaining - hit, 0)]):
+                if hits + 1 == len(chances):
+                    chances.append(0.0)
+                chances[hits + 1] += chance / rolls
+        needed.append(chances)
+
+    healths = range(_low(health), health + 1)
+    total = [0.0] * max(len(needed[start]) for start in healths)
+    for start in healths:
+        for hits, chance in enumerate(needed[start]):
+            total[hits] += chance / len(healths)
+    return total
+
+
+def damage_taken(damage: int, hits: int) -> tuple:
+    """
+    Works out the enemy's total damage after each number of its hits, up to `hits`.
+
+    Returns:
+        tuple: Two lists which hold, at [j][h], the chance that a miner with h health
+            survives j hits, and the expected damage of j hits they survive.
+    """
+    survived, expected = [], []
+    states = {damage: [1.0] + [0.0] * HEALTH_LIMIT}  # current damage -> total -> chance
+    for _ in range(hits + 1):
+        total = [0.0] * (HEALTH_LIMIT + 1)
+        for chances in states.values():
+            for taken, chance in enumerate(chances):
+                total[taken] += chance
+        # Running sums over the totals below each health.
+        below, damage_below = [0.0], [0.0]
+        for taken, chance in enumerate(total[:-1]):
+            below.append(below[-1] + chance)
+            damage_below.append(damage_below[-1] + taken * chance)
+        survived.append(below)
+        expected.append(damage_below)
+
+        following = {}
+        for current, chances in states.items():
+            low = _low(current)
+            share = 1 / (current - low + 1)
+            for hit in range(low, current + 1):
+                next_chances = following.setdefault(hit, [0.0] * (HEALTH_LIMIT + 1))
+                for taken, chance in enumerate(chances):
+                    if chance:
+                        next_chances[min(taken + hit, HEALTH_LIMIT)] += chance * share
+        states = following
+    return survived, expected
+
+
+class FightExpectation:
+    """
+    The chance to win a fight and the expected health lost, by the miner's health.
+
+    Attributes:
+        win (array): The chance to win, by health from 0 to HEALTH_LIMIT.
+        health_lost (array): The expected health lost, by health from 0 to HEALTH_LIMIT.
+    """
+
+    __slots__ = ("win", "health_lost")
+
+    def __init__(self, hits: list, survived: list, expected: list):
+        self.win = array("d", bytes(8 * (HEALTH_LIMIT + 1)))
+        self.health_lost = array("d", bytes(8 * (HEALTH_LIMIT + 1)))
+        for health in range(1, HEALTH_LIMIT + 1):
+            win = lost = 0.0
+            for needed, chance in enumerate(hits):
+                if not chance:
+                    continue
+                if needed == 0:  # the enemy starts without health
+                    win += chance
+                    continue
+                # The miner opens and takes needed - 1 hits, or the enemy opens and
+                # lands needed hits, before the miner's last hit.
+                for enemy_hits in (needed - 1, needed):
+                    alive = survived[enemy_hits][health]
+                    win += chance * alive / 2
+                    lost += chance * (expected[enemy_hits][health] + health * (1 - alive)) / 2
+            unfinished = 1 - sum(hits)  # a weapon without damage never wins
+            self.win[health] = win
+            self.health_lost[health] = lost + unfinished * health
+
+    def at(self, health: int) -> tuple:
+        """Returns the chance to win and the expected health lost at a health."""
+        index = min(max(health, 0), HEALTH_LIMIT)
+        return self.win[index], self.health_lost[index]
+
+
+def flee_loss(gold_credits: int, credits: int = None) -> float:
+    """
+    Returns the expected credits lost fleeing from an enemy, as in Engine.flee.
+
+    Args:
+        gold_credits (int): The enemy's gold credits. It steals between them and twice them.
+        credits (int): The miner's credits, which is the most they can lose. None for
+            a miner with more credits than any enemy steals.
+    """
+    low, high = gold_credits, gold_credits * 2
+    if credits is None or credits >= high:
+        stolen = (low + high) / 2
+    elif credits <= low:
+        stolen = credits
+    else:  # steals every amount up to the credits the miner has
+        stolen = (sum(range(low, credits)) + credits * (high - credits + 1)) / (high - low + 1)
+    return Odds.FLEE_LOSS * stolen
+
+
+class ExpectedValues:
+    """
+    The expected-value tables of one content pack.
+
+    Attributes:
+        mining (tuple): By tool id, the MiningExpectation of every mineral by mineral id.
+        mining_mix (tuple): By tool id, the MiningExpectation of a run on the mine map's
+            mix of minerals.
+        fights (tuple): By weapon id, the FightExpectation against every enemy by enemy id.
+        encounter (float): The chance of an enemy after a mining run.
+        enemy_odds (tuple): The chance of every enemy, by enemy id, once one is met.
+        flee (tuple): The expected credits lost fleeing, by enemy id.
+        seconds (float): The time taken to compute the tables.
+
+    Args:
+        pack (ContentPack): The content pack.
+    """
+
+    def __init__(self, pack: content.ContentPack):
+        started = time.perf_counter()
+        mineral_spawn = pack.mineral_spawn.tobytes()
+        spawn = [mineral_spawn.count(mineral_id) / 256 for mineral_id in range(len(pack.minerals))]
+        self.mining = tuple(
+            tuple(mining_expectation(mineral, tool.power) for mineral in pack.minerals)
+            for tool in pack.tools
+        )
+        self.mining_mix = tuple(
+            MiningExpectation(
+                *(
+                    sum(share * run[field] for share, run in zip(spawn, runs))
+                    for field in range(len(MiningExpectation._fields))
+                )
+            )
+            for runs in self.mining
+        )
+
+        # An enemy is met in a lair, picked by the enemy spawn table, or by chance after
+        # any other run, picked evenly.
+        lair = minemap._LAIR_TABLE.count(0xF0) / 256
+        by_chance = (1 - lair) * Odds.ENCOUNTER
+        self.encounter = lair + by_chance
+        enemy_spawn = pack.enemy_spawn.tobytes()
+        self.enemy_odds = tuple(
+            (lair * enemy_spawn.count(enemy_id) / 256 + by_chance / len(pack.enemies))
+            / self.encounter
+            for enemy_id in range(len(pack.enemies))
+        )
+
+        self.fights = []
+        hits = [
+            [hits_to_kill(enemy.health, weapon.power) for enemy in pack.enemies]
+            for weapon in pack.weapons
+        ]
+        for enemy_id, enemy in enumerate(pack.enemies):
+            most = max(len(weapon_hits[enemy_id]) for weapon_hits in hits)
+            survived, expected = damage_taken(enemy.damage, most)
+            for weapon_id, weapon_hits in enumerate(hits):
+                if enemy_id == 0:
+                    self.fights.append([])
+                self.fights[weapon_id].append(
+                    FightExpectation(weapon_hits[enemy_id], survived, expected)
+                )
+        self.fights = tuple(tuple(fights) for fights in self.fights)
+        self.flee = tuple(flee_loss(enemy.gold_credits) for enemy in pack.enemies)
+        self.seconds = time.perf_counter() - started
+
+    def fight(self, weapon_id: int, enemy_id: int, health: int) -> tuple:
+        """Returns the chance to win and the expected health lost in one fight."""
+        return self.fights[weapon_id][enemy_id].at(health)
+
+    def any_fight(self, weapon_id: int, health: int) -> tuple:
+        """
+        Returns the chance to win and the expected health lost against whichever enemy
+        a mining run turns up.
+        """
+        win = lost = 0.0
+        for odds, fight in zip(self.enemy_odds, self.fights[weapon_id]):
+            fight_win, fight_lost = fight.at(health)
+            win += odds * fight_win
+            lost += odds * fight_lost
+        return win, lost
+
+
+tables: ExpectedValues = None
+
+
+def use_pack(pack: content.ContentPack) -> None:
+    """Computes the tables of a content pack as it is put in play."""
+    global tables
+    tables = ExpectedValues(pack)
+
+
+content.on_swap(use_pack)
+
+
+def mining_hint(tool) -> str:
+    """Returns the expected gain of a mining run with a tool, for the stats screen."""
+    run = tables.mining_mix[TOOL_CATALOG.ids[tool.name]]
+    return (
+        f"~{run.credits:.0f} credits, {run.experience:.0f} xp per run "
+        f"({run.credits_per_minute:.0f} credits/min)"
+    )
+
+
+def fight_hint(weapon, health: int) -> str:
+    """Returns the chance to win a fight with a weapon at a health, for the stats screen."""
+    win, lost = tables.any_fight(WEAPON_CATALOG.ids[weapon.name], health)
+    return f"{win:.0%} to win a fight, ~{lost:.0f} health lost"
+
+
+def tool_upgrade_hint(tool, upgrade) -> str:
+    """Returns the extra credits per minute a tool upgrade gives, for the Shop."""
+    if upgrade.name not in TOOL_CATALOG.ids:
+        return ""  # sold out
+    now = tables.mining_mix[TOOL_CATALOG.ids[tool.name]].credits_per_minute
+    then = tables.mining_mix[TOOL_CATALOG.ids[upgrade.name]].credits_per_minute
+    return f" *(+{then - now:.0f} credits/min)*"
+
+
+def weapon_upgrade_hint(weapon, upgrade, health: int) -> str:
+    """Returns how a weapon upgrade changes the chance to win a fight, for the Shop."""
+    if upgrade.name not in WEAPON_CATALOG.ids:
+        return ""
+    now, _ = tables.any_fight(WEAPON_CATALOG.ids[weapon.name], health)
+    then, _ = tables.any_fight(WEAPON_CATALOG.ids[upgrade.name], health)
+    return f" *(win {now:.0%} -> {then:.0%})*"
+
+
+def encounter_hint(miner, enemy) -> str:
+    """Returns what fighting and fleeing an enemy are expected to cost, for an encounter."""
+    enemy_id = ENEMY_IDS.get(type(enemy))
+    if enemy_id is None:
+        return ""
+    win, lost = tables.fight(WEAPON_CATALOG.ids[miner.weapon.name], enemy_id, miner.health)
+    fled = flee_loss(enemy.gold_credits, miner.gold_credits)
+    return (
+        f"\n*Fight : {win:.0%} to win, ~{lost:.0f} health lost."
+        f" Flee : ~{fled:.0f} credits lost.*"
+    )
+
+
+def main() -> None:
+    pack = content.current()
+    print(f"Tables of {pack.path}, computed in {tables.seconds * 1000:.1f} ms\n")
+
+    print(f"{'tool':<12}{'mineral':<12}{'chunks':>8}{'credits':>9}{'xp':>7}{'cr/min':>8}")
+    for tool, runs in zip(pack.tools, tables.mining):
+        for mineral, run in zip(pack.minerals, runs):
+            print(
+                f"{tool.name:<12}{mineral.name:<12}{run.chunks:>8.1f}{run.credits:>9.1f}"
+                f"{run.experience:>7.1f}{run.credits_per_minute:>8.1f}"
+            )
+        mix = tables.mining_mix[pack.tools.index(tool)]
+        print(
+            f"{tool.name:<12}{'(mix)':<12}{mix.chunks:>8.1f}{mix.credits:>9.1f}"
+            f"{mix.experience:>7.1f}{mix.credits_per_minute:>8.1f}"
+        )
+
+    print(f"\nencounter chance {tables.encounter:.1%}, fights at 50 health")
+    print(f"{'weapon':<12}{'enemy':<12}{'odds':>7}{'win':>7}{'lost':>7}{'flee':>7}")
+    for weapon_id, weapon in enumerate(pack.weapons):
+        for enemy_id, enemy in enumerate(pack.enemies):
+            win, lost = tables.fight(weapon_id, enemy_id, 50)
+            print(
+                f"{weapon.name:<12}{enemy.key:<12}{tables.enemy_odds[enemy_id]:>7.1%}"
+                f"{win:>7.1%}{lost:>7.1f}{tables.flee[enemy_id]:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
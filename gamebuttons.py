@@ -13,27 +13,34 @@ Date updated:
 """
 
 
-from printminer import MenuButtons
+from printminer import MenuButtons, LoadDisplays, GameView, PrintMiner, Final
 import discord
 
 async def load_game(interaction: discord.Interaction):
+    if not PrintMiner.admission.accepting():
+        await interaction.response.send_message(
+            "Print Miner is restarting, try again in a minute.", ephemeral = True
+        )
+        return
+
     embed = discord.Embed(
         title = "Ready to mine?",
     )
 
     view = LoadGameButtons()
     await interaction.response.send_message(embed = embed, view = view)
+    LoadDisplays.views.show(interaction.user.id, None, view) # message id comes with the first click
 
-class LoadGameButtons(discord.ui.View):
+class LoadGameButtons(GameView):
     def __init__(self):
-        super().__init__(timeout = None)
+        super().__init__(timeout = Final.BUTTON_TIMEOUT)
 
     @discord.ui.button(label = "Start",
                        style = discord.ButtonStyle.success)
     async def start_mine(self, interaction: discord.Interaction, button:discord.ui.Button):
-        await interaction.response.defer()
-        view = MenuButtons()
-        await interaction.edit_original_response(
+        view = MenuButtons(interaction.user.id)
+        await LoadDisplays.edit(
+            interaction,
             embed = discord.Embed(
                 title = "Welcome!"
             ) ,view = view
@@ -42,8 +49,8 @@ class LoadGameButtons(discord.ui.View):
     @discord.ui.button(label = "Cancel",
                        style = discord.ButtonStyle.red)
     async def cancel_mine(self, interaction: discord.Interaction, button:discord.ui.Button):
-        await interaction.response.defer()
-        await interaction.edit_original_response(
+        await LoadDisplays.edit(
+            interaction,
             embed = discord.Embed(
                 title = "*mining cancelled*"
             ) ,view = None # removes buttons
@@ -4,6 +4,10 @@ Print Miner Discord Bot Game - Game Objects
 This module has all Print Miner objects. 
 Classes include: Miner, Shop, Item, and Minerals.
 
+The stats of every mineral, enemy, tool and weapon come from the content pack in play
+(see content.py). Minerals and enemies keep a class each, which the pack's records are
+matched to by name; tools and weapons are plain catalog entries.
+
 Author:
     Sonya C
 
@@ -14,10 +18,14 @@ Date updated:
 
 import random
 import math
+import operator
+import time
+from array import array
+import content
 
 
 class Singleton(type):
-    """Used in the Shop and Miner class
+    """Used in the Shop and Miner class. Keeps one instance per player id.
 
     Args:
         type (_type_): _description_
@@ -27,11 +35,36 @@ class Singleton(type):
     """
 
     _instances = {}
+    last_used: dict = {}  # player id -> time.monotonic() of the player's last lookup
+    lookups: int = 0
+    thaw = None  # called with the id of a player not in memory, may bring them back
+
+    def __call__(cls, player_id: int = 0):
+        players = cls._instances.setdefault(cls, {})
+        Singleton.last_used[player_id] = time.monotonic()
+        Singleton.lookups += 1
+        if player_id not in players:
+            if Singleton.thaw is not None:
+                Singleton.thaw(player_id)
+            if player_id not in players:
+                players[player_id] = super(Singleton, cls).__call__(player_id)
+        return players[player_id]
+
+    def instances(cls) -> dict:
+        """Returns the instance of every player, by player id."""
+        return cls._instances.setdefault(cls, {})
+
+    def shrink(cls) -> None:
+        """Copies the instances into a new dict, as a dict never shrinks as items leave."""
+        cls._instances[cls] = dict(cls.instances())
+
+
+class Odds:
+    """Chances used by the game loop in PrintMiner and by the economy simulator."""
 
-    def __call__(cls, *args, **kwargs):
-        if cls not in cls._instances:
-            cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
-        return cls._instances[cls]
+    GOLD: float = 0.60  # chance of gold per mined chunk
+    ENCOUNTER: float = 0.50  # chance of an enemy after a mining run
+    FLEE_LOSS: float = 0.30  # chance of losing credits while fleeing
 
 
 class Item:
@@ -94,49 +127,85 @@ class Weapon(Item):
         return round((4 * upperbound) / 5)
 
 
-class Hammer(Weapon):
+class NoMoreTools(Tool):
+    """Represents an out of stock Item."""
     def __init__(self):
-        super().__init__("Hammer", 0, 20)  # default tool
+        super().__init__("(out of stock)", 0, 0)
 
 
-class HammerII(Weapon):
-    def __init__(self):
-        super().__init__("HammerII", 200, 30)
+OUT_OF_STOCK: Tool = NoMoreTools()
 
 
-class UltraHam(Weapon):
-    def __init__(self):
-        super().__init__("UltraHam", 800, 50)
+class Catalog:
+    """
+    An indexed list of every tier of one kind of item, in upgrade order.
+    The index of an item is its catalog id. Tier 0 is the free default item.
 
+    Players hold catalog ids and stock bitmasks instead of item instances: bit `i` of a
+    stock mask is set while the item with catalog id `i` is still for sale.
 
-class Pickaxe(Tool):
-    def __init__(self):
-        super().__init__("Pickaxe", 0, 1)  # default tool
+    Attributes:
+        items (tuple): The item of every catalog id.
+        ids (dict): The catalog id of every item, by item name.
+        full_stock (int): The stock mask of a new Shop, every tier but the default one.
+        listings (tuple): The Shop listing of every catalog id.
+        sold_out (str): The Shop listing once every tier has been bought.
 
+    Args:
+        kind (str): The label of the items in the Shop, e.g. "Tool".
+        items (Item): The items, in upgrade order.
+    """
 
-class PickaxeII(Tool):
-    def __init__(self):
-        super().__init__("PickaxeII", 250, 2)
+    def __init__(self, kind: str, *items: Item):
+        self.kind = kind
+        self.sold_out = f"{kind} : **{OUT_OF_STOCK.name}** for {OUT_OF_STOCK.price}"
+        self.load(items)
+
+    def load(self, items: tuple) -> None:
+        """Replaces every tier at once, keeping the catalog object other modules hold."""
+        self.items = tuple(items)
+        self.ids = {item.name: index for index, item in enumerate(self.items)}
+        self.full_stock = ((1 << len(self.items)) - 1) & ~1
+        self.listings = tuple(
+            f"{self.kind} : **{item.name}** for {item.price}" for item in self.items
+        )
 
+    def __getitem__(self, catalog_id: int) -> Item:
+        return self.items[catalog_id]
 
-class UltraPick(Tool):
-    def __init__(self):
-        super().__init__("UltraPick", 1000, 3)
+    def __len__(self) -> int:
+        return len(self.items)
 
+    def id_of(self, item: Item) -> int:
+        """Returns the catalog id of an item."""
+        return self.ids[item.name]
 
-class NoMoreTools(Tool):
-    """Represents an out of stock Item."""
-    def __init__(self):
-        super().__init__("(out of stock)", 0, 0)
+    @staticmethod
+    def next_id(stock: int) -> int:
+        """Returns the catalog id of the next item for sale, or -1 when sold out."""
+        return (stock & -stock).bit_length() - 1
+
+    def next_for_sale(self, stock: int) -> Item:
+        """Returns the next item for sale for a stock mask."""
+        return self.items[Catalog.next_id(stock)] if stock else OUT_OF_STOCK
+
+    def listing(self, stock: int) -> str:
+        """Returns the Shop listing of the next item for sale for a stock mask."""
+        return self.listings[Catalog.next_id(stock)] if stock else self.sold_out
+
+
+TOOL_CATALOG = Catalog("Tool")  # filled from the content pack in play, see use_pack()
+WEAPON_CATALOG = Catalog("Weapon")
 
 
 class Miner(metaclass=Singleton):
     """
     Represents a miner in the Print Miner game.
 
-    There can only be one instance of the miner per game.
+    There can only be one instance of the miner per player.
 
     Attributes:
+        player_id (int): The Discord user id of the player.
         name (str): The name of the miner.
         gold_credits (int): The amount of gold credits the miner has.
         health (int): The current health of the miner.
@@ -147,32 +216,52 @@ class Miner(metaclass=Singleton):
         experience (int): The experience points of the miner.
         game_over (bool): Whether the game is over for the miner.
         level (int): The current level of the miner.
+        map_seed (int): The seed the miner's mine map is generated from.
+        x (int): The miner's column on the mine map.
+        y (int): The miner's row on the mine map.
+        inventory (array): The chunks of every mineral mined and not sold yet, by
+            mineral id.
     """
 
-    def __init__(self):
+    def __init__(self, player_id: int = 0):
+        self.player_id = player_id
         self.name = "[MINER]"
         self.gold_credits = 0
         self.health = 50
         self.max_health = 50
-        self.weapon = Hammer()
-        self.tool = Pickaxe()
+        self.weapon = WEAPON_CATALOG[0]
+        self.tool = TOOL_CATALOG[0]
         self.gold_found = 0
         self.experience = 0
         self.game_over = False
         self.level = 1
+        self.map_seed = random.getrandbits(32)
+        self.x = 0
+        self.y = 0
+        self.inventory = array("I", EMPTY_INVENTORY)
 
-    def reset(self):
-        """Resets all attributes of the Miner once the user aborts the game."""
+    def reset(self, rng: random.Random = None):
+        """
+        Resets all attributes of the Miner once the user aborts the game.
+
+        Args:
+            rng (random.Random): The random source of the click which started over, so
+                a replayed trace digs the same new mine. The global one if not given.
+        """
         self.name = "[MINER]"
         self.gold_credits = 0
         self.health = 50
         self.max_health = 50
-        self.weapon = Hammer()
-        self.tool = Pickaxe()
+        self.weapon = WEAPON_CATALOG[0]
+        self.tool = TOOL_CATALOG[0]
         self.gold_found = 0
         self.experience = 0
         self.game_over = False
         self.level = 1
+        self.map_seed = (rng or random).getrandbits(32)  # a new game digs a new mine
+        self.x = 0
+        self.y = 0
+        self.inventory = array("I", EMPTY_INVENTORY)
 
     def heal(self) -> None:
         """Miner health is set to the maximum health."""
@@ -242,11 +331,14 @@ class Minerals:
         value (int): The value of the mineral in gold credits.
 
     Args:
-        name (str): The name of the mineral.
+        name (str): The name of the mineral. Without it, the stats of the mineral's
+            class come from the content pack in play.
         value (int): The value of the mineral in gold credits.
     """
 
-    def __init__(self, name, size, gold, experience):
+    def __init__(self, name=None, size=0, gold=0, experience=0):
+        if name is None:
+            _, name, size, gold, experience, _ = MINERAL_RECORDS[MINERAL_IDS[type(self)]]
         self.name = name
         self.size = size
         self.gold = gold
@@ -270,38 +362,46 @@ class Minerals:
 
 
 class Rock(Minerals):
-    def __init__(self):
-        super().__init__("rock", 5, 5, 10)
+    pass
 
 
 class Stone(Minerals):
-    def __init__(self):
-        super().__init__("stone", 10, 10, 20)
+    pass
 
 
 class Gold(Minerals):
-    def __init__(self):
-        super().__init__("gold", 20, 50, 50)
+    pass
 
 
 class Albamorium(Minerals):
-    def __init__(self):
-        super().__init__("albamorium", 35, 10, 20)
+    pass
 
 
 class Igsite(Minerals):
-    def __init__(self):
-        super().__init__("igsite", 10, 10, 1)
+    pass
+
+
+MINERALS: list = Minerals.__subclasses__()  # mineral id -> Minerals subclass
+MINERAL_IDS: dict = {mineral: mineral_id for mineral_id, mineral in enumerate(MINERALS)}
+MINERAL_RECORDS: list = []  # mineral id -> content.MineralRecord
+EMPTY_INVENTORY: array = array("I", bytes(4 * len(MINERALS)))
+
+# Market price of one chunk of every mineral, by mineral id, from the content pack.
+MARKET_PRICES: array = array("I", EMPTY_INVENTORY)
 
 
 class Shop(metaclass=Singleton):
     """
     Represents a shop in the Print Miner game. 
-    The shop is a singleton, so there can only be one shop instance in the game.
+    The shop is a singleton, so there can only be one shop instance per player.
+
+    The items come from the TOOL_CATALOG and WEAPON_CATALOG. Each shop only keeps
+    a stock bitmask per catalog, so the next item for sale is a single lookup.
 
     Attributes:
-        tools (list): A list of tools available for purchase in the shop.
-        weapons (list): A list of weapons available for purchase in the shop.
+        player_id (int): The Discord user id of the player.
+        tool_stock (int): Bitmask of the catalog ids of the tools still for sale.
+        weapon_stock (int): Bitmask of the catalog ids of the weapons still for sale.
         current_tool (Tool): The tool currently being displayed in the shop.
         current_weapon (Weapon): The weapon currently being displayed in the shop.
 
@@ -323,20 +423,33 @@ class Shop(metaclass=Singleton):
         purchase_weapon(miner: Miner) -> bool:
             Attempts to purchase the current weapon for the miner. 
             Returns True if successful, False otherwise.
+        display_inventory(miner: Miner) -> str:
+            Returns a string representation of the miner's minerals and their value.
+        sell_all(miner: Miner) -> int:
+            Sells every mineral of the miner. Returns the credits earned.
     """
 
-    def __init__(self):
-        self.tools: list = [PickaxeII(), UltraPick()]
-        self.weapons: list = [HammerII(), UltraHam()]
-        self.current_tool: Tool = self.tools[0]
-        self.current_weapon: Weapon = self.weapons[0]
+    __slots__ = ("player_id", "tool_stock", "weapon_stock")
+
+    def __init__(self, player_id: int = 0):
+        self.player_id = player_id
+        self.tool_stock: int = TOOL_CATALOG.full_stock
+        self.weapon_stock: int = WEAPON_CATALOG.full_stock
 
     def reset(self):
         """Resets all attributes of the Miner once the user aborts the game."""
-        self.tools: list = [PickaxeII(), UltraPick()]
-        self.weapons: list = [HammerII(), UltraHam()]
-        self.current_tool: Tool = self.tools[0]
-        self.current_weapon: Weapon = self.weapons[0]
+        self.tool_stock = TOOL_CATALOG.full_stock
+        self.weapon_stock = WEAPON_CATALOG.full_stock
+
+    @property
+    def current_tool(self) -> Tool:
+        """The tool currently for sale, or OUT_OF_STOCK."""
+        return TOOL_CATALOG.next_for_sale(self.tool_stock)
+
+    @property
+    def current_weapon(self) -> Weapon:
+        """The weapon currently for sale, or OUT_OF_STOCK."""
+        return WEAPON_CATALOG.next_for_sale(self.weapon_stock)
 
     @staticmethod
     def get_health_price(miner: Miner) -> int:
@@ -345,13 +458,11 @@ class Shop(metaclass=Singleton):
 
     def display_tool(self) -> str:
         """Returns String of Tool display in the Shop."""
-        return f"Tool : **{self.current_tool.name}** for {self.current_tool.price}"
+        return TOOL_CATALOG.listing(self.tool_stock)
 
     def display_weapon(self) -> str:
         """Returns String of Weapon display in the Shop."""
-        return (
-            f"Weapon : **{self.current_weapon.name}** for {self.current_weapon.price}"
-        )
+        return WEAPON_CATALOG.listing(self.weapon_stock)
 
     def display_health(self, miner: Miner) -> str:
         """Returns String of Health display in the Shop."""
@@ -376,47 +487,56 @@ class Shop(metaclass=Singleton):
     def purchase_tool(self, miner: Miner) -> bool:
         """
         When the Miner purchases a Tool, the game subtracts the Miner's credits. 
-        The Miner wields the new Tool. Then, the program removes the Tool from 
-        the list of available Tools in the Shop.
+        The Miner wields the new Tool. Then, the program takes the Tool out of 
+        the Shop's stock.
         """
-        if (miner.gold_credits >= self.current_tool.price) and (
-            self.current_tool in self.tools
-        ):
-            miner.weild_tool(self.current_tool)
-            self.tools.remove(
-                self.current_tool
-            )  # Remove the purchased tool from the list
-
-            if self.tools:  # If there are still tools left
-                self.current_tool = self.tools[0]  # The next tool for sale
-                return True
-            else:
-                self.current_tool = NoMoreTools()
-                return True
+        tool = self.current_tool
+        if self.tool_stock and (miner.gold_credits >= tool.price):
+            miner.weild_tool(tool)
+            self.tool_stock &= self.tool_stock - 1  # The next tool for sale
+            return True
 
         return False
 
     def purchase_weapon(self, miner: Miner) -> bool:
         """
         When the Miner purchases a Weapon, the game subtracts the Miner's credits. 
-        The Miner wields the new Weapon. Then, the program removes the Weapon from 
-        the list of available Weapons in the Shop.
+        The Miner wields the new Weapon. Then, the program takes the Weapon out of 
+        the Shop's stock.
         """
-        if (miner.gold_credits >= self.current_weapon.price) and (
-            self.current_weapon in self.weapons
-        ):
-            miner.weild_weapon(self.current_weapon)
-            self.weapons.remove(self.current_weapon)
-
-            if self.weapons:
-                self.current_weapon = self.weapons[0]
-                return True
-            else:
-                self.current_weapon = NoMoreTools()
-                return True
+        weapon = self.current_weapon
+        if self.weapon_stock and (miner.gold_credits >= weapon.price):
+            miner.weild_weapon(weapon)
+            self.weapon_stock &= self.weapon_stock - 1
+            return True
 
-        else:
-            return False
+        return False
+
+    @staticmethod
+    def get_inventory_value(miner: Miner) -> int:
+        """Prices the Miner's whole inventory as one dot product with the market prices."""
+        return sum(map(operator.mul, miner.inventory, MARKET_PRICES))
+
+    def display_inventory(self, miner: Miner) -> str:
+        """Returns String of the Miner's inventory display in the Shop."""
+        minerals = ", ".join(
+            f"{count} {MINERAL_RECORDS[mineral_id].name}"
+            for mineral_id, count in enumerate(miner.inventory)
+            if count
+        )
+        if not minerals:
+            return "Sell all : *no minerals*"
+        return f"Sell all : {minerals} for **{Shop.get_inventory_value(miner)}**"
+
+    def sell_all(self, miner: Miner) -> int:
+        """
+        When the Miner sells their inventory, the game adds the market value of every
+        mineral to the Miner's credits and empties the inventory.
+        """
+        value = Shop.get_inventory_value(miner)
+        miner.gold_credits += value
+        miner.inventory[:] = EMPTY_INVENTORY
+        return value
 
 
 class Actor:
@@ -464,25 +584,79 @@ class Actor:
 
 
 class Enemy(Actor):
-    def __init__(self, name, health, damage, gold_credits):
+    """An enemy. Without a name, the stats of the enemy's class come from the content pack."""
+
+    def __init__(self, name=None, health=0, damage=0, gold_credits=0):
+        if name is None:
+            _, name, health, damage, gold_credits = ENEMY_RECORDS[ENEMY_IDS[type(self)]]
         super().__init__(name, health, damage, gold_credits)
 
 
 class Bug(Enemy):
-    def __init__(self):
-        super().__init__("Bug", 40, 5, 5)
+    pass
 
 
 class BigBug(Enemy):
-    def __init__(self):
-        super().__init__("Bug", 80, 20, 10)
+    pass
 
 
 class Rockadillo(Enemy):
-    def __init__(self):
-        super().__init__("Rockadillo", 100, 30, 20)
+    pass
 
 
 class Cadosaurus(Enemy):
-    def __init__(self):
-        super().__init__("Cadosaurus", 90, 10, 90)
+    pass
+
+
+ENEMY_IDS: dict = {enemy: enemy_id for enemy_id, enemy in enumerate(Enemy.__subclasses__())}
+ENEMY_RECORDS: list = []  # enemy id -> content.EnemyRecord
+
+
+def _check_keys(kind: str, records: tuple, classes) -> None:
+    keys = [record.key for record in records]
+    names = [cls.__name__ for cls in classes]
+    if keys != names:
+        raise content.ContentError(f"the pack's {kind} are {keys}, the game's are {names}")
+
+
+def _rewire(item: Item, old_items: tuple, catalog: Catalog) -> Item:
+    """Returns the item of the same tier in a reloaded catalog."""
+    return catalog[old_items.index(item)] if item in old_items else item
+
+
+def check_pack(pack: content.ContentPack) -> None:
+    """
+    Checks that a content pack fits the game. A pack may rebalance the content but not
+    add or remove any, since player records and stock masks hold content ids.
+
+    Raises:
+        ContentError: If the pack does not fit the game.
+    """
+    _check_keys("minerals", pack.minerals, MINERALS)
+    _check_keys("enemies", pack.enemies, ENEMY_IDS)
+    for catalog, records in ((TOOL_CATALOG, pack.tools), (WEAPON_CATALOG, pack.weapons)):
+        if catalog.items and len(records) != len(catalog):
+            raise content.ContentError(
+                f"the pack has {len(records)} {catalog.kind.lower()}s, the game has {len(catalog)}"
+            )
+
+
+def use_pack(pack: content.ContentPack) -> None:
+    """
+    Puts a content pack's stats in play, once check_pack() accepted it.
+
+    Minerals and enemies made from now on get the new stats; those of runs in flight
+    keep theirs. Players keep the tier of their tool and weapon, with the new stats.
+    """
+    MINERAL_RECORDS[:] = pack.minerals
+    ENEMY_RECORDS[:] = pack.enemies
+    MARKET_PRICES[:] = array("I", pack.market_prices)
+    old_tools, old_weapons = TOOL_CATALOG.items, WEAPON_CATALOG.items
+    TOOL_CATALOG.load(Tool(tool.name, tool.price, tool.power) for tool in pack.tools)
+    WEAPON_CATALOG.load(Weapon(weapon.name, weapon.price, weapon.power) for weapon in pack.weapons)
+    for miner in Miner.instances().values():
+        miner.tool = _rewire(miner.tool, old_tools, TOOL_CATALOG)
+        miner.weapon = _rewire(miner.weapon, old_weapons, WEAPON_CATALOG)
+
+
+content.on_swap(use_pack, check_pack)
@@ -0,0 +1,286 @@
+"""
+Print Miner Discord Bot Game - Session Hibernation
+
+This module keeps only active players in memory. A player whose Miner and Shop have not
+been looked up for IDLE_SECONDS, and who has no live buttons, is hibernated: their state
+is packed into a snapshot record in the cold arena, one flat bytearray shared by every
+hibernated player, and their objects are dropped. The next lookup of the player, from a
+button click or /print-mine, thaws the record back into a Miner and Shop before it
+returns, so the rest of the game never knows the player was cold.
+
+Snapshots load straight into the cold arena, so a restart only rebuilds the players
+who come back, and snapshots are saved from both tiers.
+
+Usage:
+    python hibernation.py --players 100000
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import os
+import resource
+import time
+import tracemalloc
+from gameobjects import Singleton, Miner, Shop
+import snapshot
+
+IDLE_SECONDS: float = 300.0  # a player idle this long is hibernated
+SWEEP_SECONDS: float = 60.0  # how often idle players are looked for
+COMPACT_RATIO: float = 0.5  # the arena is compacted once this share of it is free
+
+
+def rss_mb() -> float:
+    """Returns the resident memory of this process in MiB."""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, not current
+
+
+class ColdArena:
+    """
+    Fixed-size records of hibernated players, packed in one bytearray.
+
+    Attributes:
+        buffer (bytearray): Every slot, used or free.
+        slots (dict): The slot of every hibernated player, by player id.
+        free (list): The free slots.
+
+    Args:
+        record_size (int): The size of one record in bytes.
+    """
+
+    def __init__(self, record_size: int = snapshot.RECORD.size):
+        self.record_size = record_size
+        self.buffer = bytearray()
+        self.slots: dict = {}
+        self.free: list = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self.slots
+
+    def put(self, player_id: int, record: bytes) -> None:
+        """Stores a player's record, replacing the one they had."""
+        slot = self.slots.get(player_id)
+        if slot is None:
+            slot = self.free.pop() if self.free else len(self.buffer) // self.record_size
+            self.slots[player_id] = slot
+        start = slot * self.record_size
+        self.buffer[start : start + self.record_size] = record
+
+    def take(self, player_id: int) -> bytes:
+        """Removes a player's record and returns it, or None if the player is not here."""
+        slot = self.slots.pop(player_id, None)
+        if slot is None:
+            return None
+        start = slot * self.record_size
+        record = bytes(self.buffer[start : start + self.record_size])
+        self.free.append(slot)
+        if len(self.free) > COMPACT_RATIO * (len(self.slots) + len(self.free)):
+            self.compact()
+        return record
+
+    def compact(self) -> None:
+        """Moves the records to the front of a smaller buffer, dropping the free slots."""
+        buffer = bytearray(self.record_size * len(self.slots))
+        for slot, (player_id, old) in enumerate(self.slots.items()):
+            start = old * self.record_size
+            buffer[slot * self.record_size : (slot + 1) * self.record_size] = self.buffer[
+                start : start + self.record_size
+            ]
+            self.slots[player_id] = slot
+        self.buffer = buffer
+        self.free = []
+
+    def records(self) -> list:
+        """Returns the record of every hibernated player."""
+        view = memoryview(self.buffer)
+        size = self.record_size
+        return [view[slot * size : (slot + 1) * size] for slot in self.slots.values()]
+
+
+class Hibernator:
+    """
+    Moves idle players to the cold arena and thaws them when they are looked up again.
+
+    Attributes:
+        arena (ColdArena): The hibernated players.
+        hibernated (int): Players hibernated so far.
+        cold_hits (int): Lookups of a player missing from memory, thawed from the arena.
+        cold_misses (int): Lookups of a player found in neither tier, a new player.
+        thaw_seconds (float): The time spent thawing players.
+        thaw_max (float): The longest thaw in seconds.
+
+    Args:
+        busy: Called with a player id, returns whether the player must stay in memory
+            whatever their idle time, for example while their buttons are live.
+        idle_seconds (float): How long a player is idle before they are hibernated.
+    """
+
+    def __init__(self, busy=None, idle_seconds: float = IDLE_SECONDS):
+        self.busy = busy if busy is not None else (lambda player_id: False)
+        self.idle_seconds = idle_seconds
+        self.arena = ColdArena()
+        self.hibernated = 0
+        self.cold_hits = 0
+        self.cold_misses = 0
+        self.thaw_seconds = 0.0
+        self.thaw_max = 0.0
+        self.thawing = False  # while a record is restored, its own lookups are not thaws
+
+    def install(self) -> None:
+        """Thaws hibernated players whenever their Miner or Shop is looked up."""
+        Singleton.thaw = self.thaw
+
+    def thaw(self, player_id: int) -> None:
+        """Brings a hibernated player back into memory, if they are hibernated."""
+        if not player_id or self.thawing:
+            return  # the shared default player is never hibernated
+        started = time.perf_counter()
+        record = self.arena.take(player_id)
+        if record is None:
+            self.cold_misses += 1
+            return
+        # The restore looks up the player's Miner and Shop, which must neither come back
+        # here nor count as lookups of the game.
+        lookups = Singleton.lookups
+        self.thawing = True
+        try:
+            snapshot.restore(snapshot.RECORD.unpack(record))
+        finally:
+            self.thawing = False
+            Singleton.lookups = lookups
+        seconds = time.perf_counter() - started
+        self.cold_hits += 1
+        self.thaw_seconds += seconds
+        self.thaw_max = max(self.thaw_max, seconds)
+
+    def freeze(self, player_id: int) -> None:
+        """Packs a resident player into the arena and drops their objects."""
+        miner = Miner.instances().pop(player_id)
+        shop = Shop.instances().pop(player_id, None)
+        if shop is None:  # never opened the Shop, save a fresh one without registering it
+            shop = super(Singleton, Shop).__call__(player_id)
+        record = bytearray(snapshot.RECORD.size)
+        snapshot.pack_into(record, 0, miner, shop)
+        self.arena.put(player_id, record)
+        Singleton.last_used.pop(player_id, None)
+        self.hibernated += 1
+
+    def sweep(self, now: float = None) -> int:
+        """
+        Hibernates every player idle for longer than the idle time.
+
+        Returns:
+            int: The number of players hibernated.
+        """
+        if now is None:
+            now = time.monotonic()
+        cutoff = now - self.idle_seconds
+        idle = [
+            player_id
+            for player_id, used in Singleton.last_used.items()
+            if used <= cutoff and player_id
+        ]
+        miners = Miner.instances()
+        frozen = 0
+        for player_id in idle:
+            if player_id not in miners:
+                Singleton.last_used.pop(player_id, None)
+            elif not self.busy(player_id):
+                self.freeze(player_id)
+                frozen += 1
+
+        if frozen:  # let memory follow the players left in memory
+            Miner.shrink()
+            Shop.shrink()
+            Singleton.last_used = dict(Singleton.last_used)
+        return frozen
+
+    async def step(self) -> float:
+        """Sweeps for idle players, as a never-ending run of the game's scheduler."""
+        self.sweep()
+        return SWEEP_SECONDS
+
+    def load(self, path: str) -> int:
+        """
+        Loads every player of a snapshot file into the arena, if there is one.
+
+        Returns:
+            int: The number of players loaded.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as file:
+            records = snapshot.records(file.read())
+        for record in records:
+            self.arena.put(record[0], snapshot.RECORD.pack(*record))
+        return len(records)
+
+    def save(self, path: str) -> int:
+        """Writes every player, resident and hibernated, to a snapshot file."""
+        return snapshot.save(path, packed=self.arena.records())
+
+    def report(self) -> dict:
+        """Returns the size of each tier, the hit ratios and the thaw latency."""
+        misses = self.cold_hits + self.cold_misses
+        lookups = Singleton.lookups
+        return {
+            "resident_players": sum(1 for player_id in Miner.instances() if player_id),
+            "cold_players": len(self.arena),
+            "cold_bytes": len(self.arena.buffer),
+            "hibernated": self.hibernated,
+            "hot_hit_ratio": round(1 - misses / lookups, 3) if lookups else 0.0,
+            "cold_hit_ratio": round(self.cold_hits / misses, 3) if misses else 0.0,
+            "thaw_mean_ms": round(self.thaw_seconds / self.cold_hits * 1000, 3)
+            if self.cold_hits
+            else 0.0,
+            "thaw_max_ms": round(self.thaw_max * 1000, 3),
+            "rss_mb": round(rss_mb(), 1),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Print Miner session hibernation.")
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--active", type=int, default=1000, help="players who come back")
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    hibernator = Hibernator(idle_seconds=0)
+    hibernator.install()
+    for player_id in range(1, args.players + 1):
+        Miner(player_id).gold_credits = player_id
+        Shop(player_id)
+    resident = tracemalloc.get_traced_memory()[0]
+
+    hibernator.sweep(time.monotonic() + 1)
+    cold = tracemalloc.get_traced_memory()[0]
+
+    for player_id in range(1, args.active + 1):
+        assert Miner(player_id).gold_credits == player_id
+    report = hibernator.report()
+
+    print(f"{args.players} players resident : {resident / 2**20:.1f} MiB traced")
+    print(f"{args.players} players cold     : {cold / 2**20:.1f} MiB traced")
+    print(
+        f"{args.active} players thawed   : "
+        f"mean {report['thaw_mean_ms']} ms, max {report['thaw_max_ms']} ms"
+    )
+    print(f"cold arena : {report['cold_bytes'] / 2**20:.1f} MiB for {report['cold_players']} players")
+
+
+if __name__ == "__main__":
+    main()
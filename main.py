@@ -17,10 +17,27 @@ Date updated:
 """
 
 from typing import Final
+import asyncio
 import os
+import signal
+import time
 from pathlib import Path
 from dotenv import load_dotenv
+import analytics
+import checkpoint
+import clientprofile
+import content
+import coop
+import drain
 import gamebuttons
+import hibernation
+import printminer
+import playercache
+import profiler
+import raid
+import recovery
+import stateserver
+import traces
 from discord import Client, app_commands
 from discord.ext import commands
 import discord
@@ -33,22 +50,97 @@ load_dotenv(dotenv_path=dotenv_path)
 
 TOKEN: Final[str] = os.getenv("DISCORD_TOKEN")
 MY_GUILD: Final = discord.Object(id=os.getenv("MY_GUILD"))
+SNAPSHOT_PATH: Final[str] = os.getenv("PRINTMINER_SNAPSHOT", "printminer.snapshot")
+CHECKPOINT_PATH: Final[str] = os.getenv("PRINTMINER_CHECKPOINT", "printminer.checkpoint")
+TRACE_PATH: Final[str] = os.getenv("PRINTMINER_TRACE")  # record clicks when set
+ANALYTICS_PATH: Final[str] = os.getenv("PRINTMINER_ANALYTICS")  # record outcomes when set
+RAID_CHANNEL: Final[str] = os.getenv("PRINTMINER_RAID_CHANNEL")  # schedule raids when set
+STATE_SOCKET: Final[str] = os.getenv("PRINTMINER_STATE_SOCKET")  # share player state when set
+MAX_PROFILE_SECONDS: Final[int] = 120
 
 
 # BOT SETUP
 class Client(discord.Client):
-    def __init__(self, *, intents: discord.Intents):
-        super().__init__(intents=intents)
+    def __init__(self, profile: str = clientprofile.PROFILE):
+        super().__init__(**clientprofile.client_options(profile))
+        self.profile = profile
         self.tree = app_commands.CommandTree(self)
+        self.draining = None  # the drain task, once SIGTERM is received
+        self.state_pool = None  # the state server connections, when player state is shared
+
+    def drain(self) -> None:
+        """Drains the bot and closes it (see drain.py), once."""
+        if self.draining is None:
+            self.draining = asyncio.create_task(drain.drain(self))
+
+    async def login(self, token: str):
+        connector = clientprofile.connector(self.profile)
+        if connector is not None:
+            self.http.connector = connector  # used by the HTTP session login creates
+        await super().login(token)
 
     async def setup_hook(self):
+        print(f"Client profile: {self.profile}")
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.drain)
+        except NotImplementedError:  # Windows event loops
+            signal.signal(signal.SIGTERM, lambda *_: loop.call_soon_threadsafe(self.drain))
+        hibernator = printminer.PrintMiner.hibernator
+        hibernator.install()
+        players = hibernator.load(SNAPSHOT_PATH)  # players are thawed as they come back
+        print(f"Loaded {players} players from {SNAPSHOT_PATH}")
+        if ANALYTICS_PATH:
+            analytics.start(ANALYTICS_PATH, printminer.PrintMiner.engine)
+            print(f"Recording gameplay analytics to {ANALYTICS_PATH}")
+
+        if STATE_SOCKET:  # before settling, so the settled players are shared
+            self.state_pool = stateserver.StatePool(STATE_SOCKET)
+            await self.state_pool.connect()
+            playercache.start(
+                self.state_pool,
+                printminer.PrintMiner.engine,
+                playing=printminer.PrintMiner.playing,
+            )
+            print(f"Caching player state shared through {STATE_SOCKET}")
+
+        # Runs cut short by the last shutdown are settled and saved before their
+        # checkpoints are replaced.
+        settled = recovery.settle_all(checkpoint.read(CHECKPOINT_PATH))
+        if settled:
+            hibernator.save(SNAPSHOT_PATH)
+            print(f"Settled {len(settled)} interrupted runs")
+        checkpoint.start(CHECKPOINT_PATH)
+        printminer.PrintMiner.scheduler.call_later(hibernation.SWEEP_SECONDS, hibernator)
+        await content.Watcher().step()  # write the pack, if the data file is newer
+        printminer.PrintMiner.scheduler.call_later(content.WATCH_SECONDS, content.Watcher())
+        print(f"Playing content pack {content.current().path}")
+        if RAID_CHANNEL:
+            schedule = raid.RaidSchedule(self, int(RAID_CHANNEL))
+            printminer.PrintMiner.scheduler.call_later(schedule.every, schedule)
+            print(f"Scheduling raids in channel {RAID_CHANNEL}")
+        if TRACE_PATH:
+            traces.start(TRACE_PATH)
+            print(f"Recording interaction trace to {TRACE_PATH}")
         self.tree.copy_global_to(guild=MY_GUILD)
         await self.tree.sync(guild=MY_GUILD)
+        if settled:
+            report = await recovery.repair(self, settled)
+            print(f"Repaired {report['repaired']} messages, {report['failed']} failed")
+
+    async def close(self):
+        players = printminer.PrintMiner.hibernator.save(SNAPSHOT_PATH)
+        print(f"Saved {players} players to {SNAPSHOT_PATH}")
+        await playercache.stop()
+        if self.state_pool is not None:
+            await self.state_pool.close()
+        traces.stop()
+        checkpoint.stop()
+        analytics.stop()
+        await super().close()
 
 
-intents = discord.Intents.default()
-intents.message_content = True
-client = Client(intents=intents)
+client = Client()
 
 
 # EVENTS
@@ -62,6 +154,65 @@ async def print_mine(interaction: discord.Interaction):
     await gamebuttons.load_game(interaction)
 
 
+@client.tree.command(
+    name="print-mine-coop", description="Open a mega deposit for the whole channel to mine"
+)
+async def print_mine_coop(interaction: discord.Interaction):
+    await coop.start_deposit(interaction)
+
+
+@client.tree.command(
+    name="print-mine-raid", description="Summon a raid boss for the whole channel to fight"
+)
+@app_commands.default_permissions(administrator=True)
+async def print_mine_raid(interaction: discord.Interaction):
+    await raid.start_raid(interaction)
+
+
+@client.tree.command(name="print-mine-stats", description="Show Print Miner bot statistics")
+@app_commands.default_permissions(administrator=True)
+async def print_mine_stats(interaction: discord.Interaction):
+    stats = printminer.PrintMiner.stats()
+    await interaction.response.send_message(
+        embed=discord.Embed(
+            title="Print Miner stats",
+            description="\n".join(f"{name} : {value}" for name, value in stats.items()),
+        ),
+        ephemeral=True,
+    )
+
+
+@client.tree.command(
+    name="print-mine-profile", description="Profile the Print Miner bot for a few seconds"
+)
+@app_commands.describe(seconds="How long to profile, in seconds")
+@app_commands.default_permissions(administrator=True)
+async def print_mine_profile(
+    interaction: discord.Interaction,
+    seconds: app_commands.Range[int, 1, MAX_PROFILE_SECONDS] = 10,
+):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    path = f"printminer-{int(time.time())}.folded"
+    try:
+        result = await profiler.profile(seconds, path)
+    except profiler.ProfilerBusy:
+        await interaction.followup.send("A profile is already running.", ephemeral=True)
+        return
+
+    hot = "\n".join(f"`{share:>6.1%}` {label}" for label, share in result["top"])
+    await interaction.followup.send(
+        embed=discord.Embed(
+            title=f"Print Miner profile ({seconds}s, {result['samples']} samples)",
+            description=(
+                f"event loop lag : max {result['lag_max_ms']:.1f} ms, "
+                f"mean {result['lag_mean_ms']:.1f} ms\n"
+                f"collapsed stacks : {result['path']}\n\n{hot}"
+            )[:4096],
+        ),
+        ephemeral=True,
+    )
+
+
 # HANDLING THE BOT STARTUP
 @client.event
 async def on_ready() -> None:
@@ -0,0 +1,158 @@
+"""
+Print Miner Discord Bot Game - Mine Map
+
+This module gives every player a mine to dig through. The mine is an unbounded grid of
+cells, each a mineral deposit, some of them guarded by an enemy lair. Cells are never
+stored: the grid is split into square regions and a region is generated from the
+player's map seed and its coordinates the first time it is visited. Generated regions
+are kept in a shared LRU cache and simply generated again after they are evicted, so
+memory stays proportional to the regions in use however far players dig.
+
+The spawn tables come precomputed from the content pack in play (see content.py).
+
+Cell layout (one byte):
+    bits 0-3 : mineral, index into MINERALS
+    bits 4-6 : enemy, index into ENEMIES, if the lair bit is set
+    bit  7   : lair
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import random
+from collections import OrderedDict
+from gameobjects import Miner, Enemy, MINERALS
+import content
+
+REGION_SIZE: int = 16  # cells along each side of a region
+CACHE_REGIONS: int = 4096  # regions kept in memory, 256 bytes each
+LAIR_CHANCE: float = 0.08
+
+LAIR: int = 0x80
+ENEMIES: list = Enemy.__subclasses__()
+
+DIRECTIONS: tuple = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+# Random byte -> cell bits. A byte below the lair threshold keeps the lair bits. The
+# mineral and enemy tables are set from the content pack in play, see use_pack().
+_MINERAL_TABLE: bytes = None
+_LAIR_TABLE = bytes(0xF0 if byte < round(LAIR_CHANCE * 256) else 0 for byte in range(256))
+_ENEMY_TABLE: bytes = None
+
+
+def generate(seed: int, region_x: int, region_y: int) -> bytes:
+    """
+    Generates the cells of one region, row by row. The same seed and coordinates
+    always give the same region.
+
+    Three random bytes decide each cell: its mineral, whether it is a lair and the
+    lair's enemy. They are mapped through lookup tables and combined as whole-region
+    integers, so generating a region takes microseconds.
+    """
+    rng = random.Random(f"{seed}:{region_x}:{region_y}")
+    cells = REGION_SIZE * REGION_SIZE
+    minerals = int.from_bytes(rng.randbytes(cells).translate(_MINERAL_TABLE), "little")
+    lairs = int.from_bytes(rng.randbytes(cells).translate(_LAIR_TABLE), "little")
+    enemies = int.from_bytes(rng.randbytes(cells).translate(_ENEMY_TABLE), "little")
+    return (minerals | (lairs & enemies)).to_bytes(cells, "little")
+
+
+class RegionCache:
+    """
+    LRU cache of generated regions, shared by every player's map.
+
+    Attributes:
+        regions (OrderedDict): The cells of every cached region, by (seed, x, y), from
+            least to most recently used.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups which generated their region.
+        evictions (int): Regions dropped to stay within the capacity.
+
+    Args:
+        capacity (int): The most regions to keep.
+    """
+
+    def __init__(self, capacity: int = CACHE_REGIONS):
+        self.capacity = capacity
+        self.regions: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, seed: int, region_x: int, region_y: int) -> bytes:
+        """Returns the cells of a region, generating it if it is not cached."""
+        key = (seed, region_x, region_y)
+        cells = self.regions.get(key)
+        if cells is not None:
+            self.regions.move_to_end(key)
+            self.hits += 1
+            return cells
+
+        self.misses += 1
+        cells = self.regions[key] = generate(seed, region_x, region_y)
+        if len(self.regions) > self.capacity:
+            self.regions.popitem(last=False)
+            self.evictions += 1
+        return cells
+
+    def clear(self) -> None:
+        """Drops every cached region."""
+        self.regions.clear()
+
+    def report(self) -> dict:
+        """Returns the cache's size and hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "map_regions": len(self.regions),
+            "map_hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "map_evictions": self.evictions,
+        }
+
+
+cache = RegionCache()
+
+
+def use_pack(pack: content.ContentPack) -> None:
+    """
+    Puts a content pack's spawn tables in play. If they changed, the cached regions are
+    dropped, so every map is generated again from the new tables.
+    """
+    global _MINERAL_TABLE, _ENEMY_TABLE
+    minerals = bytes(pack.mineral_spawn)
+    enemies = bytes(LAIR | enemy_id << 4 for enemy_id in pack.enemy_spawn)
+    if (minerals, enemies) != (_MINERAL_TABLE, _ENEMY_TABLE):
+        _MINERAL_TABLE, _ENEMY_TABLE = minerals, enemies
+        cache.clear()
+
+
+content.on_swap(use_pack)
+
+
+def cell_at(seed: int, x: int, y: int) -> int:
+    """Returns the cell at a position of the map with the given seed."""
+    cells = cache.get(seed, x // REGION_SIZE, y // REGION_SIZE)
+    return cells[(y % REGION_SIZE) * REGION_SIZE + x % REGION_SIZE]
+
+
+def dig(miner: Miner, rng: random.Random) -> tuple:
+    """
+    Moves the miner to a neighbouring cell of their map.
+
+    Args:
+        miner (Miner): The miner digging.
+        rng (random.Random): The random source of the mining run.
+
+    Returns:
+        tuple: The Minerals subclass of the cell's deposit, and the Enemy subclass of
+            its lair or None if there is no lair.
+    """
+    dx, dy = rng.choice(DIRECTIONS)
+    miner.x += dx
+    miner.y += dy
+    cell = cell_at(miner.map_seed, miner.x, miner.y)
+    lair = ENEMIES[(cell >> 4) & 0x7] if cell & LAIR else None
+    return MINERALS[cell & 0xF], lair
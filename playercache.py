@@ -0,0 +1,466 @@
+"""
+Print Miner Discord Bot Game - Player-State Cache
+
+This module puts a cache in front of the storage backend of shared player state, such as
+the state server's StatePool, so a click does not have to wait on storage. Every click
+on MenuButtons, ShopButtons or FightButtons looks the player up through the cache:
+a hit costs a dict lookup, and a miss loads the player's record from the backend once,
+however many clicks of the player wait on it. A record loaded by a miss is copied onto
+the player's Miner, after the Miner is thawed from the cold arena if it was hibernated,
+unless the player has a run or a fight in flight or changes still to write: their Miner
+is then ahead of the record, which is left for a later miss.
+
+Writes go through the cache to the backend. Every change the game engine makes to a
+player is written right after, as the operations of the state server which take the
+record the Miner was last in sync with to its new record: gold, health and experience
+added, chunks mined, levels gained, tiers bought and inventories sold. Changes made by
+other bot processes in between are kept. The writes of one player go one at a time so
+they land in order, and a player's misses wait for their pending writes, so a player
+never reads back an older record than the one they wrote. A purchase the state server
+refuses leaves the player out of sync; their next miss loads the shared record again.
+The cache holds a bounded number of players and evicts the least recently used. An
+entry older than MAX_AGE_SECONDS is loaded again, in case another bot process changed
+the player. Resetting a player drops their entry and replaces their record whole.
+
+Usage:
+    python playercache.py --players 1000 10000 100000
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import operator
+from collections import OrderedDict, deque
+from engine import Engine, MiningFinished, LevelUp, FightEnded, Fled, Purchase, Sale
+from gameobjects import Miner, Shop
+from stateserver import StateServer, StatePool, PlayerRecord
+from stateserver import Op, Status, PAYLOADS, apply_op
+
+CAPACITY: int = 50_000  # players kept in the cache
+MAX_AGE_SECONDS: float = 30.0  # a cached record older than this is loaded again
+# A click waits this long for its lookup, well within the 3 seconds Discord gives a
+# button to respond; the load goes on for the player's next click.
+LOOKUP_SECONDS: float = 1.5
+SAMPLES: int = 4096  # latencies kept for the percentiles
+
+# The events after which a player's record has changed and is written through.
+CHANGES: tuple = (MiningFinished, LevelUp, FightEnded, Fled, Purchase, Sale)
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+def operations(old: PlayerRecord, new: PlayerRecord) -> list:
+    """
+    Returns the state server operations which take a player's record from one record of
+    their Miner to the next, in the order the game allows them: a sale before the chunks
+    mined after it, gold earned before the tiers it bought, and a heal before the gold
+    lost after it.
+
+    Returns:
+        list: The (Op, packed payload) of every operation.
+    """
+    ops = []
+    expected = old  # the record once the operations so far are applied
+
+    def add(op: Op, *payload) -> None:
+        nonlocal expected
+        expected = apply_op(expected, op, payload)[1]
+        ops.append((op, PAYLOADS[op].pack(*payload) if PAYLOADS[op] else b""))
+
+    if any(map(operator.lt, new.inventory, old.inventory)):  # only Sell All takes chunks
+        add(Op.SELL_ALL)
+    for mineral_id, (before, after) in enumerate(zip(expected.inventory, new.inventory)):
+        if after > before:
+            add(Op.ADD_CHUNKS, mineral_id, after - before)
+    for _ in range(new.level - old.level):
+        add(Op.LEVEL_UP)
+    if new.experience != expected.experience:
+        add(Op.ADD_EXPERIENCE, new.experience - expected.experience)
+    if new.gold_credits > expected.gold_credits:
+        add(Op.ADD_GOLD, new.gold_credits - expected.gold_credits)
+    for tier in range(old.tool + 1, new.tool + 1):
+        add(Op.BUY_TOOL, tier)
+    for tier in range(old.weapon + 1, new.weapon + 1):
+        add(Op.BUY_WEAPON, tier)
+    price = (expected.max_health - expected.health) * 10
+    if new.health == new.max_health > expected.health and (
+        expected.gold_credits - new.gold_credits == price
+    ):
+        add(Op.HEAL)
+    if new.gold_credits != expected.gold_credits:
+        add(Op.ADD_GOLD, new.gold_credits - expected.gold_credits)
+    if new.health != expected.health:
+        add(Op.ADD_HEALTH, new.health - expected.health)
+    return ops
+
+
+class PlayerCache:
+    """
+    A read-through, write-through LRU cache of player records.
+
+    Attributes:
+        records (OrderedDict): The (record, time loaded) of every cached player, least
+            recently used first.
+        loading (dict): The load in flight of every player being loaded.
+        writing (dict): The write in flight of every player being written.
+        synced (dict): The record every player's Miner was last in sync with, which
+            their next change is written as operations from.
+        fresh (set): The players whose cached record was loaded by a miss and is not
+            copied onto their Miner yet.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups which loaded the record from the backend.
+        shared (int): Lookups which waited on another lookup's load.
+        evictions (int): Players evicted to keep the cache within its capacity.
+        refused (int): Writes the state server refused, as another process changed the
+            player first.
+        failed (int): Writes lost to a state server which could not be reached.
+
+    Args:
+        backend: The storage, with `async get(player_id)` and `async call(op,
+            player_id, payload)`, such as a connected StatePool.
+        capacity (int): The most players kept.
+        max_age (float): Seconds a cached record is trusted for.
+    """
+
+    def __init__(self, backend, capacity: int = CAPACITY, max_age: float = MAX_AGE_SECONDS):
+        self.backend = backend
+        self.capacity = capacity
+        self.max_age = max_age
+        self.records: OrderedDict = OrderedDict()
+        self.loading: dict = {}
+        self.writing: dict = {}
+        self.queued: dict = {}  # the operations still to write of every player
+        self.synced: dict = {}
+        self.fresh: set = set()
+        self.refused = 0
+        self.failed = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+        self.load_seconds: deque = deque(maxlen=SAMPLES)
+        self.evicting_seconds: deque = deque(maxlen=SAMPLES)  # loads which evicted a player
+        self.lookup_seconds: deque = deque(maxlen=SAMPLES)
+        self.hit_seconds: deque = deque(maxlen=SAMPLES)
+        self.miss_seconds: deque = deque(maxlen=SAMPLES)
+
+    async def get(self, player_id: int) -> PlayerRecord:
+        """Returns a player's record, loading it if it is not cached or too old."""
+        started = time.perf_counter()
+        entry = self.records.get(player_id)
+        hit = entry is not None and started - entry[1] < self.max_age
+        if hit:
+            self.records.move_to_end(player_id)
+            self.hits += 1
+            record = entry[0]
+        else:
+            load = self.loading.get(player_id)
+            if load is None:
+                self.misses += 1
+                load = self.loading[player_id] = asyncio.ensure_future(self._load(player_id))
+            else:
+                self.shared += 1
+            record = await asyncio.shield(load)
+        seconds = time.perf_counter() - started
+        self.lookup_seconds.append(seconds)
+        (self.hit_seconds if hit else self.miss_seconds).append(seconds)
+        return record
+
+    async def _load(self, player_id: int) -> PlayerRecord:
+        started = time.perf_counter()
+        load = self.loading.get(player_id)
+        try:
+            while player_id in self.writing:  # read back the last write, not an older one
+                await asyncio.shield(self.writing[player_id])
+            record = await self.backend.get(player_id)
+        finally:
+            current = self.loading.get(player_id) is load
+            if current:
+                del self.loading[player_id]
+        evicted = 0
+        if current:  # else invalidated while loading, so not cached
+            evicted = self._store(player_id, record)
+            self.fresh.add(player_id)
+        seconds = time.perf_counter() - started
+        self.load_seconds.append(seconds)
+        if evicted:
+            self.evicting_seconds.append(seconds)
+        return record
+
+    def _store(self, player_id: int, record: PlayerRecord) -> int:
+        self.records[player_id] = (record, time.perf_counter())
+        self.records.move_to_end(player_id)
+        evicted = 0
+        while len(self.records) > self.capacity:
+            player, _ = self.records.popitem(last=False)
+            self.fresh.discard(player)
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def sync(self, player_id: int, record: PlayerRecord) -> None:
+        """Takes a player's Miner as in sync with a record, e.g. once it is copied on."""
+        self.synced[player_id] = record
+        self.fresh.discard(player_id)
+
+    def write(self, player_id: int, record: PlayerRecord) -> None:
+        """
+        Writes a player's new record to the backend in order, as the operations from the
+        record their Miner was last in sync with. A player who is not in sync, whose
+        shared record was never loaded, is left to be loaded by their next miss.
+        """
+        old = self.synced.get(player_id)
+        if old is None:
+            return
+        self.synced[player_id] = record
+        self.fresh.discard(player_id)  # the Miner is ahead of the record loaded
+        ops = operations(old, record)
+        if not ops:
+            return
+        self.queued.setdefault(player_id, deque()).extend(ops)
+        if player_id not in self.writing:
+            self.writing[player_id] = asyncio.ensure_future(self._write(player_id))
+
+    async def _write(self, player_id: int) -> None:
+        try:
+            while self.queued.get(player_id):
+                op, payload = self.queued[player_id].popleft()
+                status, record = await self.backend.call(op, player_id, payload)
+                self._store(player_id, record)
+                if status != Status.OK:  # another process changed the player
+                    self.refused += 1
+                    self._unsync(player_id)
+                    break
+        except (ConnectionError, asyncio.TimeoutError):  # whether it landed is unknown
+            self.failed += 1
+            self._unsync(player_id)
+        finally:
+            self.queued.pop(player_id, None)
+            del self.writing[player_id]
+
+    def _unsync(self, player_id: int) -> None:
+        # The player's next miss copies the shared record onto their Miner.
+        self.queued.pop(player_id, None)
+        self.synced.pop(player_id, None)
+        self.invalidate(player_id)
+
+    async def flush(self) -> None:
+        """Waits for every pending write."""
+        while self.writing:
+            await asyncio.gather(*self.writing.values(), return_exceptions=True)
+
+    def invalidate(self, player_id: int) -> None:
+        """Drops a player's cached record, and the result of a load in flight."""
+        self.records.pop(player_id, None)
+        self.loading.pop(player_id, None)
+        self.fresh.discard(player_id)
+
+    async def reset(self, player_id: int, record: PlayerRecord) -> None:
+        """Replaces the record of a player who started over, once it is written."""
+        self.invalidate(player_id)
+        self.queued.pop(player_id, None)  # changes from before the reset are moot
+        while player_id in self.writing:
+            await asyncio.wait([self.writing[player_id]])
+        self.sync(player_id, record)
+        self.queued[player_id] = deque([(Op.PUT, record.pack())])
+        self.writing[player_id] = asyncio.ensure_future(self._write(player_id))
+        await asyncio.shield(self.writing[player_id])
+
+    def reset_stats(self) -> None:
+        """Starts counting lookups and latencies again, e.g. once the cache is warm."""
+        self.hits = self.misses = self.shared = self.evictions = 0
+        for samples in (
+            self.load_seconds,
+            self.evicting_seconds,
+            self.lookup_seconds,
+            self.hit_seconds,
+            self.miss_seconds,
+        ):
+            samples.clear()
+
+    def report(self) -> dict:
+        """Returns the cache's size, hit ratio and latencies."""
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "cached_players": len(self.records),
+            "cache_hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "cache_shared_loads": self.shared,
+            "cache_evictions": self.evictions,
+            "cache_pending_writes": len(self.writing),
+            "cache_refused_writes": self.refused,
+            "cache_failed_writes": self.failed,
+            "cache_load_p50_ms": round(_percentile(self.load_seconds, 0.5) * 1000, 3),
+            "cache_load_p99_ms": round(_percentile(self.load_seconds, 0.99) * 1000, 3),
+            "cache_lookup_p99_ms": round(_percentile(self.lookup_seconds, 0.99) * 1000, 3),
+            "cache_hit_p99_ms": round(_percentile(self.hit_seconds, 0.99) * 1000, 3),
+            "cache_miss_p99_ms": round(_percentile(self.miss_seconds, 0.99) * 1000, 3),
+            "cache_evicting_load_p99_ms": round(
+                _percentile(self.evicting_seconds, 0.99) * 1000, 3
+            ),
+        }
+
+
+cache: PlayerCache = None
+busy = None  # returns whether a player has a run or a fight in flight
+
+
+def start(backend, engine: Engine, capacity: int = CAPACITY, playing=None) -> None:
+    """
+    Starts caching player state kept in a backend, written through on every change.
+
+    Args:
+        playing: Called with a player id, returns whether the player has a run or a
+            fight in flight, during which their record is not copied onto their Miner.
+    """
+    global cache, busy
+    if cache is None:
+        engine.bus.subscribe(remember, *CHANGES)
+    cache = PlayerCache(backend, capacity)
+    busy = playing if playing is not None else (lambda player_id: False)
+
+
+async def stop() -> None:
+    """Writes the pending changes and stops caching, if player state is being cached."""
+    global cache
+    if cache is not None:
+        await cache.flush()
+        cache = None
+
+
+async def load(player_id: int) -> None:
+    """
+    Looks a player up, if player state is cached, and copies a record loaded by a miss,
+    or the record of a player not in sync, onto their Miner while they have no run,
+    fight or write in flight. If the state server can not be reached, or does not answer
+    within LOOKUP_SECONDS, the player plays on with their Miner as it is.
+    """
+    if cache is None or busy(player_id):
+        return
+    try:
+        record = await asyncio.wait_for(cache.get(player_id), LOOKUP_SECONDS)
+    except (ConnectionError, asyncio.TimeoutError):
+        return
+    if (player_id in cache.synced and player_id not in cache.fresh) or busy(player_id):
+        return
+    if player_id in cache.writing:  # the Miner is ahead of the record loaded
+        cache.fresh.discard(player_id)
+        return
+    record.apply(Miner(player_id), Shop(player_id))
+    cache.sync(player_id, record)
+
+
+def mark(miner: Miner) -> None:
+    """Takes a player's Miner as in sync with the shared record, if state is cached."""
+    if cache is not None:
+        cache.sync(miner.player_id, PlayerRecord.from_miner(miner))
+
+
+def changed(miner: Miner) -> None:
+    """Writes a player's Miner through the cache after a change, if state is cached."""
+    if cache is not None:
+        cache.write(miner.player_id, PlayerRecord.from_miner(miner))
+
+
+def remember(event) -> None:
+    """Writes the record of a player the game engine changed through the cache."""
+    if cache is not None:
+        changed(Miner(event.player_id))
+
+
+async def reset(miner: Miner) -> None:
+    """Writes the record of a player who started over, after Miner.reset()."""
+    if cache is not None:
+        await cache.reset(miner.player_id, PlayerRecord.from_miner(miner))
+
+
+def report() -> dict:
+    """Returns the cache's statistics, or nothing if player state is not cached."""
+    return cache.report() if cache is not None else {}
+
+
+async def _clicks(players_cache: PlayerCache, picks: list) -> None:
+    for start in range(0, len(picks), 100):  # 100 clicks at once
+        batch = picks[start : start + 100]
+        records = await asyncio.gather(*(players_cache.get(player_id) for player_id in batch))
+        for player_id, record in list(zip(batch, records))[::10]:  # a tenth change state
+            players_cache.synced.setdefault(player_id, record)
+            old = players_cache.synced[player_id]
+            players_cache.write(player_id, old._replace(gold_credits=old.gold_credits + 10))
+    await players_cache.flush()
+
+
+async def benchmark(players: int, clicks: int, capacity: int) -> dict:
+    """
+    Clicks as random players, a few of them much more often, through a state server.
+    One draw of clicks warms the cache, then a fresh draw from the same players is
+    measured, so players the warm-up missed or the cache evicted are loaded as they
+    would be in play.
+
+    Returns:
+        dict: The cache's report, and the p99 latency of the measured lookups uncached.
+    """
+    path = os.path.join(tempfile.mkdtemp(), "printminer.sock")
+    server = asyncio.ensure_future(StateServer().serve(path))
+    while not os.path.exists(path):
+        await asyncio.sleep(0.01)
+    pool = StatePool(path)
+    await pool.connect()
+
+    rng = random.Random(players)
+    weights = [1 / rank for rank in range(1, players + 1)]  # Zipf: a few busy players
+    players_cache = PlayerCache(pool, capacity)
+    await _clicks(players_cache, rng.choices(range(1, players + 1), weights, k=clicks))
+    players_cache.reset_stats()
+    picks = rng.choices(range(1, players + 1), weights, k=clicks)
+    await _clicks(players_cache, picks)
+    report = players_cache.report()
+
+    uncached = deque(maxlen=SAMPLES)
+    for player_id in picks[:SAMPLES]:
+        started = time.perf_counter()
+        await pool.get(player_id)
+        uncached.append(time.perf_counter() - started)
+    report["uncached_lookup_p99_ms"] = round(_percentile(uncached, 0.99) * 1000, 3)
+
+    await pool.close()
+    await asyncio.sleep(0.01)  # let the server see the connections close
+    server.cancel()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the Print Miner player-state cache.")
+    parser.add_argument("--players", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--clicks", type=int, default=50_000)
+    parser.add_argument("--capacity", type=int, default=CAPACITY)
+    args = parser.parse_args()
+
+    for players in args.players:
+        # As configured, then a tenth of the players so the cache has to evict.
+        for capacity in sorted({args.capacity, players // 10}, reverse=True):
+            report = asyncio.run(benchmark(players, args.clicks, capacity))
+            print(
+                f"{players:>8} players, capacity {capacity:>6} : "
+                f"hit ratio {report['cache_hit_ratio']:.3f}, "
+                f"hit p99 {report['cache_hit_p99_ms']} ms, "
+                f"miss p99 {report['cache_miss_p99_ms']} ms, "
+                f"evicting load p99 {report['cache_evicting_load_p99_ms']} ms, "
+                f"{report['cache_evictions']} evictions "
+                f"(uncached {report['uncached_lookup_p99_ms']} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
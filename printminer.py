@@ -3,6 +3,8 @@ Print Miner Discord Bot Game
 
 This Python script contains the code for a Discord bot game called "Print Miner". 
 The game includes various features such as mining, fighting, shopping, and leveling up.
+The rules themselves are in the game engine (engine.py); this script starts its flows
+for Discord interactions and renders the engine's events as embeds and buttons.
 
 The script uses asyncio and the discord.py library to interact with Discord's API.
 
@@ -13,10 +15,36 @@ Date updated:
     5/09/2024
 """
 
-import asyncio
 import enum
+import json
 import random
+from collections import OrderedDict
 from gameobjects import Miner, Shop, Enemy, Minerals
+from engine import (
+    Engine,
+    MiningStarted,
+    ChunkMined,
+    GoldFound,
+    LevelUp,
+    MiningFinished,
+    EnemyEncountered,
+    TurnResolved,
+    FightEnded,
+    Fled,
+    Purchase,
+    Sale,
+)
+from scheduler import TickScheduler
+from admission import AdmissionController
+from hibernation import Hibernator
+import minemap
+import checkpoint
+import content
+import expectations
+import playercache
+from checkpoint import RunKind
+from viewmanager import ViewManager
+import traces
 from StringProgressBar import progressBar
 import discord
 
@@ -53,14 +81,90 @@ class DisplayCode(enum.IntEnum):
     CANCEL = 22
     ABORT = 23
 
+    SELL_ALL = 24
+
 
 class Final(enum.IntEnum):
     "Holds final values."
     BUTTON_TIMEOUT = 30  # seconds
+    MAX_FINGERPRINTS = 10_000  # messages whose last render is remembered
 
 
 class LoadDisplays:
-    """Handles the display of interactions, fights, miner stats, and shop transactions."""
+    """
+    Handles the display of interactions, fights, miner stats, and shop transactions.
+
+    Every edit goes through LoadDisplays.edit, which remembers a fingerprint of the last
+    embed and button layout shown on each message and skips edits that would not change it.
+    It also tells the view manager which view is now on the message.
+    """
+
+    fingerprints: OrderedDict = OrderedDict()  # message id -> (fingerprint, view)
+    skipped_edits: int = 0
+    views: ViewManager = ViewManager()  # the live views of every player
+
+    @staticmethod
+    def fingerprint(embed: discord.Embed, view) -> tuple:
+        """Returns what an edit would render: the embed payload and the button layout."""
+        layout = None
+        if view is not None:
+            layout = (
+                type(view).__name__,
+                tuple((item.label, item.style, item.disabled) for item in view.children),
+            )
+        return json.dumps(embed.to_dict(), sort_keys=True), layout
+
+    @staticmethod
+    async def edit(
+        interaction: discord.Interaction,
+        embed: discord.Embed,
+        view,
+    ) -> bool:
+        """
+        Edits the interaction's message unless it already shows the same embed and buttons.
+
+        An edit with buttons is only skipped while the buttons already on the message
+        still work, otherwise the new view is sent to replace them.
+
+        A click which has not been answered yet is answered with the edit itself, one
+        request instead of a defer followed by an edit. Only slow callbacks (mining and
+        fights) defer first and edit the original response later.
+
+        Args:
+            interaction (discord.Interaction): The Discord interaction whose message is edited.
+            embed (discord.Embed): The embed to show.
+            view (discord.ui.View): The buttons to show, or None to remove them.
+
+        Returns:
+            bool: True if the message was edited, False if the edit was skipped.
+        """
+        message = interaction.message
+        if message is not None:
+            fingerprint = LoadDisplays.fingerprint(embed, view)
+            last = LoadDisplays.fingerprints.get(message.id)
+            if (
+                last is not None
+                and last[0] == fingerprint
+                and (view is None or not last[1].is_finished())
+            ):
+                LoadDisplays.fingerprints.move_to_end(message.id)
+                LoadDisplays.skipped_edits += 1
+                if not interaction.response.is_done():
+                    await interaction.response.defer()  # the click still needs an answer
+                return False
+
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=view)
+        else:
+            await interaction.response.edit_message(embed=embed, view=view)
+
+        if message is not None:
+            LoadDisplays.views.show(interaction.user.id, message.id, view)
+            LoadDisplays.fingerprints[message.id] = (fingerprint, view)
+            LoadDisplays.fingerprints.move_to_end(message.id)
+            if len(LoadDisplays.fingerprints) > Final.MAX_FINGERPRINTS:
+                LoadDisplays.fingerprints.popitem(last=False)
+        return True
 
     @staticmethod
     async def display_mining_progress(
@@ -81,7 +185,8 @@ class LoadDisplays:
             display_code (DisplayCode): The code indicating the specific display to be shown.
         """
         if display_code == DisplayCode.MINING:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"Mining {mineral.name} | Gold : {miner.gold_found}",
                     description=f"```css\n chunks remaining : {mineral.size}" 
@@ -90,6 +195,39 @@ class LoadDisplays:
                 view=None,
             )
 
+    @staticmethod
+    async def display_queue(
+        interaction: discord.Interaction, position: int, eta: float
+    ) -> None:
+        """
+        Handles the display of a mining run or fight waiting for the bot to have room.
+
+        Args:
+            interaction (discord.Interaction): The Discord interaction that triggered the display.
+            position (int): The session's place in the queue.
+            eta (float): Roughly how many seconds the session will wait.
+        """
+        await LoadDisplays.edit(
+            interaction,
+            embed=discord.Embed(
+                title="The mine is busy",
+                description=f"Place in queue : {position}\n ETA : ~{round(eta)}s",
+            ),
+            view=None,
+        )
+
+    @staticmethod
+    async def display_draining(interaction: discord.Interaction) -> None:
+        """Handles the display of a mining run refused because the bot is restarting."""
+        await LoadDisplays.edit(
+            interaction,
+            embed=discord.Embed(
+                title="The mine is closing",
+                description="Print Miner is restarting, try again in a minute.",
+            ),
+            view=None,
+        )
+
     @staticmethod
     async def display_interaction(
         interaction: discord.Interaction,
@@ -107,16 +245,18 @@ class LoadDisplays:
             display_code (DisplayCode): The code indicating the specific display to be shown.
         """
         if display_code == DisplayCode.MINING_START:
-            view = CancelButton(mineral)
-            await interaction.edit_original_response(
+            view = CancelButton(miner.player_id, mineral)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
-                    title=f"Mining {mineral.name}",
+                    title=f"Mining {mineral.name} at ({miner.x}, {miner.y})",
                 ),
                 view=view,
             )
         elif display_code == DisplayCode.MINING_CANCELLED:
-            view = MenuButtons()
-            await interaction.edit_original_response(
+            view = MenuButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"Mining {mineral.name} ABORTED",
                     description=f"chunks remaining : {mineral.size}"
@@ -125,7 +265,8 @@ class LoadDisplays:
                 view=view,
             )
         elif display_code == DisplayCode.MINING_COMPLETE:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f" You have {miner.gold_credits} credits.",
                     description=f"Accumulated gold: {miner.gold_found} from {mineral.name}",
@@ -133,8 +274,9 @@ class LoadDisplays:
                 view=None,
             )
         elif display_code == DisplayCode.MINING_CONTINUE:
-            view = MenuButtons()
-            await interaction.edit_original_response(
+            view = MenuButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f" You have {miner.gold_credits} credits.",
                     description=f"Accumulated gold: {miner.gold_found}"
@@ -164,16 +306,19 @@ class LoadDisplays:
         """
 
         if display_code == DisplayCode.FIGHT_ENCOUNTER:
-            view = FightButtons(enemy)
-            await interaction.edit_original_response(
+            view = FightButtons(miner.player_id, enemy)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"ENEMY ENCOUNTER : {enemy.name}",
-                    description="Do you wish to fight or flee?",
+                    description="Do you wish to fight or flee?"
+                    + expectations.encounter_hint(miner, enemy),
                 ),
                 view=view,
             )
         elif display_code == DisplayCode.FIGHT_MINER_ATTACK:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"You dealt {miner.weapon.damage} to {enemy.name}",
                     description=f"\nYour health : {miner.health} \ {miner.max_health}"
@@ -182,7 +327,8 @@ class LoadDisplays:
                 view=None,
             )
         elif display_code == DisplayCode.FIGHT_ENEMY_ATTACK:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"{enemy.name} attacked you with {enemy.damage} damage",
                     description=f"\nYour health : {miner.health} \ {miner.max_health}"
@@ -191,8 +337,9 @@ class LoadDisplays:
                 view=None,
             )
         elif display_code == DisplayCode.FIGHT_WIN:
-            view = MenuButtons()
-            await interaction.edit_original_response(
+            view = MenuButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"You have killed {enemy.name} with {miner.weapon.damage} damage",
                     description=f"Your health : {miner.health} \ {miner.max_health}",
@@ -200,8 +347,9 @@ class LoadDisplays:
                 view=view,
             )
         elif display_code == DisplayCode.FIGHT_LOST:
-            view = GameOverButtons()
-            await interaction.edit_original_response(
+            view = GameOverButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"{enemy.name} killed you with {enemy.damage} damage",
                     description="All your stats have been deleted",
@@ -226,8 +374,9 @@ class LoadDisplays:
             display_code (DisplayCode): The code indicating the specific display to be shown.
         """
         if display_code == DisplayCode.FIGHT_FLEE_SUCCESS:
-            view = MenuButtons()
-            await interaction.edit_original_response(
+            view = MenuButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"You have ran away from {enemy.name}:",
                     description="Continue mine",
@@ -235,8 +384,9 @@ class LoadDisplays:
                 view=view,
             )
         elif display_code == DisplayCode.FIGHT_FLEE_LOST:
-            view = MenuButtons()
-            await interaction.edit_original_response(
+            view = MenuButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"As you fled, the {enemy.name} stole {enemy.gold_credits} CREDITS:",
                     description=f"Credits remaining : {miner.gold_credits} \n Mine elsewhere?",
@@ -258,10 +408,11 @@ class LoadDisplays:
         """
         if display_code == DisplayCode.STATS:
             if miner.game_over is False:
-                view = MenuButtons()
+                view = MenuButtons(miner.player_id)
             else:  # if player died
-                view = GameOverButtons()
-            await interaction.edit_original_response(
+                view = GameOverButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="Your stats",
                     description=f" Health: {miner.health} \ {miner.max_health}"
@@ -269,12 +420,15 @@ class LoadDisplays:
                     + f"\n {miner.weapon.name} : {miner.weapon.damage} dmg"
                     + f"\n Credits : {miner.gold_credits}"
                     + f"\n Experience : {miner.experience}"
-                    + f"\n Level : {miner.level}",
+                    + f"\n Level : {miner.level}"
+                    + f"\n Expected : {expectations.mining_hint(miner.tool)}"
+                    + f"\n Fights : {expectations.fight_hint(miner.weapon, miner.health)}",
                 ),
                 view=view,
             )
         elif display_code == DisplayCode.LEVEL_UP:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="Level up!",
                     description=f"Health: {miner.health} \ {miner.max_health}",
@@ -282,7 +436,8 @@ class LoadDisplays:
                 view=None,
             )
         elif display_code == DisplayCode.ABORT:
-            await interaction.edit_original_response(
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="ABORTED GAME", description="All stats have been deleted"
                 ),
@@ -306,20 +461,27 @@ class LoadDisplays:
             display_code (DisplayCode): The code indicating the specific display to be shown.
         """
         if display_code == DisplayCode.SHOP:
-            view = ShopButtons()
-            await interaction.edit_original_response(
+            view = ShopButtons(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="Welcome to the Shop",
                     description=f" Your credits : {miner.gold_credits}\n"
                     + f"\n {Shop.display_health(shop,miner)}"
                     + f"\n {Shop.display_weapon(shop)}"
-                    + f"\n {Shop.display_tool(shop)}",
+                    + expectations.weapon_upgrade_hint(
+                        miner.weapon, shop.current_weapon, miner.health
+                    )
+                    + f"\n {Shop.display_tool(shop)}"
+                    + expectations.tool_upgrade_hint(miner.tool, shop.current_tool)
+                    + f"\n {Shop.display_inventory(shop, miner)}",
                 ),
                 view=view,
             )
         elif display_code == DisplayCode.BUY_HEAL:
-            view = ShopBackButton()
-            await interaction.edit_original_response(
+            view = ShopBackButton(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="Purchased healing potion",
                     description=f"You have been healed. \n health : {miner.health} \ {miner.max_health}",
@@ -327,8 +489,9 @@ class LoadDisplays:
                 view=view,
             )
         elif display_code == DisplayCode.BUY_WEAPON:
-            view = ShopBackButton()
-            await interaction.edit_original_response(
+            view = ShopBackButton(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"Purchased {miner.weapon.name}",
                     description=f"Your damage power is now {miner.weapon.damage} (dmg)",
@@ -336,17 +499,29 @@ class LoadDisplays:
                 view=view,
             )
         elif display_code == DisplayCode.BUY_TOOL:
-            view = ShopBackButton()
-            await interaction.edit_original_response(
+            view = ShopBackButton(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title=f"Purchased {miner.tool.name}",
                     description=f"Your mining power is now {miner.tool.mining_power} (mp)",
                 ),
                 view=view,
             )
+        elif display_code == DisplayCode.SELL_ALL:
+            view = ShopBackButton(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
+                embed=discord.Embed(
+                    title="Sold all your minerals",
+                    description=f"You now have {miner.gold_credits} credits",
+                ),
+                view=view,
+            )
         elif display_code == DisplayCode.UNAVAILABLE:
-            view = ShopBackButton()
-            await interaction.edit_original_response(
+            view = ShopBackButton(miner.player_id)
+            await LoadDisplays.edit(
+                interaction,
                 embed=discord.Embed(
                     title="You can't purchase that.",
                     description="*Not enough credits or item is out of stock*",
@@ -355,13 +530,42 @@ class LoadDisplays:
             )
 
 
-class MenuButtons(discord.ui.View):
+class GameView(discord.ui.View):
+    """
+    Base of the game's views. Every click gets its own random source, recorded in the
+    interaction trace when one is being recorded. Views are tracked by LoadDisplays.views
+    from the moment they are shown until they are replaced or time out.
+
+    Attributes:
+        rng (random.Random): The random source of the latest click's game logic.
+        session (tuple): The player id and message id the view is tracked under.
+    """
+
+    rng: random.Random = None
+    session: tuple = None
+
+    async def on_timeout(self) -> None:
+        LoadDisplays.views.forget(self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.message is not None:
+            LoadDisplays.views.show(interaction.user.id, interaction.message.id, self)
+        custom_id = (interaction.data or {}).get("custom_id")
+        label = next(
+            (item.label for item in self.children if item.custom_id == custom_id), None
+        )
+        self.rng = traces.click(interaction.user.id, type(self).__name__, label)
+        await playercache.load(interaction.user.id)  # the shared state, if there is any
+        return True
+
+
+class MenuButtons(GameView):
     """Includes buttons for mining, shopping, viewing stats, and aborting the game."""
 
-    def __init__(self):
+    def __init__(self, player_id: int):
         super().__init__(timeout=Final.BUTTON_TIMEOUT)
-        self.miner = Miner()
-        self.shop = Shop()
+        self.miner = Miner(player_id)
+        self.shop = Shop(player_id)
         self.miner.game_over = False
 
     @discord.ui.button(label="Mine", style=discord.ButtonStyle.success)
@@ -370,14 +574,13 @@ class MenuButtons(discord.ui.View):
     ) -> None:
         await interaction.response.defer()
         await PrintMiner.mine(
-            interaction, self.miner
+            interaction, self.miner, self.rng
         )  # Pass the Miner object to the mine function
 
     @discord.ui.button(label="Shop", style=discord.ButtonStyle.blurple)
     async def shopping(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
         await LoadDisplays.display_shop(
             interaction, self.miner, self.shop, DisplayCode.SHOP
         )
@@ -386,34 +589,34 @@ class MenuButtons(discord.ui.View):
     async def stats(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
         await LoadDisplays.display_miner(interaction, self.miner, DisplayCode.STATS)
 
     @discord.ui.button(label="Abort", style=discord.ButtonStyle.red)
     async def abort(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-        self.miner.reset()  # Reset the miner stats
+        self.miner.reset(self.rng)  # Reset the miner stats
         self.shop.reset()
+        await playercache.reset(self.miner)
         await LoadDisplays.display_miner(interaction, self.miner, DisplayCode.ABORT)
 
 
-class ShopButtons(discord.ui.View):
+class ShopButtons(GameView):
     """Includes buttons for returning to the main menu, buying health, weapons, and tools."""
 
-    def __init__(self):
+    def __init__(self, player_id: int):
         super().__init__(timeout=Final.BUTTON_TIMEOUT)
-        self.miner = Miner()
-        self.shop = Shop()
+        self.miner = Miner(player_id)
+        self.shop = Shop(player_id)
+        self.sell_all.disabled = not any(self.miner.inventory)  # nothing to sell
 
     @discord.ui.button(label="Back", style=discord.ButtonStyle.gray)
     async def back(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-        view = MenuButtons()
-        await interaction.edit_original_response(
+        view = MenuButtons(self.miner.player_id)
+        await LoadDisplays.edit(
+            interaction,
             embed=discord.Embed(
                 title="WELCOME",
             ),
@@ -424,99 +627,81 @@ class ShopButtons(discord.ui.View):
     async def buy_health(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-
-        if self.shop.purchase_health(self.miner):
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.BUY_HEAL
-            )
-        else:
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.UNAVAILABLE
-            )
+        PrintMiner.engine.buy_health(self.miner, self.shop)
+        await PrintMiner.renderer.flush(interaction)
 
     @discord.ui.button(label="Buy Weapon", style=discord.ButtonStyle.blurple)
     async def buy_weapon(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-
-        if self.shop.purchase_weapon(self.miner):
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.BUY_WEAPON
-            )
-        else:
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.UNAVAILABLE
-            )
+        PrintMiner.engine.buy_weapon(self.miner, self.shop)
+        await PrintMiner.renderer.flush(interaction)
 
     @discord.ui.button(label="Buy Tool", style=discord.ButtonStyle.blurple)
     async def buy_tool(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
+        PrintMiner.engine.buy_tool(self.miner, self.shop)
+        await PrintMiner.renderer.flush(interaction)
 
-        if self.shop.purchase_tool(self.miner):
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.BUY_TOOL
-            )
-        else:
-            await LoadDisplays.display_shop(
-                interaction, self.miner, self.shop, DisplayCode.UNAVAILABLE
-            )
+    @discord.ui.button(label="Sell All", style=discord.ButtonStyle.success)
+    async def sell_all(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ) -> None:
+        PrintMiner.engine.sell_all(self.miner, self.shop)
+        await PrintMiner.renderer.flush(interaction)
 
 
-class CancelButton(discord.ui.View):
+class CancelButton(GameView):
     """Button allows the user to cancel mining operation before it starts."""
 
-    def __init__(self, mineral: Minerals):
+    def __init__(self, player_id: int, mineral: Minerals):
         super().__init__(timeout=Final.BUTTON_TIMEOUT)
-        self.miner = Miner()
+        self.miner = Miner(player_id)
         self.mineral = mineral
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.red)
     async def cancel_mine(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
         self.miner.game_over = True
         await LoadDisplays.display_interaction(
             interaction, self.miner, self.mineral, DisplayCode.MINING_CANCELLED
         )
 
 
-class ShopBackButton(discord.ui.View):
+class ShopBackButton(GameView):
     """Button which allows the user to go back to the main shop menu."""
 
-    def __init__(self):
-        super().__init__(timeout=None)
-        self.miner = Miner()
-        self.shop = Shop()
+    def __init__(self, player_id: int):
+        super().__init__(timeout=Final.BUTTON_TIMEOUT)
+        self.miner = Miner(player_id)
+        self.shop = Shop(player_id)
 
     @discord.ui.button(label="Back", style=discord.ButtonStyle.gray)
     async def back(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
         await LoadDisplays.display_shop(
             interaction, self.miner, self.shop, DisplayCode.SHOP
         )
 
 
-class FightButtons(discord.ui.View):
+class FightButtons(GameView):
     """Includes buttons for fleeing and attacking when the user encounters an enemy."""
 
-    def __init__(self, enemy: Enemy):
+    def __init__(self, player_id: int, enemy: Enemy):
         super().__init__(timeout=Final.BUTTON_TIMEOUT)
-        self.miner = Miner()
+        self.miner = Miner(player_id)
         self.enemy = enemy
 
     @discord.ui.button(label="Flee", style=discord.ButtonStyle.success)
     async def flee(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-        await PrintMiner.miner_flee(interaction, self.miner, self.enemy)  # begins flee
+        await PrintMiner.miner_flee(
+            interaction, self.miner, self.enemy, self.rng
+        )  # begins flee
 
     @discord.ui.button(label="Attack", style=discord.ButtonStyle.red)
     async def fight(
@@ -524,40 +709,269 @@ class FightButtons(discord.ui.View):
     ) -> None:
         await interaction.response.defer()
         await PrintMiner.enemy_attack(
-            interaction, self.miner, self.enemy
+            interaction, self.miner, self.enemy, self.rng
         )  # begins fight
 
 
-class GameOverButtons(discord.ui.View):
+class GameOverButtons(GameView):
     """
     Includes buttons for viewing stats and aborting the game.
     This is called when the Miner dies.
     """
 
-    def __init__(self):
+    def __init__(self, player_id: int):
         super().__init__(timeout=Final.BUTTON_TIMEOUT)
-        self.miner = Miner()
-        self.shop = Shop()
+        self.miner = Miner(player_id)
+        self.shop = Shop(player_id)
 
     @discord.ui.button(label="Stats", style=discord.ButtonStyle.gray)
     async def stats(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
         await LoadDisplays.display_miner(interaction, self.miner, DisplayCode.STATS)
 
     @discord.ui.button(label="Abort", style=discord.ButtonStyle.red)
     async def cancel_mine(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ) -> None:
-        await interaction.response.defer()
-        self.miner.reset()  # Reset the miner stats
+        self.miner.reset(self.rng)  # Reset the miner stats
         self.shop.reset()
+        await playercache.reset(self.miner)
         await LoadDisplays.display_miner(interaction, self.miner, DisplayCode.ABORT)
 
 
+class DiscordRenderer:
+    """
+    Shows the events of the game engine on Discord.
+
+    The renderer subscribes to the engine's event bus and holds the events of the
+    current engine call. The Discord side flushes them right after the call, to the
+    interaction that caused them. Engine calls are synchronous, so the events of two
+    players are never mixed up.
+
+    Attributes:
+        pending (list): The events not shown yet.
+    """
+
+    def __init__(self, engine: Engine):
+        self.pending: list = []
+        engine.bus.subscribe(self.receive)
+
+    def receive(self, event) -> None:
+        self.pending.append(event)
+
+    async def flush(self, interaction: discord.Interaction, animated: bool = True) -> None:
+        """
+        Shows the pending events on the interaction's message.
+
+        Args:
+            interaction (discord.Interaction): The interaction the events belong to.
+            animated (bool): Whether to show every mining frame and fight turn, or only
+                the first one and the result.
+        """
+        events, self.pending = self.pending, []
+        for event in events:
+            await DiscordRenderer.render(interaction, event, animated)
+
+    @staticmethod
+    async def render(interaction: discord.Interaction, event, animated: bool) -> None:
+        """Shows one event."""
+        kind = type(event)
+        miner = Miner(event.player_id)
+
+        if kind is MiningStarted:
+            await LoadDisplays.display_interaction(
+                interaction, miner, event.mineral, DisplayCode.MINING_START
+            )
+        elif kind is ChunkMined:
+            if animated:
+                progress_bar: list = progressBar.filledBar(
+                    event.size,
+                    event.remaining,
+                    15,
+                    PrintMiner.PROGRESS_BAR_SLIDER,
+                    PrintMiner.PROGRESS_BAR_LINE,
+                )
+                await LoadDisplays.display_mining_progress(
+                    interaction, miner, event.mineral, progress_bar[0], DisplayCode.MINING
+                )
+            elif event.index == 0:  # static runs show one frame until the result
+                await LoadDisplays.display_mining_progress(
+                    interaction, miner, event.mineral, "mining...", DisplayCode.MINING
+                )
+        elif kind is GoldFound:
+            print("DEBUG: adding gold...")
+        elif kind is LevelUp:
+            await LoadDisplays.display_miner(interaction, miner, DisplayCode.LEVEL_UP)
+        elif kind is MiningFinished:
+            if event.encounter:
+                await LoadDisplays.display_interaction(
+                    interaction, miner, event.mineral, DisplayCode.MINING_COMPLETE
+                )
+            else:
+                await LoadDisplays.display_interaction(
+                    interaction, miner, event.mineral, DisplayCode.MINING_CONTINUE
+                )
+                print("DEBUG: continue mine")
+        elif kind is EnemyEncountered:
+            await LoadDisplays.display_fight(
+                interaction, miner, event.enemy, DisplayCode.FIGHT_ENCOUNTER
+            )
+            print("DEBUG: encounter")
+        elif kind is TurnResolved:
+            if animated or event.turn == 1:
+                display_code = (
+                    DisplayCode.FIGHT_MINER_ATTACK
+                    if event.miner_attacked
+                    else DisplayCode.FIGHT_ENEMY_ATTACK
+                )
+                await LoadDisplays.display_fight(interaction, miner, event.enemy, display_code)
+        elif kind is FightEnded:
+            display_code = DisplayCode.FIGHT_WIN if event.won else DisplayCode.FIGHT_LOST
+            await LoadDisplays.display_fight(interaction, miner, event.enemy, display_code)
+            print("DEBUG: player win" if event.won else "DEBUG: player lost")
+        elif kind is Fled:
+            display_code = (
+                DisplayCode.FIGHT_FLEE_LOST
+                if event.lost_credits
+                else DisplayCode.FIGHT_FLEE_SUCCESS
+            )
+            await LoadDisplays.display_flee(interaction, miner, event.enemy, display_code)
+        elif kind is Purchase:
+            display_code = DisplayCode.UNAVAILABLE
+            if event.ok:
+                display_code = {
+                    "health": DisplayCode.BUY_HEAL,
+                    "tool": DisplayCode.BUY_TOOL,
+                    "weapon": DisplayCode.BUY_WEAPON,
+                }[event.kind]
+            await LoadDisplays.display_shop(
+                interaction, miner, Shop(event.player_id), display_code
+            )
+        elif kind is Sale:
+            await LoadDisplays.display_shop(
+                interaction, miner, Shop(event.player_id), DisplayCode.SELL_ALL
+            )
+
+
+class EngineRun:
+    """
+    A game engine flow shown on Discord, stepped by the shared scheduler and
+    checkpointed so it can be settled if the bot restarts before it ends.
+
+    Attributes:
+        interaction (discord.Interaction): The interaction whose message shows the run.
+        state: The run in the game engine.
+        animated (bool): Whether every step is shown, or only the first and the result.
+        checkpoint (int): The run's checkpoint slot, or None if it is not checkpointed.
+        steps (int): The steps shown so far.
+        finished (bool): Whether the rest of the run was played at once by finish().
+    """
+
+    __slots__ = ("interaction", "state", "animated", "checkpoint", "steps", "finished")
+
+    def __init__(self, interaction: discord.Interaction, state, checkpoint_slot: int = None):
+        self.interaction = interaction
+        self.state = state
+        self.animated = True
+        self.checkpoint = checkpoint_slot
+        self.steps = 0
+        self.finished = False
+
+    def advance(self):
+        """Takes the next step in the game engine. Returns the engine's delay."""
+        raise NotImplementedError
+
+    def finish(self):
+        """
+        Plays the rest of the run at once, without showing it.
+
+        Returns:
+            The last event the run published, which its message should show, or None
+            if the run had nothing left to play.
+        """
+        self.finished = True
+        events, PrintMiner.renderer.pending = PrintMiner.renderer.pending, []
+        while self.advance() is not None:
+            pass
+        checkpoint.end(self.checkpoint)
+        self.checkpoint = None
+        events, PrintMiner.renderer.pending = PrintMiner.renderer.pending, events
+        return events[-1] if events else None
+
+    async def step(self):
+        """Takes the next step, shows it and returns the seconds until the next one."""
+        if self.finished:
+            return None
+        try:
+            delay = self.advance()
+            await PrintMiner.renderer.flush(self.interaction, self.animated)
+        except Exception:
+            checkpoint.end(self.checkpoint)
+            raise
+        if delay is None:
+            checkpoint.end(self.checkpoint)
+        else:
+            self.steps += 1
+        return delay
+
+
+class MiningRun(EngineRun):
+    """A mining run shown on Discord. Its state is a MiningState."""
+
+    __slots__ = ()
+
+    def advance(self):
+        return PrintMiner.engine.mine_step(self.state)
+
+
+class FightRun(EngineRun):
+    """A fight shown on Discord. Its state is a FightState."""
+
+    __slots__ = ()
+
+    def advance(self):
+        return PrintMiner.engine.fight_step(self.state)
+
+
 class PrintMiner:
-    """Sets up the Miner and Enemy objects and handles game loop and logic for Print Miner."""
+    """
+    Runs the Print Miner game on Discord. The rules live in the game engine; this class
+    starts its flows for an interaction and has the renderer show what happened.
+    """
+
+    scheduler: TickScheduler = TickScheduler()  # drives every mining run and fight
+    admission: AdmissionController = AdmissionController(scheduler)  # caps animations
+    engine: Engine = Engine()
+    renderer: DiscordRenderer = DiscordRenderer(engine)
+    # idle players with no live buttons are kept packed in a cold arena, once their runs end
+    hibernator: Hibernator = Hibernator(
+        busy=lambda player_id: LoadDisplays.views.busy(player_id) or PrintMiner.playing(player_id)
+    )
+
+    PROGRESS_BAR_LINE: str = "●"
+    PROGRESS_BAR_SLIDER: str = "◌"
+
+    @staticmethod
+    def playing(player_id: int) -> bool:
+        """Returns whether a player has a mining run or a fight running or queued."""
+        return any(
+            run.state.miner.player_id == player_id for run in PrintMiner.admission.in_flight()
+        )
+
+    @staticmethod
+    def stats() -> dict:
+        """Returns the bot's runtime statistics, shown by the admin stats command."""
+        return {
+            **LoadDisplays.views.report(),
+            **minemap.cache.report(),
+            **PrintMiner.admission.report(),
+            **PrintMiner.hibernator.report(),
+            **content.report(),
+            **playercache.report(),
+            "skipped_edits": LoadDisplays.skipped_edits,
+            "scheduled_runs": PrintMiner.scheduler.pending,
+        }
 
     @staticmethod
     def setup_miner() -> Miner:
@@ -566,136 +980,68 @@ class PrintMiner:
         return miner
 
     @staticmethod
-    def setup_enemy() -> Enemy:
+    def setup_enemy(rng: random.Random = None) -> Enemy:
         """Returns Enemy object"""
-        enemy_type: Enemy = random.choice(Enemy.__subclasses__())()
-        return enemy_type
+        if rng is None:
+            rng = random.Random()
+        return Engine.choose_enemy(rng)
 
     @staticmethod
-    async def mine(interaction: discord.Interaction, miner: Miner) -> None:
+    async def mine(
+        interaction: discord.Interaction, miner: Miner, rng: random.Random = None
+    ) -> None:
         """
-        This function simulates the mining process in the game. It randomly selects a
-        mineral type and size. Then it initiates a mining process where the miner
-        extracts chunks of the mineral until depleted.
+        Starts a mining run for the interaction's player (see Engine.start_mining).
 
         During the mining process, a progress bar displays the mining progress. The
         miner may also find gold (credits) during mining. After the mining process,
-        there's a chance to initiate an enemy encounter.
+        there's a chance to initiate an enemy encounter, a certain one if the cell is
+        an enemy lair.
+
+        The animation itself is a MiningRun stepped by the shared scheduler, so this
+        function returns as soon as the first frame is shown. When the bot is busy the
+        run is only shown at the start and the end, or waits in the admission queue.
 
         Args:
             interaction (discord.Interaction): The interaction object that represents a
                 user's interaction (like a command invocation) with the bot.
             miner (Miner): The miner object that will perform the mining.
+            rng (random.Random): The random source of the run, a new one by default.
         """
-
-        # Setting up variables
-        mineral_type: Minerals = random.choice(Minerals.__subclasses__())()
-        mineral_size: int = random.randint(
-            mineral_type.get_lower_bound(mineral_type.size), mineral_type.size
-        )
-        mineral_gold: int = (
-            random.randint(
-                mineral_type.get_lower_bound(mineral_type.gold), mineral_type.gold
+        if not PrintMiner.admission.accepting():
+            await LoadDisplays.display_draining(interaction)
+            return
+        if rng is None:
+            rng = random.Random()
+        seed = rng.getrandbits(64)  # the run is replayed from its seed after a restart
+        slot = checkpoint.begin(RunKind.MINING, miner, seed, interaction)
+        state = PrintMiner.engine.start_mining(miner, random.Random(seed))
+        await PrintMiner.renderer.flush(interaction)
+
+        position = PrintMiner.admission.submit(MiningRun(interaction, state, slot), 0.5)
+        if position:
+            await LoadDisplays.display_queue(
+                interaction, position, PrintMiner.admission.eta(position)
             )
-            * miner.tool.mining_power
-        )
-        mineral_experience: int = random.randint(
-            mineral_type.get_lower_bound(mineral_type.experience),
-            mineral_type.experience,
-        )
-        mineral_gold_count: int = 0
-        miner.gold_found = 0  # Resets the amount of gold.
-        miner.game_over = False
-
-        # CREATING A STRING PROGRESS BAR:
-        #   progress_bar_length of the progress bar is equivalent to the size of the mineral.
-        #   progress_bar_current represents the current length of the filled.
-        #   portion of the progress bar.
-        #   progress_bar[0] returns the string state of the progress bar.
-
-        #   The progress bar is based on the chunk count.
-
-        # Assign the size of the progress bar to the size of the mineral.
-        progress_bar_length: int = mineral_size
-        progress_bar_current: int = 0
-        progress_bar_line: str = "●"
-        progress_bar_slider: str = "◌"
-        progress_bar: list = progressBar.filledBar(
-            progress_bar_length,
-            progress_bar_current,
-            15,
-            progress_bar_slider,
-            progress_bar_line,
-        )  # Empty progress bar
-
-        # Creates a list of the chunks to be displayed as a count down.
-        chunk_count: list = [
-            chunk for chunk in range(mineral_size, 0, -abs(miner.tool.mining_power))
-        ]
-
-        await LoadDisplays.display_interaction(
-            interaction, miner, mineral_type, DisplayCode.MINING_START
-        )
-        await asyncio.sleep(0.5)
-
-        for chunk in chunk_count:
-            mineral_type.size = chunk  # Updating display of mineral size
-            progress_bar_current = chunk
-            progress_bar = progressBar.filledBar(
-                progress_bar_length,
-                progress_bar_current,
-                15,
-                progress_bar_slider,
-                progress_bar_line,
-            )
-            await LoadDisplays.display_mining_progress(
-                interaction, miner, mineral_type, progress_bar[0], DisplayCode.MINING
-            )
-
-            # Display gold found
-            if random.random() < 0.60:  # 60% chance of gold
-                print("DEBUG: adding gold...")
-                miner.gold_credits += mineral_gold
-                mineral_gold_count += 1
-
-            # Calculate the amount of gold found in mineral.
-            miner.gold_found = mineral_gold_count * mineral_gold
-            miner.experience += mineral_experience
-
-        # checks if miner can level up and displays level up message.
-        if miner.level_up():
-            await LoadDisplays.display_miner(interaction, miner, DisplayCode.LEVEL_UP)
-            await asyncio.sleep(1)
-
-        # Initiate and display encounter after mining mineral.
-        if random.random() < 0.50 and miner.game_over is False:  # 50% chance of enemy
-            await LoadDisplays.display_interaction(
-                interaction, miner, mineral_type, DisplayCode.MINING_COMPLETE
-            )
-            enemy_type = PrintMiner.setup_enemy()
-            await asyncio.sleep(0.5)
-
-            await LoadDisplays.display_fight(
-                interaction, miner, enemy_type, DisplayCode.FIGHT_ENCOUNTER
-            )
-            print("DEBUG: encounter")
-        else:
-            await LoadDisplays.display_interaction(
-                interaction, miner, mineral_type, DisplayCode.MINING_CONTINUE
-            )
-            print("DEBUG: continue mine")
 
     @staticmethod
     async def enemy_attack(
-        interaction: discord.Interaction, miner: Miner, enemy: Enemy
+        interaction: discord.Interaction,
+        miner: Miner,
+        enemy: Enemy,
+        rng: random.Random = None,
     ) -> None:
         """
-        Simulates automatic and random turn based fighting between the Miner and an Enemy object.
+        Starts a fight between the Miner and an Enemy (see Engine.start_fight).
+
+        Each turn is a step of a FightRun on the shared scheduler, one second apart.
+        Like mining runs, fights go through the admission controller.
 
         Args:
             interaction (discord.Interaction): The Discord interaction triggering the attack.
             miner (Miner): The player character (miner).
             enemy (Enemy): The enemy being attacked.
+            rng (random.Random): The random source of the fight, a new one by default.
 
         Returns:
             None
@@ -703,84 +1049,40 @@ class PrintMiner:
         Raises:
             None
         """
-        enemy.max_health = random.randint(
-            enemy.get_lower_bound(enemy.max_health), enemy.max_health
+        if rng is None:
+            rng = random.Random()
+        seed = rng.getrandbits(64)
+        slot = checkpoint.begin(
+            RunKind.FIGHT, miner, seed, interaction, minemap.ENEMIES.index(type(enemy))
         )
-        turn: int = random.randint(0, 1)
-
-        while enemy.max_health > 0 and miner.health > 0:
-            print("DEBUG: in fight loop")
-
-            if turn == 0:  # Enemy attack
-                enemy.damage = random.randint(
-                    enemy.get_lower_bound(enemy.damage), enemy.damage
-                )
-                miner.lose_health(enemy.damage)
-
-                await asyncio.sleep(1)
-
-                await LoadDisplays.display_fight(
-                    interaction, miner, enemy, DisplayCode.FIGHT_ENEMY_ATTACK
-                )
-                print("DEBUG: enemy turn")
-                turn += 1
-
-            elif turn == 1:  # Miner attack
-                miner_damage = random.randint(
-                    miner.weapon.get_lower_bound(miner.weapon.damage),
-                    miner.weapon.damage,
-                )
-                enemy.lose_health(miner_damage)
-
-                await asyncio.sleep(1)
-
-                await LoadDisplays.display_fight(
-                    interaction, miner, enemy, DisplayCode.FIGHT_MINER_ATTACK
-                )
-                print("DEBUG: player turn")
-                turn -= 1
-
-        print("DEBUG: Leave fight loop")
-        if enemy.max_health <= 0:
-            await asyncio.sleep(1)
-            await LoadDisplays.display_fight(
-                interaction, miner, enemy, DisplayCode.FIGHT_WIN
-            )
-            print("DEBUG: player win")
-
-        elif miner.health <= 0:
-            await asyncio.sleep(1)
-            await LoadDisplays.display_fight(
-                interaction, miner, enemy, DisplayCode.FIGHT_LOST
+        state = PrintMiner.engine.start_fight(miner, enemy, random.Random(seed))
+        position = PrintMiner.admission.submit(FightRun(interaction, state, slot), 1)
+        if position:
+            await LoadDisplays.display_queue(
+                interaction, position, PrintMiner.admission.eta(position)
             )
-            miner.game_over = True
-            print("DEBUG: player lost")
 
     @staticmethod
     async def miner_flee(
-        interaction: discord.Interaction, miner: Miner, enemy: Enemy
+        interaction: discord.Interaction,
+        miner: Miner,
+        enemy: Enemy,
+        rng: random.Random = None,
     ) -> None:
         """
-        Simulates the miner's attempt to flee from an enemy.
+        The miner's attempt to flee from an enemy (see Engine.flee).
         When the miner flees, there is a chance to lose a radom amount of credits.
 
         Args:
             interaction (discord.Interaction): The Discord interaction triggering the flee action.
             miner (Miner): The player character (miner).
             enemy (Enemy): The enemy from which the miner is fleeing.
+            rng (random.Random): The random source of the flee, a new one by default.
 
         Returns:
             None
         """
-        if random.random() < 0.30:  # 30% chance
-            lost_credits = random.randint(enemy.gold_credits, enemy.gold_credits * 2)
-            miner.lose_credits(lost_credits)
-            await LoadDisplays.display_flee(
-                interaction, miner, enemy, DisplayCode.FIGHT_FLEE_LOST
-            )
-            await asyncio.sleep(1)
-        else:
-            await LoadDisplays.display_flee(
-                interaction, miner, enemy, DisplayCode.FIGHT_FLEE_SUCCESS
-            )
-            await asyncio.sleep(1)
+        if rng is None:
+            rng = random.Random()
+        PrintMiner.engine.flee(miner, enemy, rng)
+        await PrintMiner.renderer.flush(interaction)
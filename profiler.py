@@ -0,0 +1,148 @@
+"""
+Print Miner Discord Bot Game - Sampling Profiler
+
+This module profiles the running bot without a debugger. A background thread samples the
+event loop thread's Python stack at a fixed interval while a small coroutine measures how
+late the event loop wakes up. Samples are written in the collapsed-stack format read by
+flamegraph tools (one "frame;frame;frame count" line per distinct stack).
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+SAMPLE_INTERVAL: float = 0.005  # seconds between stack samples
+LAG_INTERVAL: float = 0.05  # seconds between event loop lag probes
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def frame_label(frame) -> str:
+    """Returns the flamegraph label of a stack frame."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    Attributes:
+        stacks (Counter): The number of samples of every collapsed stack.
+
+    Args:
+        thread_id (int): The thread to sample, by default the calling thread.
+        interval (float): The seconds between samples.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Starts sampling."""
+        self._running.set()
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling and waits for the sampling thread to finish."""
+        self._running.clear()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        while self._running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+            time.sleep(self.interval)
+
+    @property
+    def samples(self) -> int:
+        """Returns the number of samples taken."""
+        return sum(self.stacks.values())
+
+    def write_collapsed(self, path: str) -> None:
+        """Writes the samples in collapsed-stack format."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def top(self, count: int = 10) -> list:
+        """
+        Returns the hottest functions as (label, share of samples) pairs, by the samples
+        taken while the function itself was running. Time the event loop spent idle
+        shows up as the selector's select function.
+        """
+        leaves: Counter = Counter()
+        for stack, samples in self.stacks.items():
+            leaves[stack.rpartition(";")[2]] += samples
+        total = self.samples or 1
+        return [(label, samples / total) for label, samples in leaves.most_common(count)]
+
+
+async def measure_lag(seconds: float, interval: float = LAG_INTERVAL) -> list:
+    """Returns how late, in seconds, the event loop woke up for each probe."""
+    loop = asyncio.get_running_loop()
+    lags = []
+    end = loop.time() + seconds
+    while loop.time() < end:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+    return lags
+
+
+_lock = asyncio.Lock()
+
+
+async def profile(seconds: float, path: str) -> dict:
+    """
+    Profiles the event loop thread for a while and writes the collapsed stacks to a file.
+
+    Args:
+        seconds (float): How long to profile.
+        path (str): The collapsed-stack output file.
+
+    Returns:
+        dict: The sample count, hottest functions and event loop lag of the window.
+
+    Raises:
+        ProfilerBusy: If another profile is running.
+    """
+    if _lock.locked():
+        raise ProfilerBusy("a profile is already running")
+    async with _lock:
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            lags = await measure_lag(seconds)
+        finally:
+            profiler.stop()
+        profiler.write_collapsed(path)
+
+    return {
+        "path": path,
+        "samples": profiler.samples,
+        "top": profiler.top(),
+        "lag_max_ms": max(lags, default=0.0) * 1000,
+        "lag_mean_ms": sum(lags) / len(lags) * 1000 if lags else 0.0,
+    }
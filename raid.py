@@ -0,0 +1,183 @@
+"""
+Print Miner Discord Bot Game - World-Boss Raids
+
+This module lets a whole guild fight one raid boss in a channel together. A raid boss is
+a heavyweight Enemy with a huge max_health and gold pool, made from the RAID_BOSSES
+table, so it never wanders into a mine. A raid is a channel effort (see coop.py), like a
+mega deposit: every attack lands the attacker's Weapon.damage on their own pending
+counter, and the raid merges the counters into the boss's health on a fixed cadence and
+edits the shared message then, so hundreds of players can attack at once without
+touching shared state or editing the message more than once per update. The gold and
+experience are paid to every attacker in one batch when the boss falls.
+
+Raids are opened by an admin with /print-mine-raid, or on a schedule in one channel
+(see RaidSchedule).
+Classes include: RaidBoss, RaidButtons, Raid and RaidSchedule.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import random
+from typing import NamedTuple
+from coop import ChannelEffort, ChannelButtons, Ending, UPDATE_SECONDS
+from gameobjects import Miner, Enemy
+from printminer import PrintMiner
+import playercache
+from StringProgressBar import progressBar
+import discord
+
+ATTACKS_PER_RUN: int = 5  # attacks started by one click, one per tick
+SCHEDULE_SECONDS: float = 6 * 60 * 60  # how often a scheduled raid opens
+TOP_ATTACKERS: int = 5
+
+RAIDS: dict = {}  # channel id -> the Raid open in it
+
+
+class RaidBoss(NamedTuple):
+    name: str
+    max_health: int
+    gold_credits: int  # shared by the attackers by the damage they dealt
+    experience: int  # paid per attack
+
+    def enemy(self) -> Enemy:
+        """Returns a fresh Enemy of the boss, which deals no damage back."""
+        return Enemy(self.name, self.max_health, 0, self.gold_credits)
+
+
+RAID_BOSSES: tuple = (
+    RaidBoss("Titanic Bug", 100_000, 20_000, 2),
+    RaidBoss("Elder Rockadillo", 250_000, 60_000, 3),
+    RaidBoss("Ancient Cadosaurus", 500_000, 150_000, 5),
+)
+
+
+class RaidButtons(ChannelButtons):
+    """The button on a shared raid message."""
+
+    @discord.ui.button(label="Attack", style=discord.ButtonStyle.danger)
+    async def attack(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        await self.join(interaction)
+
+
+class Raid(ChannelEffort):
+    """
+    A raid boss fought by every player in a channel. Its amounts are the damage dealt by
+    every player and its actions their attacks.
+
+    Attributes:
+        boss (RaidBoss): The boss being fought.
+        enemy (Enemy): The boss's health, lowered on every merge.
+
+    Args:
+        channel_id (int): The channel the raid is in.
+        rng (random.Random): The random source of the raid.
+    """
+
+    OPEN = RAIDS
+    VIEW = RaidButtons
+    ALREADY_OPEN = "A raid boss is already being fought in this channel."
+    ACTIONS_PER_RUN = ATTACKS_PER_RUN
+
+    def __init__(self, channel_id: int, rng: random.Random):
+        super().__init__(channel_id)
+        self.boss: RaidBoss = rng.choice(RAID_BOSSES)
+        self.enemy = self.boss.enemy()
+
+    def contribution(self, miner: Miner) -> int:
+        return miner.weapon.damage
+
+    def completed(self) -> bool:
+        return self.enemy.max_health == 0
+
+    def merge(self) -> int:
+        """Merges the attacks since the last update into the boss. Returns the damage."""
+        merged = super().merge()
+        self.enemy.lose_health(merged)
+        return merged
+
+    def embed(self, ending: Ending = None) -> discord.Embed:
+        """Returns the shared raid message's embed."""
+        name = self.boss.name
+        title = {
+            None: f"Raid boss: {name}",
+            Ending.COMPLETED: f"{name} has fallen!",
+            Ending.EXPIRED: f"{name} escaped",
+            Ending.LOST: f"{name} retreated",
+            Ending.RESTART: f"{name} retreated for a restart",
+        }[ending]
+        health_bar: list = progressBar.filledBar(
+            self.boss.max_health,
+            self.enemy.max_health,
+            15,
+            PrintMiner.PROGRESS_BAR_SLIDER,
+            PrintMiner.PROGRESS_BAR_LINE,
+        )
+        top = sorted(self.amounts.totals.items(), key=lambda entry: entry[1], reverse=True)
+        attackers = "\n".join(
+            f"<@{player_id}> : {damage} damage" for player_id, damage in top[:TOP_ATTACKERS]
+        )
+        return discord.Embed(
+            title=title,
+            description=f"```css\n boss health : {self.enemy.max_health}"
+            + f"\n {health_bar[0]}\n attackers : {len(self.amounts.totals)}```"
+            + attackers,
+        )
+
+    def payout(self) -> None:
+        """
+        Pays every attacker in one batch. The boss's gold is shared by the damage dealt,
+        so a boss cut short pays only for the health it lost.
+        """
+        share = self.boss.gold_credits / max(self.amounts.total, self.boss.max_health)
+        for player_id, damage in self.amounts.totals.items():
+            miner = Miner(player_id)
+            miner.gold_credits += round(damage * share)
+            miner.experience += self.actions.totals.get(player_id, 0) * self.boss.experience
+            miner.level_up()
+            playercache.changed(miner)
+
+
+async def start_raid(interaction: discord.Interaction) -> None:
+    """Opens a raid in the interaction's channel, if none is open there."""
+    await Raid.open(interaction)
+
+
+class RaidSchedule:
+    """
+    Opens a raid in one channel every few hours, as a never-ending run of the game's
+    scheduler. No raid opens while one is still being fought there or while the bot
+    drains.
+
+    Args:
+        client (discord.Client): The bot.
+        channel_id (int): The channel raids open in.
+        every (float): Seconds between raids.
+    """
+
+    def __init__(self, client: discord.Client, channel_id: int, every: float = SCHEDULE_SECONDS):
+        self.client = client
+        self.channel_id = channel_id
+        self.every = every
+
+    async def step(self):
+        """Opens the next raid and returns the delay until the one after it."""
+        if PrintMiner.admission.draining:
+            return None
+        if self.channel_id in RAIDS:
+            return self.every
+
+        raid = RAIDS[self.channel_id] = Raid(self.channel_id, random.Random())
+        try:
+            channel = self.client.get_channel(self.channel_id) or await self.client.fetch_channel(
+                self.channel_id
+            )
+            raid.message = await channel.send(embed=raid.embed(), view=raid.view)
+        except discord.HTTPException:  # deleted, or a channel the bot can not post in
+            del RAIDS[self.channel_id]
+            return self.every
+        PrintMiner.scheduler.call_later(UPDATE_SECONDS, raid)
+        return self.every
@@ -0,0 +1,134 @@
+"""
+Print Miner Discord Bot Game - Run Recovery
+
+This module settles the mining runs and fights a restart cut short. Every run left in
+the checkpoint file is replayed in the game engine from the seed it started with, to
+the very end, so the player gets the run they would have seen. A player's runs are
+replayed one after the other in the order they started, from the newest record among
+them, so no run undoes another. The settled players are written through the player
+cache, when there is one. Then the message of every run is repaired in one bulk pass:
+it is edited to the run's final screen with working buttons, instead of staying frozen
+on a progress frame with dead ones.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+import discord
+from checkpoint import Checkpoint, RunKind
+from gameobjects import Miner
+from printminer import PrintMiner, DiscordRenderer
+import minemap
+import playercache
+import snapshot
+
+REPAIR_CONCURRENCY: int = 8  # messages edited at once while repairing
+
+
+class RecoveredResponse:
+    """Stand-in for the response of an interaction which was answered long ago."""
+
+    def is_done(self) -> bool:
+        return True
+
+    async def defer(self, **kwargs) -> None:
+        pass
+
+
+class RecoveredInteraction:
+    """
+    Stand-in for discord.Interaction on the message of a settled run. Edits go to the
+    message through the channel, since the run's interaction has expired.
+
+    Args:
+        client (discord.Client): The bot.
+        run (Checkpoint): The settled run.
+    """
+
+    def __init__(self, client: discord.Client, run: Checkpoint):
+        channel = client.get_partial_messageable(run.channel_id)
+        self.message = channel.get_partial_message(run.message_id)
+        self.user = SimpleNamespace(id=run.player_id)
+        self.channel_id = run.channel_id
+        self.response = RecoveredResponse()
+
+    async def edit_original_response(self, *, embed=None, view=None, **kwargs) -> None:
+        await self.message.edit(embed=embed, view=view)
+
+
+def settle(run: Checkpoint):
+    """
+    Replays an interrupted run from its seed to its end, on the player's Miner as it is.
+
+    Returns:
+        The last event the run published, which its message should show.
+    """
+    miner = Miner(run.player_id)
+    engine = PrintMiner.engine
+    rng = random.Random(run.seed)
+    if run.kind == RunKind.MINING:
+        state = engine.start_mining(miner, rng)
+        while engine.mine_step(state) is not None:
+            pass
+    else:
+        state = engine.start_fight(miner, minemap.ENEMIES[run.enemy](), rng)
+        while engine.fight_step(state) is not None:
+            pass
+
+    events, PrintMiner.renderer.pending = PrintMiner.renderer.pending, []
+    return events[-1]
+
+
+def settle_all(runs: list) -> list:
+    """
+    Settles every interrupted run. The player is restored from the record of their
+    oldest run, which holds none of what their runs earned, then each of their runs is
+    replayed whole in the order they started, and what the replays changed is written
+    through the player-state cache.
+
+    Returns:
+        list: The (Checkpoint, last event) of every run.
+    """
+    players: dict = {}
+    for run in sorted(runs, key=lambda run: run.number):
+        players.setdefault(run.player_id, []).append(run)
+
+    settled = []
+    for player_id, player_runs in players.items():
+        snapshot.restore(snapshot.RECORD.unpack(player_runs[0].record))
+        playercache.mark(Miner(player_id))
+        settled += [(run, settle(run)) for run in player_runs]
+        playercache.changed(Miner(player_id))
+    return settled
+
+
+async def repair(client: discord.Client, settled: list) -> dict:
+    """
+    Shows the final screen of every settled run on its message, a few at a time.
+
+    Args:
+        client (discord.Client): The bot, logged in.
+        settled (list): The (Checkpoint, last event) of every settled run.
+
+    Returns:
+        dict: The number of messages repaired and of messages which could not be.
+    """
+    limit = asyncio.Semaphore(REPAIR_CONCURRENCY)
+    report = {"repaired": 0, "failed": 0}
+
+    async def show(run: Checkpoint, event) -> None:
+        async with limit:
+            try:
+                await DiscordRenderer.render(RecoveredInteraction(client, run), event, False)
+                report["repaired"] += 1
+            except discord.HTTPException:  # deleted, or in a channel the bot left
+                report["failed"] += 1
+
+    await asyncio.gather(*(show(run, event) for run, event in settled if run.message_id))
+    return report
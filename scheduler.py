@@ -0,0 +1,155 @@
+"""
+Print Miner Discord Bot Game - Tick Scheduler
+
+This module drives every timed step of the game (mining animation frames, fight turns)
+from one place. Runs are kept as plain objects in a hierarchical timer wheel and a single
+asyncio task advances the wheel in fixed ticks, stepping every run that is due together.
+Classes include: TimerWheel and TickScheduler.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import asyncio
+import math
+import traceback
+
+TICK_SECONDS: float = 0.5  # resolution of every game delay
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel keyed by tick number.
+
+    Level 0 holds entries due within the next `slots` ticks, level 1 within the next
+    `slots ** 2` ticks and so on. Entries in the upper levels cascade down when the
+    lower level wraps around, so scheduling and expiring are both O(1).
+
+    Attributes:
+        now (int): The current tick.
+        pending (int): The number of entries waiting in the wheel.
+
+    Args:
+        slots (int): The number of slots per level.
+        levels (int): The number of levels.
+    """
+
+    def __init__(self, slots: int = 64, levels: int = 3):
+        self.slots = slots
+        self.levels = levels
+        self.wheels: list = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.now = 0
+        self.pending = 0
+
+    def schedule(self, ticks: int, item) -> None:
+        """
+        Adds an item which expires after the given amount of ticks.
+
+        Args:
+            ticks (int): The number of ticks to wait, at least one.
+            item: The entry returned by advance() once it expires.
+        """
+        self._insert(self.now + max(1, ticks), item)
+        self.pending += 1
+
+    def _insert(self, expiry: int, item) -> None:
+        """Places an entry in the lowest level which can hold its expiry."""
+        delta = expiry - self.now
+        for level in range(self.levels):
+            span = self.slots ** (level + 1)
+            if delta < span or level == self.levels - 1:
+                index = (expiry // self.slots**level) % self.slots
+                self.wheels[level][index].append((expiry, item))
+                return
+
+    def advance(self) -> list:
+        """Moves the wheel forward one tick and returns every item that is now due."""
+        self.now += 1
+
+        # Cascade the upper levels, highest first, so entries land in the right slot.
+        top = 0
+        while top + 1 < self.levels and self.now % self.slots ** (top + 1) == 0:
+            top += 1
+        for level in range(top, 0, -1):
+            index = (self.now // self.slots**level) % self.slots
+            bucket = self.wheels[level][index]
+            self.wheels[level][index] = []
+            for expiry, item in bucket:
+                self._insert(expiry, item)
+
+        index = self.now % self.slots
+        due = self.wheels[0][index]
+        self.wheels[0][index] = []
+
+        # Entries beyond the wheel's horizon are re-filed until they are really due.
+        items = []
+        for expiry, item in due:
+            if expiry <= self.now:
+                items.append(item)
+            else:
+                self._insert(expiry, item)
+        self.pending -= len(items)
+        return items
+
+
+class TickScheduler:
+    """
+    Steps runs on a shared timer wheel from a single asyncio task.
+
+    A run is any object with an `async step() -> float | None` method. The scheduler calls
+    `step` once the run is due and reschedules it after the returned delay in seconds,
+    or drops it when `step` returns None.
+
+    Args:
+        tick (float): The length of one tick in seconds.
+    """
+
+    def __init__(self, tick: float = TICK_SECONDS):
+        self.tick = tick
+        self.wheel = TimerWheel()
+        self.stepping = 0
+        self._task = None
+
+    @property
+    def pending(self) -> int:
+        """Returns the number of runs waiting for or in the middle of a step."""
+        return self.wheel.pending + self.stepping
+
+    def call_later(self, delay: float, run) -> None:
+        """
+        Schedules the next step of a run.
+
+        Args:
+            delay (float): Seconds until the step, rounded up to whole ticks. With a
+                tick of 0 every step happens on the next tick.
+            run: The run to step.
+        """
+        self.wheel.schedule(math.ceil(delay / self.tick) if self.tick else 1, run)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def _loop(self) -> None:
+        """Advances the wheel every tick until no runs are left."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self.wheel.pending:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            for run in self.wheel.advance():
+                self.stepping += 1
+                loop.create_task(self._step(run))
+
+    async def _step(self, run) -> None:
+        """Steps a single run and files its next step."""
+        try:
+            delay = await run.step()
+        except Exception:  # a broken run must not stop the other runs
+            traceback.print_exc()
+            return
+        finally:
+            self.stepping -= 1
+        if delay is not None:
+            self.call_later(delay, run)
@@ -0,0 +1,240 @@
+"""
+Print Miner Discord Bot Game - Economy Simulator
+
+This script plays many full player lifetimes offline to help balance shop prices and
+enemy stats. Each lifetime mines, fights, flees, heals, sells and buys on a headless
+game engine (see engine.py), so it plays by the same rules as the bot, with the mine
+map, the lairs and the content pack in play, until the miner dies or runs out of time.
+The pacing of every step is the pause the engine asks for.
+
+The work is split into batches played on a process pool.
+
+Usage:
+    python simulator.py --lifetimes 1000000 --hours 2
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from engine import Engine
+from gameobjects import Miner, Shop
+from scheduler import TICK_SECONDS
+
+CLICK_SECONDS: float = 1.5  # time a player takes to press a button
+BUCKET_SECONDS: int = 60  # width of a time-to-upgrade histogram bucket
+
+
+class Report:
+    """
+    Aggregated results of a batch of lifetimes. Reports from several batches merge by
+    adding them together.
+
+    Attributes:
+        lifetimes (int): The number of lifetimes played.
+        upgrades (dict): Histograms of seconds until each item was bought, in buckets.
+        reached (dict): The number of lifetimes which reached each level.
+        deaths (dict): The number of lifetimes which died at each level.
+        tier_gold (dict): The gold mined while holding each tool.
+        tier_seconds (dict): The seconds spent holding each tool.
+    """
+
+    def __init__(self):
+        self.lifetimes = 0
+        self.upgrades: dict = {}
+        self.reached: dict = {}
+        self.deaths: dict = {}
+        self.tier_gold: dict = {}
+        self.tier_seconds: dict = {}
+
+    def merge(self, other: "Report") -> None:
+        """Adds the results of another report to this one."""
+        self.lifetimes += other.lifetimes
+        for name, histogram in other.upgrades.items():
+            mine = self.upgrades.setdefault(name, {})
+            for bucket, count in histogram.items():
+                mine[bucket] = mine.get(bucket, 0) + count
+        for table, theirs in (
+            (self.reached, other.reached),
+            (self.deaths, other.deaths),
+            (self.tier_gold, other.tier_gold),
+            (self.tier_seconds, other.tier_seconds),
+        ):
+            for key, value in theirs.items():
+                table[key] = table.get(key, 0) + value
+
+    @staticmethod
+    def percentile(histogram: dict, fraction: float) -> float:
+        """Returns the given percentile of a histogram in minutes."""
+        target = fraction * sum(histogram.values())
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= target:
+                return (bucket + 1) * BUCKET_SECONDS / 60
+        return 0.0
+
+    def display(self, elapsed: float) -> str:
+        """Returns the report as text."""
+        lines = [f"{self.lifetimes} lifetimes simulated in {elapsed:.2f}s", ""]
+
+        lines.append("Time to upgrade (minutes)     bought    p10    p50    p90")
+        for name, histogram in sorted(self.upgrades.items()):
+            bought = sum(histogram.values())
+            lines.append(
+                f"  {name:<26}{bought / self.lifetimes:>8.1%}"
+                + "".join(
+                    f"{Report.percentile(histogram, f):>7.1f}" for f in (0.1, 0.5, 0.9)
+                )
+            )
+
+        lines += ["", "Death rate per level          reached   died"]
+        for level in sorted(self.reached):
+            died = self.deaths.get(level, 0)
+            lines.append(
+                f"  Lvl {level:<22}{self.reached[level]:>8}{died / self.reached[level]:>7.1%}"
+            )
+
+        lines += ["", "Gold per hour per tool        gold/h"]
+        for name, seconds in sorted(self.tier_seconds.items()):
+            gold_per_hour = self.tier_gold.get(name, 0) / seconds * 3600 if seconds else 0
+            lines.append(f"  {name:<26}{gold_per_hour:>8.0f}")
+        return "\n".join(lines)
+
+
+def _pause(seconds) -> float:
+    """Returns the play time of one engine step, which lasts at least one tick."""
+    return max(seconds or 0, TICK_SECONDS)
+
+
+def play_lifetime(
+    engine: Engine,
+    miner: Miner,
+    shop: Shop,
+    report: Report,
+    seconds: float,
+    rng: random.Random,
+) -> None:
+    """
+    Plays one lifetime with a simple policy: sell the inventory, heal below half health,
+    buy the next tool or weapon as soon as it is affordable, fight when healthy and flee
+    otherwise.
+
+    Args:
+        engine (Engine): The headless engine the lifetime is played on.
+        miner (Miner): The miner, reset before the lifetime starts.
+        shop (Shop): The shop, reset before the lifetime starts.
+        report (Report): The report the results are added to.
+        seconds (float): The play time available to the lifetime.
+        rng (random.Random): The random source of the lifetime.
+    """
+    miner.reset()
+    shop.reset()
+    clock = 0.0
+    report.reached[1] = report.reached.get(1, 0) + 1
+
+    while clock < seconds:
+        # Shopping between runs.
+        if any(miner.inventory):
+            engine.sell_all(miner, shop)
+            clock += CLICK_SECONDS
+        if miner.health * 2 < miner.max_health and engine.buy_health(miner, shop):
+            clock += CLICK_SECONDS
+        for stock, item, purchase in (
+            (shop.tool_stock, shop.current_tool, engine.buy_tool),
+            (shop.weapon_stock, shop.current_weapon, engine.buy_weapon),
+        ):
+            if stock and purchase(miner, shop):
+                bucket = int(clock // BUCKET_SECONDS)
+                histogram = report.upgrades.setdefault(item.name, {})
+                histogram[bucket] = histogram.get(bucket, 0) + 1
+                clock += CLICK_SECONDS
+
+        # Mining run. The gold of a tool is what it finds plus the value of its chunks.
+        tool = miner.tool
+        level = miner.level
+        worth = miner.gold_credits + Shop.get_inventory_value(miner)
+        run = engine.start_mining(miner, rng)
+        run_seconds = CLICK_SECONDS + TICK_SECONDS
+        pause = engine.mine_step(run)
+        while pause is not None:
+            run_seconds += _pause(pause)
+            pause = engine.mine_step(run)
+        gold = miner.gold_credits + Shop.get_inventory_value(miner) - worth
+        report.tier_gold[tool.name] = report.tier_gold.get(tool.name, 0) + gold
+        report.tier_seconds[tool.name] = report.tier_seconds.get(tool.name, 0) + run_seconds
+        clock += run_seconds
+        if miner.level > level:
+            report.reached[miner.level] = report.reached.get(miner.level, 0) + 1
+
+        if run.enemy is None:
+            continue
+
+        # Enemy encounter, the lair's or a random one.
+        clock += CLICK_SECONDS
+        if miner.health * 2 < miner.max_health:
+            engine.flee(miner, run.enemy, rng)
+            continue
+
+        fight = engine.start_fight(miner, run.enemy, rng)
+        pause = engine.fight_step(fight)
+        while pause is not None:
+            clock += _pause(pause)
+            pause = engine.fight_step(fight)
+        clock += 1
+
+        if miner.health <= 0:
+            report.deaths[miner.level] = report.deaths.get(miner.level, 0) + 1
+            break
+
+
+def play_batch(lifetimes: int, seconds: float, seed: int) -> Report:
+    """Plays a batch of lifetimes in a worker process and returns their report."""
+    random.seed(seed)  # the mine map seeds of Miner.reset()
+    rng = random.Random(seed)
+    engine = Engine()
+    miner = Miner()
+    shop = Shop()
+    report = Report()
+    report.lifetimes = lifetimes
+    for _ in range(lifetimes):
+        play_lifetime(engine, miner, shop, report, seconds, rng)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate the Print Miner economy.")
+    parser.add_argument("--lifetimes", type=int, default=100_000)
+    parser.add_argument("--hours", type=float, default=1.0, help="play time per lifetime")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=2_000, help="lifetimes per task")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    seeds = random.Random(args.seed)
+    batches = [
+        min(args.batch, args.lifetimes - start)
+        for start in range(0, args.lifetimes, args.batch)
+    ]
+
+    started = time.perf_counter()
+    report = Report()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(play_batch, size, args.hours * 3600, seeds.getrandbits(64))
+            for size in batches
+        ]
+        for future in futures:
+            report.merge(future.result())
+    print(report.display(time.perf_counter() - started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Print Miner Discord Bot Game - Player Snapshots
+
+This module saves and loads player state (Miner and Shop) in a compact fixed-layout binary
+format. A snapshot is a header followed by one struct-packed record per player, so a
+whole file is written with pack_into on one buffer and read back with iter_unpack.
+
+Snapshots are versioned. Records written by an older version are upgraded on load by the
+functions in MIGRATIONS, one version at a time.
+
+Layout (little endian):
+    header : magic (4s), version (u16), record count (u32)
+    record : see LAYOUTS for each version
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import os
+import random
+import struct
+from array import array
+from gameobjects import Miner, Shop, TOOL_CATALOG, WEAPON_CATALOG, MINERALS, EMPTY_INVENTORY
+
+MAGIC: bytes = b"PMSN"
+VERSION: int = 3
+
+HEADER = struct.Struct("<4sHI")
+
+# player_id, gold_credits, health, max_health, level, experience,
+# tool id, weapon id, tool stock mask, weapon stock mask, game_over
+# (version 2) map seed, map x, map y
+# (version 3) chunks of every mineral in the inventory, by mineral id
+LAYOUTS: dict = {
+    1: struct.Struct("<QqhhHIBBBB?"),
+    2: struct.Struct("<QqhhHIBBBB?Iii"),
+    3: struct.Struct(f"<QqhhHIBBBB?Iii{len(MINERALS)}I"),
+}
+
+
+def _add_mine_map(record: tuple) -> tuple:
+    """Version 1 -> 2: gives the player a mine map, seeded from their player id."""
+    return record + (random.Random(record[0]).getrandbits(32), 0, 0)
+
+
+def _add_inventory(record: tuple) -> tuple:
+    """Version 2 -> 3: gives the player an empty mineral inventory."""
+    return record + tuple(EMPTY_INVENTORY)
+
+
+# MIGRATIONS[version] turns a record tuple of `version` into one of `version + 1`.
+MIGRATIONS: dict = {
+    1: _add_mine_map,
+    2: _add_inventory,
+}
+
+RECORD = LAYOUTS[VERSION]
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot can not be read."""
+
+
+def pack_into(buffer: bytearray, offset: int, miner: Miner, shop: Shop) -> None:
+    """Writes one player's record into a buffer at the given offset."""
+    RECORD.pack_into(
+        buffer,
+        offset,
+        miner.player_id,
+        miner.gold_credits,
+        miner.health,
+        miner.max_health,
+        miner.level,
+        miner.experience,
+        TOOL_CATALOG.ids[miner.tool.name],
+        WEAPON_CATALOG.ids[miner.weapon.name],
+        shop.tool_stock,
+        shop.weapon_stock,
+        miner.game_over,
+        miner.map_seed,
+        miner.x,
+        miner.y,
+        *miner.inventory,
+    )
+
+
+def restore(record: tuple) -> tuple:
+    """
+    Loads one record of the current version into the player's Miner and Shop.
+
+    Returns:
+        tuple: The player's Miner and Shop.
+    """
+    (
+        player_id,
+        gold_credits,
+        health,
+        max_health,
+        level,
+        experience,
+        tool,
+        weapon,
+        tool_stock,
+        weapon_stock,
+        game_over,
+        map_seed,
+        x,
+        y,
+        *inventory,
+    ) = record
+
+    miner = Miner(player_id)
+    miner.gold_credits = gold_credits
+    miner.health = health
+    miner.max_health = max_health
+    miner.level = level
+    miner.experience = experience
+    miner.tool = TOOL_CATALOG[tool]
+    miner.weapon = WEAPON_CATALOG[weapon]
+    miner.game_over = game_over
+    miner.map_seed = map_seed
+    miner.x = x
+    miner.y = y
+    miner.inventory[:] = array("I", inventory)
+
+    shop = Shop(player_id)
+    shop.tool_stock = tool_stock
+    shop.weapon_stock = weapon_stock
+    return miner, shop
+
+
+def dumps(players: list, packed: list = ()) -> bytes:
+    """
+    Packs players into a snapshot.
+
+    Args:
+        players (list): The (Miner, Shop) pair of every player to save.
+        packed (list): The records of more players, already packed.
+    """
+    count = len(players) + len(packed)
+    buffer = bytearray(HEADER.size + RECORD.size * count)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, count)
+    offset = HEADER.size
+    for miner, shop in players:
+        pack_into(buffer, offset, miner, shop)
+        offset += RECORD.size
+    for record in packed:
+        buffer[offset : offset + RECORD.size] = record
+        offset += RECORD.size
+    return bytes(buffer)
+
+
+def records(data: bytes) -> list:
+    """Returns the records of a snapshot as tuples of the current version."""
+    if len(data) < HEADER.size:
+        raise SnapshotError("snapshot is truncated")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in LAYOUTS or version > VERSION:
+        raise SnapshotError(f"not a version {VERSION} snapshot")
+
+    layout = LAYOUTS[version]
+    body = memoryview(data)[HEADER.size : HEADER.size + layout.size * count]
+    if len(body) != layout.size * count:
+        raise SnapshotError("snapshot is truncated")
+
+    rows = list(layout.iter_unpack(body))
+    while version < VERSION:
+        rows = [MIGRATIONS[version](row) for row in rows]
+        version += 1
+    return rows
+
+
+def loads(data: bytes) -> list:
+    """Loads every player of a snapshot. Returns their (Miner, Shop) pairs."""
+    return [restore(record) for record in records(data)]
+
+
+def resident_players() -> list:
+    """Returns the (Miner, Shop) pair of every player in memory."""
+    return [
+        (miner, Shop(player_id))
+        for player_id, miner in Miner.instances().items()
+        if player_id != 0  # the shared default player is not a real player
+    ]
+
+
+def save(path: str, players: list = None, packed: list = ()) -> int:
+    """
+    Writes a snapshot file, replacing the old one only once the new one is complete.
+
+    Args:
+        path (str): The snapshot file.
+        players (list): The (Miner, Shop) pairs to save, by default every resident player.
+        packed (list): The packed records of more players, such as hibernated ones.
+
+    Returns:
+        int: The number of players saved.
+    """
+    if players is None:
+        players = resident_players()
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(dumps(players, packed))
+    os.replace(temporary, path)
+    return len(players) + len(packed)
+
+
+def load(path: str) -> int:
+    """Loads every player of a snapshot file, if there is one. Returns the player count."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as file:
+        return len(loads(file.read()))
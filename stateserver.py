@@ -0,0 +1,473 @@
+"""
+Print Miner Discord Bot Game - Shared State Server
+
+This module holds player state in one local process so that several bot processes share
+a single consistent view of every player. Bot workers talk to it over a Unix domain
+socket with a small fixed-layout binary protocol. Every operation is applied whole
+before the next one is read, so read-modify-write operations on gold, health, experience
+and the inventory are atomic. Purchases and sales follow the Shop's rules, with the
+prices of the content pack the server has in play, never a price sent by a worker.
+Workers send the changes their game engine makes as these operations, so the changes
+of two workers to the same player add up instead of overwriting each other.
+Classes include: PlayerRecord, StateServer, StateClient and StatePool.
+
+Protocol:
+    request  : op (u8), request id (u32), player id (u64), op payload
+    response : request id (u32), status (u8), player record
+
+Usage:
+    python stateserver.py --socket /tmp/printminer.sock
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import asyncio
+import enum
+import itertools
+import operator
+import struct
+from array import array
+from collections import namedtuple
+from gameobjects import Miner, Shop, TOOL_CATALOG, WEAPON_CATALOG, MINERALS, EMPTY_INVENTORY
+from gameobjects import MARKET_PRICES
+import content
+
+SOCKET_PATH: str = "/tmp/printminer.sock"
+REQUEST_TIMEOUT: float = 5.0  # seconds a request waits for its answer
+
+REQUEST = struct.Struct("!BIQ")
+RESPONSE = struct.Struct("!IB")
+RECORD = struct.Struct(f"!qhhHIBB{len(MINERALS)}I")
+AMOUNT = struct.Struct("!q")
+PURCHASE = struct.Struct("!B")  # the catalog id of the item bought
+CHUNKS = struct.Struct("!BI")  # mineral id, chunks
+
+
+class Op(enum.IntEnum):
+    """Enum class to represent the operations of the state protocol."""
+
+    GET = 0
+    PUT = 1
+    ADD_GOLD = 2
+    ADD_HEALTH = 3
+    HEAL = 4
+    BUY_TOOL = 5
+    BUY_WEAPON = 6
+    ADD_CHUNKS = 7
+    SELL_ALL = 8
+    ADD_EXPERIENCE = 9
+    LEVEL_UP = 10
+
+
+class Status(enum.IntEnum):
+    """Enum class to represent the outcome of an operation."""
+
+    OK = 0
+    REFUSED = 1
+
+
+PAYLOADS: dict = {
+    Op.GET: None,
+    Op.PUT: RECORD,
+    Op.ADD_GOLD: AMOUNT,
+    Op.ADD_HEALTH: AMOUNT,
+    Op.HEAL: None,
+    Op.BUY_TOOL: PURCHASE,
+    Op.BUY_WEAPON: PURCHASE,
+    Op.ADD_CHUNKS: CHUNKS,
+    Op.SELL_ALL: None,
+    Op.ADD_EXPERIENCE: AMOUNT,
+    Op.LEVEL_UP: None,
+}
+
+
+class PlayerRecord(
+    namedtuple(
+        "PlayerRecord",
+        "gold_credits health max_health level experience tool weapon inventory",
+    )
+):
+    """
+    The shared state of one player. Tools and weapons are stored as their id in
+    TOOL_CATALOG and WEAPON_CATALOG, and the inventory as a tuple of the chunks of every
+    mineral, by mineral id.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def unpack_from(buffer, offset: int = 0) -> "PlayerRecord":
+        """Returns the record packed in a buffer at an offset."""
+        stats = RECORD.unpack_from(buffer, offset)
+        return PlayerRecord(*stats[:7], tuple(stats[7:]))
+
+    def pack(self) -> bytes:
+        """Returns the record packed with RECORD."""
+        return RECORD.pack(*self[:7], *self.inventory)
+
+    @staticmethod
+    def from_miner(miner: Miner) -> "PlayerRecord":
+        """Returns the record of a Miner."""
+        return PlayerRecord(
+            miner.gold_credits,
+            miner.health,
+            miner.max_health,
+            miner.level,
+            miner.experience,
+            TOOL_CATALOG.id_of(miner.tool),
+            WEAPON_CATALOG.id_of(miner.weapon),
+            tuple(miner.inventory),
+        )
+
+    def apply(self, miner: Miner, shop: Shop = None) -> None:
+        """Copies the record onto a Miner, and the Shop stock of its tiers onto a Shop."""
+        miner.gold_credits = self.gold_credits
+        miner.health = self.health
+        miner.max_health = self.max_health
+        miner.level = self.level
+        miner.experience = self.experience
+        miner.weild_tool(TOOL_CATALOG[self.tool])
+        miner.weild_weapon(WEAPON_CATALOG[self.weapon])
+        miner.inventory[:] = array("I", self.inventory)
+        if shop is not None:  # the tiers up to the one wielded are sold
+            shop.tool_stock = TOOL_CATALOG.full_stock & ~((2 << self.tool) - 1)
+            shop.weapon_stock = WEAPON_CATALOG.full_stock & ~((2 << self.weapon) - 1)
+
+
+NEW_PLAYER = PlayerRecord(0, 50, 50, 1, 0, 0, 0, tuple(EMPTY_INVENTORY))  # a new Miner
+
+
+def apply_op(record: PlayerRecord, op: int, payload: tuple) -> tuple:
+    """
+    Applies one operation to a player's record, as the game's rules would.
+
+    Args:
+        record (PlayerRecord): The player's record.
+        op (int): The operation.
+        payload (tuple): The unpacked payload of the operation.
+
+    Returns:
+        tuple: The Status of the operation and the record afterwards, which is the same
+            record if the operation was refused.
+    """
+    if op == Op.PUT:
+        record = payload
+    elif op == Op.ADD_GOLD:
+        record = record._replace(gold_credits=max(record.gold_credits + payload[0], 0))
+    elif op == Op.ADD_HEALTH:
+        health = min(max(record.health + payload[0], 0), record.max_health)
+        record = record._replace(health=health)
+    elif op == Op.HEAL:  # as Shop.purchase_health
+        price = (record.max_health - record.health) * 10
+        if record.gold_credits < price or record.health == record.max_health:
+            return Status.REFUSED, record
+        record = record._replace(gold_credits=record.gold_credits - price, health=record.max_health)
+    elif op in (Op.BUY_TOOL, Op.BUY_WEAPON):
+        # As Shop.purchase_tool and purchase_weapon: the tiers are sold in order, and a
+        # player who can afford the next one wields it. The price is not taken.
+        (tier,) = payload
+        field = "tool" if op == Op.BUY_TOOL else "weapon"
+        catalog = TOOL_CATALOG if op == Op.BUY_TOOL else WEAPON_CATALOG
+        if tier != getattr(record, field) + 1 or tier >= len(catalog):
+            return Status.REFUSED, record
+        if record.gold_credits < catalog[tier].price:
+            return Status.REFUSED, record
+        record = record._replace(**{field: tier})
+    elif op == Op.ADD_CHUNKS:
+        mineral_id, chunks = payload
+        if mineral_id >= len(MINERALS):
+            return Status.REFUSED, record
+        inventory = list(record.inventory)
+        inventory[mineral_id] = min(inventory[mineral_id] + chunks, 0xFFFFFFFF)
+        record = record._replace(inventory=tuple(inventory))
+    elif op == Op.SELL_ALL:  # as Shop.sell_all
+        value = sum(map(operator.mul, record.inventory, MARKET_PRICES))
+        record = record._replace(
+            gold_credits=record.gold_credits + value, inventory=tuple(EMPTY_INVENTORY)
+        )
+    elif op == Op.ADD_EXPERIENCE:
+        record = record._replace(experience=min(max(record.experience + payload[0], 0), 0xFFFFFFFF))
+    elif op == Op.LEVEL_UP:  # as Miner.level_up, once the worker's miner leveled up
+        max_health = record.max_health + 10
+        record = record._replace(
+            level=record.level + 1, experience=0, max_health=max_health, health=max_health
+        )
+    return Status.OK, record
+
+
+class StateServer:
+    """
+    Serves player records over a Unix domain socket.
+
+    Attributes:
+        players (dict): The record of every player, by player id.
+    """
+
+    def __init__(self):
+        self.players: dict = {}
+
+    def apply(self, op: int, player_id: int, payload: tuple) -> int:
+        """
+        Applies one operation to a player's record.
+
+        Args:
+            op (int): The operation.
+            player_id (int): The player the operation is for.
+            payload (tuple): The unpacked payload of the operation.
+
+        Returns:
+            int: The Status of the operation.
+        """
+        if op == Op.GET:
+            return Status.OK
+        status, record = apply_op(self.players.get(player_id, NEW_PLAYER), op, payload)
+        if status == Status.OK:
+            self.players[player_id] = record
+        return status
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers every request of one connection, in order."""
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+
+                # Answer every complete request in the buffer with one write.
+                out = bytearray()
+                offset = 0
+                while len(buffer) - offset >= REQUEST.size:
+                    op, request_id, player_id = REQUEST.unpack_from(buffer, offset)
+                    if op not in PAYLOADS:
+                        return  # not speaking the protocol, drop the connection
+                    payload_struct = PAYLOADS[op]
+                    size = REQUEST.size + (payload_struct.size if payload_struct else 0)
+                    if len(buffer) - offset < size:
+                        break
+                    if payload_struct is RECORD:
+                        payload = PlayerRecord.unpack_from(buffer, offset + REQUEST.size)
+                    elif payload_struct:
+                        payload = payload_struct.unpack_from(buffer, offset + REQUEST.size)
+                    else:
+                        payload = ()
+                    status = self.apply(op, player_id, payload)
+                    out += RESPONSE.pack(request_id, status)
+                    out += self.players.get(player_id, NEW_PLAYER).pack()
+                    offset += size
+                del buffer[:offset]
+                writer.write(out)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path: str = SOCKET_PATH) -> None:
+        """
+        Serves clients on the given socket path until cancelled, following the content
+        pack the bot workers play so the prices stay the same as theirs.
+        """
+        server = await asyncio.start_unix_server(self.handle, path=path)
+        watcher = asyncio.ensure_future(_watch(content.Watcher()))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+async def _watch(watcher: content.Watcher) -> None:
+    while True:
+        await asyncio.sleep(await watcher.step())
+
+
+class StateClient:
+    """
+    One pipelined connection to the state server. Requests are written as soon as they
+    are made and answered in order, so many requests can be in flight at once. A request
+    fails if it is not answered in time or the connection is lost, so a dead server never
+    keeps a click waiting.
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.pending: dict = {}
+        self.request_ids = itertools.count()
+        self.closed = True
+        self._reader_task = None
+
+    async def connect(self, path: str = SOCKET_PATH) -> None:
+        """Opens the connection."""
+        self.reader, self.writer = await asyncio.open_unix_connection(path)
+        self.closed = False
+        self._reader_task = asyncio.get_running_loop().create_task(self._read())
+
+    async def close(self) -> None:
+        """Closes the connection."""
+        self.writer.close()
+        self._reader_task.cancel()
+
+    async def _read(self) -> None:
+        """Resolves pending requests as their responses arrive."""
+        size = RESPONSE.size + RECORD.size
+        try:
+            while True:
+                data = await self.reader.readexactly(size)
+                request_id, status = RESPONSE.unpack_from(data)
+                future = self.pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(
+                        (Status(status), PlayerRecord.unpack_from(data, RESPONSE.size))
+                    )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:  # no answer will come any more
+            self.closed = True
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("the state server connection closed"))
+            self.pending.clear()
+
+    def _expire(self, request_id: int) -> None:
+        future = self.pending.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_exception(asyncio.TimeoutError("the state server did not answer"))
+
+    def request(
+        self, op: Op, player_id: int, payload: bytes = b"", timeout: float = REQUEST_TIMEOUT
+    ) -> asyncio.Future:
+        """
+        Sends a request without waiting for the answer.
+
+        Returns:
+            asyncio.Future: Resolves to the Status and the player's record afterwards,
+                or fails with ConnectionError or asyncio.TimeoutError.
+        """
+        if self.closed:
+            raise ConnectionError("the state server connection is closed")
+        loop = asyncio.get_running_loop()
+        request_id = next(self.request_ids) & 0xFFFFFFFF
+        future = loop.create_future()
+        self.pending[request_id] = future
+        expiry = loop.call_later(timeout, self._expire, request_id)
+        future.add_done_callback(lambda _: expiry.cancel())
+        self.writer.write(REQUEST.pack(op, request_id, player_id) + payload)
+        return future
+
+
+class StatePool:
+    """
+    A fixed pool of pipelined connections shared by one bot worker. A connection found
+    closed, because the state server restarted, is opened again by the next request
+    routed to it.
+
+    Args:
+        path (str): The socket path of the state server.
+        size (int): The number of connections to keep open.
+    """
+
+    def __init__(self, path: str = SOCKET_PATH, size: int = 4):
+        self.path = path
+        self.clients = [StateClient() for _ in range(size)]
+        self.closing = False
+        self.reconnects = 0
+        self._next = itertools.cycle(self.clients)
+        self._reconnecting: dict = {}  # the reconnection in flight of every closed client
+
+    async def connect(self) -> None:
+        """Opens every connection in the pool."""
+        for client in self.clients:
+            await client.connect(self.path)
+
+    async def close(self) -> None:
+        """Closes every connection in the pool."""
+        self.closing = True
+        for client in self.clients:
+            if not client.closed:
+                await client.close()
+
+    async def call(self, op: Op, player_id: int, payload: bytes = b"") -> tuple:
+        """Sends one operation. Returns the Status and the player's record afterwards."""
+        client = next(self._next)
+        if client.closed:
+            await self._reconnect(client)
+        return await client.request(op, player_id, payload)
+
+    async def _reconnect(self, client: StateClient) -> None:
+        if self.closing:
+            raise ConnectionError("the state pool is closed")
+        reconnect = self._reconnecting.get(client)
+        if reconnect is None:  # one reconnection, however many requests wait on it
+            reconnect = asyncio.ensure_future(self._connect(client))
+            self._reconnecting[client] = reconnect
+        await asyncio.shield(reconnect)
+
+    async def _connect(self, client: StateClient) -> None:
+        try:
+            await client.connect(self.path)
+            self.reconnects += 1
+        except OSError as error:  # the server is not back yet
+            raise ConnectionError(f"can not reach the state server: {error}") from error
+        finally:
+            del self._reconnecting[client]
+
+    async def get(self, player_id: int) -> PlayerRecord:
+        """Returns a player's record."""
+        return (await self.call(Op.GET, player_id))[1]
+
+    async def put(self, player_id: int, record: PlayerRecord) -> None:
+        """Replaces a player's record, only after Miner.reset()."""
+        await self.call(Op.PUT, player_id, record.pack())
+
+    async def add_gold(self, player_id: int, amount: int) -> PlayerRecord:
+        """Adds (or with a negative amount, takes) gold credits, never below zero."""
+        return (await self.call(Op.ADD_GOLD, player_id, AMOUNT.pack(amount)))[1]
+
+    async def add_health(self, player_id: int, amount: int) -> PlayerRecord:
+        """Adds (or takes) health, kept between zero and the maximum health."""
+        return (await self.call(Op.ADD_HEALTH, player_id, AMOUNT.pack(amount)))[1]
+
+    async def heal(self, player_id: int) -> tuple:
+        """Buys full health at the Shop price. Returns the Status and the record."""
+        return await self.call(Op.HEAL, player_id)
+
+    async def buy_tool(self, player_id: int, tier: int) -> tuple:
+        """Buys the next tool, of the given tier. Returns the Status and the record."""
+        return await self.call(Op.BUY_TOOL, player_id, PURCHASE.pack(tier))
+
+    async def buy_weapon(self, player_id: int, tier: int) -> tuple:
+        """Buys the next weapon, of the given tier. Returns the Status and the record."""
+        return await self.call(Op.BUY_WEAPON, player_id, PURCHASE.pack(tier))
+
+    async def add_chunks(self, player_id: int, mineral_id: int, chunks: int) -> PlayerRecord:
+        """Adds mined chunks of a mineral to the inventory."""
+        return (await self.call(Op.ADD_CHUNKS, player_id, CHUNKS.pack(mineral_id, chunks)))[1]
+
+    async def sell_all(self, player_id: int) -> PlayerRecord:
+        """Sells the whole inventory at the market prices."""
+        return (await self.call(Op.SELL_ALL, player_id))[1]
+
+    async def add_experience(self, player_id: int, amount: int) -> PlayerRecord:
+        """Adds (or takes) experience, without leveling up."""
+        return (await self.call(Op.ADD_EXPERIENCE, player_id, AMOUNT.pack(amount)))[1]
+
+    async def level_up(self, player_id: int) -> PlayerRecord:
+        """Levels up as Miner.level_up, after the player's Miner leveled up."""
+        return (await self.call(Op.LEVEL_UP, player_id))[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve shared Print Miner player state.")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    args = parser.parse_args()
+    asyncio.run(StateServer().serve(args.socket))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Print Miner Discord Bot Game - Interaction Traces
+
+This module records anonymized traces of real play sessions and replays them offline.
+A trace holds every button click in order: when it happened, which anonymous session
+it belongs to, which button was pressed and the seed of the random source the click's
+game logic drew from. Discord user ids are never written, each player becomes a session
+number which is only known while the trace is being recorded. The seed of the player's
+mine map is written when their session first shows up, and a player who starts over
+draws their new map from the click, so a replay digs the same mines.
+
+The replayer plays a trace back against the real game logic with a stand-in for the
+Discord layer, at the recorded speed, faster, or as fast as possible, and reports
+CPU time and click latency.
+
+Format (little endian):
+    name  : kind 0 (u8), button code (u8), name length (u8), "View.label" (utf-8)
+    click : kind 1 (u8), milliseconds since start (u32), session (u32),
+            button code (u8), seed (u64)
+    map   : kind 2 (u8), session (u32), map seed (u32), before the session's first click
+
+Usage:
+    PRINTMINER_TRACE=session.trace python main.py
+    python traces.py show session.trace
+    python traces.py replay session.trace --speed 10
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import time
+from types import SimpleNamespace
+from gameobjects import Miner
+
+NAME = struct.Struct("<BBB")
+CLICK = struct.Struct("<BIIBQ")
+MAP = struct.Struct("<BII")
+
+KIND_NAME: int = 0
+KIND_CLICK: int = 1
+KIND_MAP: int = 2
+
+WAIT_SECONDS: float = 30.0  # longest a replayed click waits for its button to show up
+
+
+class TraceRecorder:
+    """
+    Writes the clicks of every player to a trace file.
+
+    Args:
+        path (str): The trace file, replaced if it exists.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "wb", buffering=64 * 1024)
+        self.started = time.monotonic()
+        self.sessions: dict = {}  # Discord user id -> session number, never written
+        self.buttons: dict = {}  # "View.label" -> button code
+
+    def click(self, player_id: int, button: str) -> int:
+        """
+        Records one click.
+
+        Args:
+            player_id (int): The Discord user id of the player.
+            button (str): The button pressed, as "View.label".
+
+        Returns:
+            int: The seed of the click's random source.
+        """
+        code = self.buttons.get(button)
+        if code is None:
+            code = self.buttons[button] = len(self.buttons)
+            name = button.encode()
+            self.file.write(NAME.pack(KIND_NAME, code, len(name)) + name)
+
+        seed = random.getrandbits(64)
+        session = self.sessions.get(player_id)
+        if session is None:
+            session = self.sessions[player_id] = len(self.sessions)
+            self.file.write(MAP.pack(KIND_MAP, session, Miner(player_id).map_seed))
+        milliseconds = int((time.monotonic() - self.started) * 1000)
+        self.file.write(CLICK.pack(KIND_CLICK, milliseconds, session, code, seed))
+        return seed
+
+    def close(self) -> None:
+        """Flushes and closes the trace file."""
+        self.file.close()
+
+
+recorder: TraceRecorder = None
+
+
+def start(path: str) -> None:
+    """Starts recording every click to a trace file."""
+    global recorder
+    recorder = TraceRecorder(path)
+
+
+def stop() -> None:
+    """Stops recording, if a trace is being recorded."""
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
+
+
+def click(player_id: int, view_name: str, label: str) -> random.Random:
+    """
+    Returns the random source for a click's game logic, recording the click if a trace
+    is being recorded.
+    """
+    if recorder is None:
+        return random.Random()
+    return random.Random(recorder.click(player_id, f"{view_name}.{label}"))
+
+
+def read(path: str) -> list:
+    """Returns the clicks of a trace as (milliseconds, session, button, seed) tuples."""
+    return read_all(path)[0]
+
+
+def read_all(path: str) -> tuple:
+    """Returns the clicks of a trace, as read(), and the map seed of every session."""
+    with open(path, "rb") as file:
+        data = file.read()
+
+    names: dict = {}
+    clicks = []
+    map_seeds: dict = {}
+    offset = 0
+    while offset < len(data):
+        if data[offset] == KIND_NAME:
+            _, code, length = NAME.unpack_from(data, offset)
+            offset += NAME.size
+            names[code] = data[offset : offset + length].decode()
+            offset += length
+        elif data[offset] == KIND_MAP:
+            _, session, map_seed = MAP.unpack_from(data, offset)
+            offset += MAP.size
+            map_seeds[session] = map_seed
+        else:
+            _, milliseconds, session, code, seed = CLICK.unpack_from(data, offset)
+            offset += CLICK.size
+            clicks.append((milliseconds, session, names[code], seed))
+    return clicks, map_seeds
+
+
+def payload_size(embed=None, view=None, content: str = None) -> int:
+    """Returns the size of the JSON body Discord would be sent for a message edit."""
+    payload = {}
+    if content is not None:
+        payload["content"] = content
+    if embed is not None:
+        payload["embeds"] = [embed.to_dict()]
+    payload["components"] = view.to_components() if view is not None else []
+    return len(json.dumps(payload, separators=(",", ":")).encode())
+
+
+class ReplayResponse:
+    """Stand-in for discord.InteractionResponse."""
+
+    def __init__(self, interaction: "ReplayInteraction"):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self) -> bool:
+        return self.done
+
+    async def defer(self, **kwargs) -> None:
+        self.done = True
+        self.interaction.session.calls["defer"] += 1
+        self.interaction.session.log.append(("defer", None, 0))
+
+    async def send_message(self, content=None, *, embed=None, view=None, **kwargs) -> None:
+        self.done = True
+        self.interaction.session.show(embed, view, "send_message", content)
+
+    async def edit_message(self, *, embed=None, view=None, **kwargs) -> None:
+        self.done = True
+        self.interaction.session.show(embed, view, "edit_message")
+
+
+class ReplayInteraction:
+    """Stand-in for discord.Interaction on a replayed session's message."""
+
+    def __init__(self, session: "ReplaySession"):
+        self.session = session
+        self.user = session.user
+        self.message = session.message
+        self.response = ReplayResponse(self)
+
+    async def edit_original_response(self, *, embed=None, view=None, **kwargs) -> None:
+        self.session.show(embed, view, "edit_original_response")
+
+
+class ReplaySession:
+    """
+    The game message of one replayed player and the buttons currently on it.
+
+    Args:
+        number (int): The session number from the trace.
+    """
+
+    def __init__(self, number: int):
+        self.user = SimpleNamespace(id=1_000_000 + number)
+        self.message = SimpleNamespace(id=2_000_000 + number)
+        self.view = None
+        self.calls: dict = {"defer": 0, "send_message": 0, "edit_message": 0, "edit_original_response": 0}
+        self.sent_bytes = 0
+        self.log: list = []  # (call, view name, bytes) of every call, in order
+
+    def show(self, embed, view, call: str, content: str = None) -> None:
+        """Puts an embed and its buttons on the session's message."""
+        self.view = view
+        self.calls[call] += 1
+        size = payload_size(embed, view, content)
+        self.sent_bytes += size
+        self.log.append((call, type(view).__name__ if view is not None else None, size))
+
+    def button(self, view_name: str, label: str):
+        """Returns the button with the label, if it is on the message right now."""
+        if self.view is None or type(self.view).__name__ != view_name:
+            return None
+        for item in self.view.children:
+            if getattr(item, "label", None) == label:
+                return item
+        return None
+
+
+async def replay(path: str, speed: float) -> dict:
+    """
+    Plays a trace back against the game logic.
+
+    Args:
+        path (str): The trace file.
+        speed (float): How many times faster than recorded to play, 0 for no waiting.
+
+    Returns:
+        dict: The replay's measurements.
+    """
+    import gamebuttons
+    import printminer
+    from scheduler import TICK_SECONDS
+
+    scheduler = printminer.PrintMiner.scheduler
+    scheduler.tick = TICK_SECONDS / speed if speed else 0.0
+    views = {"LoadGameButtons": gamebuttons.LoadGameButtons}
+    for name in ("MenuButtons", "ShopButtons", "ShopBackButton", "GameOverButtons"):
+        views[name] = getattr(printminer, name)
+
+    loop = asyncio.get_running_loop()
+    sessions: dict = {}
+    latencies = []
+    diverged = 0
+    started = loop.time()
+    cpu_started = time.process_time()
+
+    clicks, map_seeds = read_all(path)
+    for milliseconds, number, button, seed in clicks:
+        if speed:
+            await asyncio.sleep(max(0.0, started + milliseconds / 1000 / speed - loop.time()))
+        session = sessions.get(number)
+        if session is None:
+            session = sessions[number] = ReplaySession(number)
+            if number in map_seeds:  # dig the recorded player's mine
+                Miner(session.user.id).map_seed = map_seeds[number]
+        view_name, label = button.split(".", 1)
+
+        # Wait for the button to appear, the recorded player may have clicked sooner.
+        deadline = loop.time() + WAIT_SECONDS
+        item = session.button(view_name, label)
+        while item is None and scheduler.pending and loop.time() < deadline:
+            await asyncio.sleep(scheduler.tick)
+            item = session.button(view_name, label)
+        if item is None and view_name in views:
+            # Views without encounter state can be put back on the message.
+            session.view = (
+                views[view_name]()
+                if view_name == "LoadGameButtons"
+                else views[view_name](session.user.id)
+            )
+            item = session.button(view_name, label)
+        if item is None:
+            diverged += 1
+            continue
+
+        session.view.rng = random.Random(seed)
+        clicked = time.perf_counter()
+        await item.callback(ReplayInteraction(session))
+        latencies.append(time.perf_counter() - clicked)
+
+    while scheduler.pending:
+        await asyncio.sleep(scheduler.tick)
+
+    latencies.sort()
+    calls: dict = {"sent_bytes": 0}
+    for session in sessions.values():
+        for call, count in session.calls.items():
+            calls[call] = calls.get(call, 0) + count
+        calls["sent_bytes"] += session.sent_bytes
+    return {
+        "clicks": len(latencies),
+        "diverged": diverged,
+        "sessions": len(sessions),
+        "wall_seconds": loop.time() - started,
+        "cpu_seconds": time.process_time() - cpu_started,
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "latency_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        **calls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show or replay a Print Miner trace.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print the clicks of a trace")
+    show.add_argument("path")
+    play = commands.add_parser("replay", help="replay a trace against the game logic")
+    play.add_argument("path")
+    play.add_argument(
+        "--speed", default="1", help="1, 10 or any speed-up, or 'max' for no waiting"
+    )
+    args = parser.parse_args()
+
+    if args.command == "show":
+        for milliseconds, session, button, seed in read(args.path):
+            print(f"{milliseconds / 1000:>10.3f}s  session {session:<6} {button:<28} {seed}")
+        return
+
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    for name, value in asyncio.run(replay(args.path, speed)).items():
+        print(f"{name:<24}{value:.3f}" if isinstance(value, float) else f"{name:<24}{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Print Miner Discord Bot Game - View Manager
+
+This module keeps track of the live button views of every player. A view is stopped as
+soon as a newer one replaces it on the same message, and each player keeps at most a few
+live views, so views and their callbacks do not pile up in discord.py's view store over
+a long uptime.
+
+Author:
+    Sonya C
+
+Date updated:
+    10/19/2026
+"""
+
+import sys
+from collections import OrderedDict
+
+MAX_VIEWS_PER_SESSION: int = 3
+
+
+def approximate_size(view) -> int:
+    """Returns the approximate memory held by a view and its buttons, in bytes."""
+    size = sys.getsizeof(view) + sys.getsizeof(vars(view))
+    for item in view.children:
+        size += sys.getsizeof(item) + sys.getsizeof(vars(item))
+    return size
+
+
+class ViewManager:
+    """
+    Tracks the live views of each player (session) by the message they are on.
+
+    A view shown by the initial response of a slash command has no known message yet. It
+    is filed under None until its first click tells the manager which message it is on.
+
+    Attributes:
+        sessions (dict): The live views of every player, by player id, each an
+            OrderedDict of message id -> view from oldest to newest.
+        stopped (int): The number of views stopped because they were replaced or evicted.
+
+    Args:
+        max_views (int): The most live views a player may have.
+    """
+
+    def __init__(self, max_views: int = MAX_VIEWS_PER_SESSION):
+        self.max_views = max_views
+        self.sessions: dict = {}
+        self.stopped = 0
+
+    def show(self, player_id: int, message_id, view) -> None:
+        """
+        Records that a view is now on a message, stopping the view it replaced.
+
+        Args:
+            player_id (int): The player the message belongs to.
+            message_id (int): The message, or None if it is not known yet.
+            view (discord.ui.View): The view now on the message, or None if the buttons
+                were removed.
+        """
+        views = self.sessions.setdefault(player_id, OrderedDict())
+        if view is not None and message_id is not None and views.get(None) is view:
+            del views[None]  # the view's message is known now
+
+        old = views.pop(message_id, None)
+        if old is not None and old is not view:
+            self._stop(old)
+        if view is not None:
+            views[message_id] = view
+            view.session = (player_id, message_id)
+
+        while len(views) > self.max_views:
+            self._stop(views.popitem(last=False)[1])
+        if not views:
+            del self.sessions[player_id]
+
+    def forget(self, view) -> None:
+        """Stops tracking a view which has timed out or been stopped."""
+        session = getattr(view, "session", None)
+        if session is None:
+            return
+        player_id, message_id = session
+        views = self.sessions.get(player_id)
+        if views is not None and views.get(message_id) is view:
+            del views[message_id]
+            if not views:
+                del self.sessions[player_id]
+
+    def busy(self, player_id: int) -> bool:
+        """
+        Returns whether a player has a live view. Every game view times out, so a player
+        is busy only until their last view is replaced or times out.
+        """
+        views = self.sessions.get(player_id)
+        return views is not None and any(not view.is_finished() for view in views.values())
+
+    def _stop(self, view) -> None:
+        """Stops a view that is no longer on display."""
+        if not view.is_finished():
+            view.stop()
+            self.stopped += 1
+
+    def report(self) -> dict:
+        """Returns the number of live views and sessions and their approximate memory."""
+        live = [view for views in self.sessions.values() for view in views.values()]
+        return {
+            "sessions": len(self.sessions),
+            "live_views": len(live),
+            "stopped_views": self.stopped,
+            "view_bytes": sum(approximate_size(view) for view in live),
+        }